@@ -1,6 +1,20 @@
 /**
  * Client-side search functionality for Salesforce RAG Knowledge Library
  * Supports keyboard shortcuts (Ctrl+K) and accessible search interface
+ *
+ * Searches the full text of every page using the prefix-sharded BM25 index
+ * built by website/scripts/build-search-index.py: only the shards a query
+ * touches are fetched, and results are ranked by BM25. Falls back to
+ * substring matching over rag-library.json if the index is unavailable.
+ *
+ * While typing, page titles and section headings that start with the query
+ * are suggested on every keystroke, without waiting for the debounce, from
+ * the prefix index in typeahead.json (raglib/typeahead.py).
+ *
+ * Query words the index does not know ("Queuable", "permision") are
+ * corrected to the closest indexed term within two edits, from the
+ * vocabulary in spelling.json, with the symmetric-delete lookup of
+ * raglib/spelling.py; the corrections feed both BM25 and the suggestions.
  */
 
 (function() {
@@ -11,20 +25,48 @@
     shortcutKey: 'k',
     minQueryLength: 2,
     maxResults: 20,
-    debounceDelay: 300
+    debounceDelay: 300,
+    indexUrl: '/Salesforce-RAG/assets/search/',
+    libraryUrl: '/Salesforce-RAG/rag/rag-library.json',
+    // The last word being typed also matches terms it is a prefix of
+    maxPrefixExpansions: 10,
+    prefixWeight: 0.5,
+    // Weight when the partial word is already a whole indexed word ("rule")
+    completedPrefixWeight: 0.1,
+    maxSuggestions: 8,
+    // Spelling correction (same limits as raglib/spelling.py)
+    minTokenLength: 4,
+    shortTokenLength: 5
   };
 
+  // Must match raglib/text.py so query terms line up with index terms
+  const STOPWORDS = new Set((
+    'a an and are as at be but by can do does for from had has have how i if in into is it its ' +
+    'not of on or should so than that the their them then there these they this to was we were ' +
+    'what when where which while who why will with you your'
+  ).split(' '));
+
   // DOM elements
   let searchToggle = null;
   let searchContainer = null;
   let searchInput = null;
   let searchClose = null;
   let searchResults = null;
+  let searchSuggestions = null;
   let searchData = null;
+  let searchIndex = null;
+  let searchDataLoaded = null;
+  let typeahead = null;
+  let typeaheadLoading = null;
+  let spelling = null;
+  let spellingLoading = null;
+  const shardCache = {};
 
   // State
   let isOpen = false;
   let debounceTimer = null;
+  let searchSeq = 0;
+  let activeSuggestion = -1;
 
   /**
    * Initialize search functionality
@@ -36,6 +78,7 @@
     searchInput = document.getElementById('search-input');
     searchClose = document.getElementById('search-close');
     searchResults = document.getElementById('search-results');
+    searchSuggestions = document.getElementById('search-suggestions');
 
     if (!searchToggle || !searchContainer || !searchInput || !searchClose || !searchResults) {
       console.warn('Search elements not found');
@@ -43,7 +86,7 @@
     }
 
     // Load search data
-    loadSearchData();
+    searchDataLoaded = loadSearchData();
 
     // Event listeners
     searchToggle.addEventListener('click', toggleSearch);
@@ -75,11 +118,22 @@
   }
 
   /**
-   * Load search data from rag-library.json
+   * Load the search index metadata, falling back to rag-library.json
    */
   async function loadSearchData() {
     try {
-      const response = await fetch('/Salesforce-RAG/rag/rag-library.json');
+      const response = await fetch(SEARCH_CONFIG.indexUrl + 'meta.json');
+      if (!response.ok) {
+        throw new Error('Failed to load search index');
+      }
+      searchIndex = await response.json();
+      return;
+    } catch (error) {
+      console.warn('Search index unavailable, falling back to metadata search:', error);
+    }
+
+    try {
+      const response = await fetch(SEARCH_CONFIG.libraryUrl);
       if (!response.ok) {
         throw new Error('Failed to load search data');
       }
@@ -91,6 +145,360 @@
     }
   }
 
+  /**
+   * Fetch (once, when search is first opened) the typeahead prefix index
+   * and slice its keys out of the normalised labels: key i is label
+   * key_labels[i] from word key_words[i] on. Entries are the page titles
+   * (entry = page) followed by the headings (entry = pages + heading).
+   */
+  function loadTypeahead() {
+    if (!typeaheadLoading) {
+      typeaheadLoading = searchDataLoaded.then(async () => {
+        if (!searchIndex || !searchIndex.typeahead || !searchSuggestions) {
+          return;
+        }
+        try {
+          const url = SEARCH_CONFIG.indexUrl + searchIndex.typeahead + '?v=' + searchIndex.build_id;
+          const response = await fetch(url);
+          if (!response.ok) {
+            throw new Error('Failed to load typeahead index');
+          }
+          const data = await response.json();
+          const words = data.labels.map(label => normalizeKey(label).split(' '));
+          data.keys = data.key_labels.map((label, i) =>
+            words[label].slice(data.key_words[i]).join(' ').slice(0, data.max_key_length));
+          data.labelEntries = new Map();
+          const entryLabels = data.pages.map(page => page[1]).concat(data.headings.map(heading => heading[0]));
+          entryLabels.forEach((label, entry) => {
+            if (!data.labelEntries.has(label)) {
+              data.labelEntries.set(label, []);
+            }
+            data.labelEntries.get(label).push(entry);
+          });
+          typeahead = data;
+          if (isOpen) {
+            showSuggestions(searchInput.value);
+          }
+        } catch (error) {
+          console.warn('Typeahead unavailable:', error);
+        }
+      });
+    }
+    return typeaheadLoading;
+  }
+
+  /**
+   * Fetch (once, when a query first needs correcting) the vocabulary and
+   * index every term by the strings left after deleting up to max_distance
+   * of its characters
+   */
+  function loadSpelling() {
+    if (!spellingLoading) {
+      spellingLoading = searchDataLoaded.then(async () => {
+        if (!searchIndex || !searchIndex.spelling) {
+          return;
+        }
+        try {
+          const url = SEARCH_CONFIG.indexUrl + searchIndex.spelling + '?v=' + searchIndex.build_id;
+          const response = await fetch(url);
+          if (!response.ok) {
+            throw new Error('Failed to load spelling vocabulary');
+          }
+          const data = await response.json();
+          const deletes = new Map();
+          data.terms.forEach((term, i) => {
+            deleteVariants(term, data.max_distance).forEach(variant => {
+              const terms = deletes.get(variant);
+              if (terms) {
+                terms.push(i);
+              } else {
+                deletes.set(variant, [i]);
+              }
+            });
+          });
+          spelling = { terms: data.terms, counts: data.counts, known: new Set(data.terms), deletes: deletes };
+          if (isOpen) {
+            showSuggestions(searchInput.value);
+          }
+        } catch (error) {
+          console.warn('Spelling correction unavailable:', error);
+        }
+      });
+    }
+    return spellingLoading;
+  }
+
+  /**
+   * word and every string obtained by deleting up to distance of its characters
+   */
+  function deleteVariants(word, distance) {
+    const found = new Set([word]);
+    let frontier = [word];
+    for (let d = 0; d < distance; d++) {
+      const next = new Set();
+      frontier.forEach(variant => {
+        for (let i = 0; i < variant.length; i++) {
+          next.add(variant.slice(0, i) + variant.slice(i + 1));
+        }
+      });
+      next.forEach(variant => found.add(variant));
+      frontier = [...next];
+    }
+    return found;
+  }
+
+  /**
+   * Optimal string alignment distance; limit + 1 if above limit
+   */
+  function editDistance(a, b, limit) {
+    if (Math.abs(a.length - b.length) > limit) {
+      return limit + 1;
+    }
+    let previous2 = [];
+    let previous = Array.from({ length: b.length + 1 }, (_, j) => j);
+    for (let i = 1; i <= a.length; i++) {
+      const current = [i];
+      for (let j = 1; j <= b.length; j++) {
+        const cost = a[i - 1] === b[j - 1] ? 0 : 1;
+        current[j] = Math.min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost);
+        if (i > 1 && j > 1 && a[i - 1] === b[j - 2] && a[i - 2] === b[j - 1]) {
+          current[j] = Math.min(current[j], previous2[j - 2] + 1);
+        }
+      }
+      if (Math.min(...current) > limit) {
+        return limit + 1;
+      }
+      previous2 = previous;
+      previous = current;
+    }
+    return Math.min(previous[b.length], limit + 1);
+  }
+
+  /**
+   * The closest vocabulary term to an unknown search term (most documents
+   * on a tie), or null; same rules as raglib/spelling.py lookup()
+   */
+  function correctTerm(token) {
+    if (!spelling || spelling.known.has(token) ||
+        token.length < SEARCH_CONFIG.minTokenLength || !/^[a-z]+$/.test(token)) {
+      return null;
+    }
+    const budget = token.length <= SEARCH_CONFIG.shortTokenLength ? 1 : 2;
+    let best = null;
+    const seen = new Set();
+    deleteVariants(token, budget).forEach(variant => {
+      (spelling.deletes.get(variant) || []).forEach(i => {
+        if (seen.has(i)) {
+          return;
+        }
+        seen.add(i);
+        const term = spelling.terms[i];
+        const distance = editDistance(token, term, budget);
+        if (distance > budget) {
+          return;
+        }
+        const count = spelling.counts[i];
+        if (!best || distance < best.distance ||
+            (distance === best.distance && (count > best.count || (count === best.count && term < best.term)))) {
+          best = { term: term, distance: distance, count: count };
+        }
+      });
+    });
+    return best ? best.term : null;
+  }
+
+  /**
+   * query with every word the vocabulary does not know replaced by its
+   * correction (null if nothing was corrected)
+   */
+  function correctQuery(query) {
+    let changed = false;
+    const corrected = query.replace(/[a-z0-9]+/gi, word => {
+      const lower = word.toLowerCase();
+      if (lower.length < 2 || STOPWORDS.has(lower)) {
+        return word;
+      }
+      const correction = correctTerm(stem(lower));
+      if (correction === null) {
+        return word;
+      }
+      changed = true;
+      return correction;
+    });
+    return changed ? corrected : null;
+  }
+
+  /**
+   * Lowercase words joined by single spaces (same rule as raglib/typeahead.py)
+   */
+  function normalizeKey(text) {
+    return (text.toLowerCase().match(/[a-z0-9]+/g) || []).join(' ');
+  }
+
+  /**
+   * The id of a heading from its label (same rule as raglib/typeahead.py label_anchor())
+   */
+  function labelAnchor(label) {
+    return label.trim().toLowerCase().replace(/[^a-z0-9_\- ]/g, '').replace(/ /g, '-');
+  }
+
+  /**
+   * Label, URL, weight and page title of a typeahead entry
+   */
+  function typeaheadEntry(entry) {
+    const pages = typeahead.pages;
+    if (entry < pages.length) {
+      const [url, label, weight] = pages[entry];
+      return { label: typeahead.labels[label], url: url, weight: weight, page: '' };
+    }
+    const [labelId, page, anchor] = typeahead.headings[entry - pages.length];
+    const label = typeahead.labels[labelId];
+    const id = typeof anchor === 'string' ? anchor : labelAnchor(label) + (anchor ? '-' + anchor : '');
+    const [url, titleLabel, , weight] = pages[page];
+    return { label: label, url: url + '#' + id, weight: weight, page: typeahead.labels[titleLabel] };
+  }
+
+  /**
+   * The best titles and headings with a key starting with query (same
+   * ranking as raglib/typeahead.py suggest()): labels that start with the
+   * query first, then by page popularity. Binary search for the first key
+   * with the prefix, then a scan of the keys that share it.
+   */
+  function suggest(query) {
+    const prefix = normalizeKey(query).slice(0, typeahead.max_key_length);
+    if (!prefix) {
+      return [];
+    }
+    const keys = typeahead.keys;
+    let low = 0;
+    let high = keys.length;
+    while (low < high) {
+      const mid = (low + high) >>> 1;
+      if (keys[mid] < prefix) {
+        low = mid + 1;
+      } else {
+        high = mid;
+      }
+    }
+
+    // Entries whose label starts with the prefix outrank any weight
+    const startBonus = 1001;
+    const best = new Map();
+    for (let i = low; i < keys.length && keys[i].startsWith(prefix); i++) {
+      const bonus = typeahead.key_words[i] === 0 ? startBonus : 0;
+      for (const entry of typeahead.labelEntries.get(typeahead.key_labels[i])) {
+        const weight = entry < typeahead.pages.length ? typeahead.pages[entry][2]
+          : typeahead.pages[typeahead.headings[entry - typeahead.pages.length][1]][3];
+        const score = weight + bonus;
+        if (!(best.get(entry) >= score)) {
+          best.set(entry, score);
+        }
+      }
+    }
+    return [...best.entries()]
+      .sort((a, b) => b[1] - a[1])
+      .slice(0, SEARCH_CONFIG.maxSuggestions)
+      .map(([entry]) => typeaheadEntry(entry));
+  }
+
+  /**
+   * Show the suggestions for the current input (runs on every keystroke)
+   */
+  function showSuggestions(value) {
+    if (!searchSuggestions) {
+      return;
+    }
+    activeSuggestion = -1;
+    searchInput.removeAttribute('aria-activedescendant');
+    const query = value.trim();
+    if (!typeahead || query.length < SEARCH_CONFIG.minQueryLength) {
+      searchSuggestions.innerHTML = '';
+      return;
+    }
+    let suggestions = suggest(query);
+    if (suggestions.length === 0) {
+      // Nothing starts with what was typed: try it with misspellings corrected
+      const corrected = spelling ? correctQuery(query) : null;
+      if (corrected) {
+        suggestions = suggest(corrected);
+      } else if (!spelling) {
+        loadSpelling();
+      }
+    }
+    searchSuggestions.innerHTML = suggestions.map((suggestion, i) => `
+      <li id="search-suggestion-${i}" class="search-suggestion" role="option">
+        <a href="/Salesforce-RAG${escapeHtml(suggestion.url)}">${highlightMatch(suggestion.label, query)}</a>
+        ${suggestion.page ? `<span class="search-suggestion-page">${escapeHtml(suggestion.page)}</span>` : ''}
+      </li>
+    `).join('');
+  }
+
+  /**
+   * Move the keyboard selection through the suggestions
+   */
+  function moveSuggestion(step) {
+    const items = searchSuggestions ? searchSuggestions.querySelectorAll('.search-suggestion') : [];
+    if (items.length === 0) {
+      return false;
+    }
+    if (activeSuggestion >= 0) {
+      items[activeSuggestion].classList.remove('active');
+    }
+    activeSuggestion = (activeSuggestion + step + items.length + 1) % (items.length + 1) - 1;
+    if (activeSuggestion >= 0) {
+      items[activeSuggestion].classList.add('active');
+      searchInput.setAttribute('aria-activedescendant', items[activeSuggestion].id);
+    } else {
+      searchInput.removeAttribute('aria-activedescendant');
+    }
+    return true;
+  }
+
+  /**
+   * Light plural stemmer (same rules as raglib/text.py)
+   */
+  function stem(token) {
+    const n = token.length;
+    if (n > 3 && token.endsWith('ies') && !token.endsWith('eies') && !token.endsWith('aies')) {
+      return token.slice(0, -3) + 'y';
+    }
+    if (n > 4 && ['sses', 'xes', 'zes', 'ches', 'shes'].some(suffix => token.endsWith(suffix))) {
+      return token.slice(0, -2);
+    }
+    if (n > 2 && token.endsWith('s') && !['us', 'ss', 'is'].some(suffix => token.endsWith(suffix))) {
+      return token.slice(0, -1);
+    }
+    return token;
+  }
+
+  /**
+   * Split text into search terms (same rules as raglib/text.py)
+   */
+  function tokenize(text) {
+    return (text.toLowerCase().match(/[a-z0-9]+/g) || [])
+      .filter(token => token.length > 1 && !STOPWORDS.has(token))
+      .map(stem);
+  }
+
+  /**
+   * Fetch (once) the postings shard holding terms that start with prefix
+   */
+  function loadShard(prefix) {
+    if (!searchIndex.shards.includes(prefix)) {
+      return Promise.resolve({});
+    }
+    if (!shardCache[prefix]) {
+      const url = SEARCH_CONFIG.indexUrl + 'shard-' + prefix + '.json?v=' + searchIndex.build_id;
+      shardCache[prefix] = fetch(url)
+        .then(response => (response.ok ? response.json() : {}))
+        .catch(() => {
+          delete shardCache[prefix];
+          return {};
+        });
+    }
+    return shardCache[prefix];
+  }
+
   /**
    * Toggle search container
    */
@@ -109,6 +517,7 @@
     isOpen = true;
     searchContainer.style.display = 'block';
     searchInput.focus();
+    loadTypeahead();
     searchToggle.setAttribute('aria-expanded', 'true');
     
     // Update ARIA
@@ -123,6 +532,7 @@
     searchContainer.style.display = 'none';
     searchInput.value = '';
     searchResults.innerHTML = '';
+    showSuggestions('');
     searchToggle.setAttribute('aria-expanded', 'false');
     
     // Update ARIA
@@ -134,6 +544,7 @@
    */
   function handleSearch() {
     clearTimeout(debounceTimer);
+    showSuggestions(searchInput.value);
     
     debounceTimer = setTimeout(() => {
       const query = searchInput.value.trim();
@@ -143,14 +554,134 @@
         return;
       }
 
-      performSearch(query);
+      performSearch(query, /[a-z0-9]$/i.test(searchInput.value));
     }, SEARCH_CONFIG.debounceDelay);
   }
 
   /**
    * Perform search
+   *
+   * typing is true while the last word is still being typed (no trailing
+   * space), in which case it also matches terms it is a prefix of.
    */
-  function performSearch(query) {
+  async function performSearch(query, typing) {
+    const seq = ++searchSeq;
+
+    if (!searchIndex) {
+      performMetadataSearch(query);
+      return;
+    }
+
+    let terms = tokenize(query);
+    const prefixLength = searchIndex.prefix_length;
+
+    // Expand the word still being typed to the terms it is a prefix of
+    const words = query.toLowerCase().match(/[a-z0-9]+/g) || [];
+    let partial = typing && words.length ? words[words.length - 1] : null;
+
+    const prefixes = new Set(terms.map(term => term.slice(0, prefixLength)));
+    if (partial && partial.length >= prefixLength) {
+      prefixes.add(partial.slice(0, prefixLength));
+    }
+
+    const shards = {};
+    await Promise.all([...prefixes].map(async prefix => {
+      shards[prefix] = await loadShard(prefix);
+    }));
+
+    // A newer query started while shards were loading
+    if (seq !== searchSeq) {
+      return;
+    }
+
+    // Correct the terms the index does not know; the word being typed only
+    // if no indexed term starts with it either
+    const inShard = term => Boolean((shards[term.slice(0, prefixLength)] || {})[term]);
+    const completes = word => Object.keys(shards[word.slice(0, prefixLength)] || {}).some(t => t.startsWith(word));
+    const unknown = terms.filter(term => !inShard(term) && !(partial && term === stem(partial) && completes(partial)));
+    let shownQuery = query;
+    if (unknown.length && searchIndex.spelling) {
+      await loadSpelling();
+      const corrections = new Map();
+      unknown.forEach(term => {
+        const correction = correctTerm(term);
+        if (correction) {
+          corrections.set(term, correction);
+        }
+      });
+      if (corrections.size) {
+        terms = terms.map(term => corrections.get(term) || term);
+        if (partial && corrections.has(stem(partial))) {
+          partial = null;
+        }
+        shownQuery = query.replace(/[a-z0-9]+/gi, word => corrections.get(stem(word.toLowerCase())) || word);
+        await Promise.all([...corrections.values()].map(async term => {
+          const prefix = term.slice(0, prefixLength);
+          shards[prefix] = shards[prefix] || await loadShard(prefix);
+        }));
+      }
+      if (seq !== searchSeq) {
+        return;
+      }
+    }
+
+    const k1 = searchIndex.k1;
+    const norms = searchIndex.norms;
+
+    // BM25 contribution of one term to every document it occurs in
+    function termScores(term, accumulate) {
+      const entry = (shards[term.slice(0, prefixLength)] || {})[term];
+      if (!entry) {
+        return;
+      }
+      const idf = entry[0];
+      const deltas = entry[1];
+      const tfs = entry[2];
+      let doc = 0;
+      for (let i = 0; i < deltas.length; i++) {
+        doc += deltas[i];
+        const tf = tfs[i];
+        accumulate(doc, idf * tf * (k1 + 1) / (tf + norms[doc]));
+      }
+    }
+
+    const scores = new Float64Array(searchIndex.doc_count);
+    const queryTerms = new Set(terms);
+    queryTerms.forEach(term => termScores(term, (doc, score) => { scores[doc] += score; }));
+
+    // Expansions of the partial word act as one OR-term: each document gets
+    // its best expansion, so a short prefix can't swamp the other words.
+    // The most common completions are the likeliest, so those are used.
+    if (partial && partial.length >= prefixLength) {
+      const shard = shards[partial.slice(0, prefixLength)] || {};
+      const weight = shard[stem(partial)] ? SEARCH_CONFIG.completedPrefixWeight : SEARCH_CONFIG.prefixWeight;
+      const best = new Float64Array(searchIndex.doc_count);
+      Object.keys(shard)
+        .filter(term => term.startsWith(partial) && !queryTerms.has(term))
+        .sort((a, b) => shard[b][1].length - shard[a][1].length)
+        .slice(0, SEARCH_CONFIG.maxPrefixExpansions)
+        .forEach(term => termScores(term, (doc, score) => { best[doc] = Math.max(best[doc], score); }));
+      best.forEach((score, doc) => { scores[doc] += weight * score; });
+    }
+
+    const results = [];
+    scores.forEach((score, doc) => {
+      if (score > 0) {
+        results.push([score, doc]);
+      }
+    });
+    results.sort((a, b) => b[0] - a[0]);
+
+    displayResults(results.slice(0, SEARCH_CONFIG.maxResults).map(([, doc]) => {
+      const d = searchIndex.docs[doc];
+      return { title: d.t, path: d.p, url: d.u, description: d.d };
+    }), shownQuery, shownQuery !== query);
+  }
+
+  /**
+   * Fallback: substring search over rag-library.json metadata
+   */
+  function performMetadataSearch(query) {
     if (!searchData || searchData.length === 0) {
       searchResults.innerHTML = '<p>Search data not loaded. Please refresh the page.</p>';
       return;
@@ -161,12 +692,10 @@
       .filter(file => {
         const title = (file.title || '').toLowerCase();
         const description = (file.description || '').toLowerCase();
-        const content = (file.summary || '').toLowerCase();
         const path = (file.path || '').toLowerCase();
         
         return title.includes(lowerQuery) ||
                description.includes(lowerQuery) ||
-               content.includes(lowerQuery) ||
                path.includes(lowerQuery);
       })
       .slice(0, SEARCH_CONFIG.maxResults);
@@ -177,11 +706,14 @@
   /**
    * Display search results
    */
-  function displayResults(results, query) {
+  function displayResults(results, query, corrected) {
     if (results.length === 0) {
-      searchResults.innerHTML = `<p>No results found for "${query}"</p>`;
+      searchResults.innerHTML = `<p>No results found for "${escapeHtml(query)}"</p>`;
       return;
     }
+    const correction = corrected
+      ? `<p class="search-correction">Showing results for <strong>${escapeHtml(query)}</strong></p>`
+      : '';
 
     const html = results.map(file => {
       const title = file.title || file.path || 'Untitled';
@@ -211,28 +743,54 @@
       `;
     }).join('');
 
-    searchResults.innerHTML = html;
+    searchResults.innerHTML = correction + html;
+  }
+
+  /**
+   * Escape text for safe insertion into HTML
+   */
+  function escapeHtml(text) {
+    return text.replace(/[&<>"']/g, ch => ({
+      '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[ch]);
   }
 
   /**
-   * Highlight matching text in results
+   * Highlight matching query words in results
    */
   function highlightMatch(text, query) {
-    if (!query) return text;
-    
-    const regex = new RegExp(`(${query})`, 'gi');
-    return text.replace(regex, '<mark>$1</mark>');
+    const words = (query.match(/[a-z0-9]+/gi) || []).filter(word => word.length > 1);
+    if (words.length === 0) return escapeHtml(text);
+
+    // Match on the raw text and escape each piece: matching the escaped text
+    // would let "amp" or "lt" land inside an entity such as &amp;
+    const regex = new RegExp(`(${words.join('|')})`, 'gi');
+    return text.split(regex)
+      .map((piece, i) => (i % 2 ? `<mark>${escapeHtml(piece)}</mark>` : escapeHtml(piece)))
+      .join('');
   }
 
   /**
    * Handle keyboard navigation in search
    */
   function handleKeydown(e) {
-    // Allow Enter to navigate to first result
+    // Arrow keys select a suggestion
+    if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+      if (moveSuggestion(e.key === 'ArrowDown' ? 1 : -1)) {
+        e.preventDefault();
+      }
+      return;
+    }
+
+    // Enter opens the selected suggestion, else the first result (or suggestion)
     if (e.key === 'Enter') {
-      const firstResult = searchResults.querySelector('.search-result-item a');
-      if (firstResult) {
-        firstResult.click();
+      const selected = activeSuggestion >= 0 &&
+        searchSuggestions.querySelectorAll('.search-suggestion a')[activeSuggestion];
+      const target = selected ||
+        searchResults.querySelector('.search-result-item a') ||
+        (searchSuggestions && searchSuggestions.querySelector('.search-suggestion a'));
+      if (target) {
+        target.click();
       }
     }
   }
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark the IVF approximate nearest neighbour index against exact search.
+
+Reports, for each nprobe setting:
+1. recall@k: share of the exact top-k the IVF index also returns
+2. p50 / p99 single-query latency, next to exact (brute-force) search
+
+By default the chunk vectors of the knowledge library are used, queried with
+the embedded chunk titles. --synthetic N benchmarks N clustered random
+vectors instead, to see how the two scale past the size of this corpus.
+
+Usage:
+    python website/scripts/benchmark-ann.py
+    python website/scripts/benchmark-ann.py --synthetic 1000000 --nprobe 1,4,16,64
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from raglib.ann import IvfIndex
+from raglib.retrieval import default_retriever
+from raglib.vectors import VectorIndex, normalize_rows
+
+
+def synthetic_vectors(count: int, queries: int, dim: int, seed: int = 0):
+    """Clustered unit vectors (topics plus noise) and queries drawn the same way."""
+    rng = np.random.default_rng(seed)
+    topics = normalize_rows(rng.standard_normal((max(1, count // 100), dim)).astype(np.float32))
+
+    def draw(n):
+        noise = 0.15 * rng.standard_normal((n, dim)).astype(np.float32)
+        return normalize_rows(topics[rng.integers(0, len(topics), n)] + noise)
+
+    return draw(count), draw(queries)
+
+
+def time_queries(search, queries):
+    """Per-query results and latencies (seconds)."""
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search(query))
+        latencies.append(time.perf_counter() - start)
+    return results, np.array(latencies)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark IVF search against exact search")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="Use N synthetic vectors instead of the corpus")
+    parser.add_argument("--dim", type=int, default=64, help="Dimension of synthetic vectors (default: 64)")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries (default: 200)")
+    parser.add_argument("-k", type=int, default=10, help="Results per query (default: 10)")
+    parser.add_argument("--nlist", type=int, help="IVF cells (default: ~4 * sqrt(n))")
+    parser.add_argument("--nprobe", default="1,2,4,8,16,32", help="Comma-separated nprobe values to try")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors, queries = synthetic_vectors(args.synthetic, args.queries, args.dim)
+        source = f"{args.synthetic:,} synthetic {args.dim}-d vectors"
+    else:
+        retriever = default_retriever()
+        vectors = np.asarray(retriever.vectors.vectors, dtype=np.float32)
+        rng = np.random.default_rng(0)
+        sample = rng.choice(len(retriever.chunks), min(args.queries, len(retriever.chunks)), replace=False)
+        queries = retriever.embedder.embed([retriever.chunks[i].title for i in sample])
+        source = f"{len(vectors):,} chunk vectors ({vectors.shape[1]}-d), chunk titles as queries"
+
+    print(f"Benchmarking {source}, {len(queries)} queries, k={args.k}")
+    exact = VectorIndex([str(i) for i in range(len(vectors))], vectors)
+
+    start = time.perf_counter()
+    ivf = IvfIndex.build(vectors, nlist=args.nlist)
+    print(f"IVF build: {ivf.nlist} cells in {time.perf_counter() - start:.2f}s\n")
+
+    truth, exact_latency = time_queries(lambda q: exact.search(q, args.k)[0][0], queries)
+    truth = [set(rows.tolist()) for rows in truth]
+
+    print(f"{'search':>12} {'recall@' + str(args.k):>10} {'p50 ms':>9} {'p99 ms':>9} {'speedup':>8}")
+    exact_p50 = np.percentile(exact_latency, 50)
+    print(f"{'exact':>12} {1.0:>10.3f} {exact_p50 * 1000:>9.3f} {np.percentile(exact_latency, 99) * 1000:>9.3f} "
+          f"{1.0:>7.1f}x")
+    for nprobe in (int(n) for n in args.nprobe.split(",")):
+        if nprobe > ivf.nlist:
+            continue
+        found, latency = time_queries(lambda q: ivf.search(q, args.k, nprobe=nprobe)[0][0], queries)
+        recall = np.mean([len(expected & set(rows.tolist())) / max(len(expected), 1)
+                          for expected, rows in zip(truth, found)])
+        p50 = np.percentile(latency, 50)
+        print(f"{'nprobe=' + str(nprobe):>12} {recall:>10.3f} {p50 * 1000:>9.3f} "
+              f"{np.percentile(latency, 99) * 1000:>9.3f} {exact_p50 / p50:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
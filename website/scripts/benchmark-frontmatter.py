@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark frontmatter parsing: native fast path vs PyYAML.
+
+Reports:
+1. Extra interpreter startup cost of `import yaml` (which the fast path avoids)
+2. Per-file parse cost over every frontmatter header in rag/
+
+Usage:
+    python website/scripts/benchmark-frontmatter.py
+    python website/scripts/benchmark-frontmatter.py --repeat 50
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from raglib.frontmatter import parse_flat, parse_header, parse_yaml, split_frontmatter
+
+BASE_DIR = Path(__file__).parent.parent.parent
+RAG_DIR = BASE_DIR / "rag"
+SCRIPTS_DIR = Path(__file__).parent
+
+
+def best_startup(code: str, runs: int) -> float:
+    """Best wall time (seconds) of a fresh interpreter running `code`."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=SCRIPTS_DIR)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_parser(parser, headers, repeat: int) -> float:
+    """Best time (seconds) to parse every header once."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for header in headers:
+            parser(header)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark frontmatter parsing")
+    parser.add_argument("--repeat", type=int, default=20, help="Timing repetitions (best is reported)")
+    parser.add_argument("--startup-runs", type=int, default=5, help="Fresh interpreters per startup measurement")
+    args = parser.parse_args()
+
+    headers = []
+    for file_path in sorted(RAG_DIR.rglob("*.md")):
+        status, header_text, _ = split_frontmatter(file_path.read_text(encoding="utf-8"))
+        if status == "ok":
+            headers.append(header_text)
+
+    fast_headers = [h for h in headers if parse_flat(h) is not None]
+    mismatches = sum(1 for h in fast_headers if parse_flat(h) != parse_yaml(h))
+
+    print("Startup (fresh interpreter, best of {}):".format(args.startup_runs))
+    with_fast = best_startup("import raglib.frontmatter", args.startup_runs)
+    with_yaml = best_startup("import raglib.frontmatter, yaml", args.startup_runs)
+    print(f"  import raglib.frontmatter        : {with_fast * 1000:8.1f} ms")
+    print(f"  import raglib.frontmatter, yaml  : {with_yaml * 1000:8.1f} ms")
+    print(f"  cost of importing yaml eagerly   : {(with_yaml - with_fast) * 1000:8.1f} ms")
+
+    print(f"\nParsing {len(headers)} headers ({len(fast_headers)} on the fast path), best of {args.repeat}:")
+    fast_time = time_parser(parse_header, headers, args.repeat)
+    yaml_time = time_parser(parse_yaml, headers, args.repeat)
+    per_file_fast = fast_time / len(headers) * 1e6
+    per_file_yaml = yaml_time / len(headers) * 1e6
+    print(f"  fast path : {fast_time * 1000:8.2f} ms total, {per_file_fast:8.1f} µs/file")
+    print(f"  PyYAML    : {yaml_time * 1000:8.2f} ms total, {per_file_yaml:8.1f} µs/file")
+    print(f"  speedup   : {yaml_time / fast_time:8.1f}x")
+
+    if mismatches:
+        print(f"\n❌ {mismatches} headers parse differently on the fast path")
+        sys.exit(1)
+    print("\n✓ Fast path output matches PyYAML for every header it accepts")
+
+
+if __name__ == "__main__":
+    main()
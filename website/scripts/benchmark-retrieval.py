@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Benchmark retrieval quality and latency over a fixed query set.
+
+Runs the queries in website/benchmarks/queries.json (realistic questions,
+each with graded relevant pages) through every retrieval mode:
+
+    substring   search.js fallback: query substring of title, description or path
+    client      search.js: page-level BM25 over the client index
+    keyword     raglib.retrieval BM25 over chunks
+    semantic    raglib.retrieval cosine similarity of LSA embeddings
+    hybrid      both, fused with reciprocal rank fusion
+
+and reports, per mode, at the page level (chunk results are reduced to
+their pages):
+1. recall@k, MRR and nDCG@k against the graded judgements
+2. p50 / p95 / p99 single-query latency
+3. index build time, best of --build-runs (client index; chunk index with
+   embeddings)
+
+--check compares the run with website/benchmarks/baseline.json and exits
+with status 1 when a quality metric dropped by more than --max-quality-drop
+or the p50 / p95 latency or a build time grew by more than --max-slowdown
+(growth under --latency-floor ms, or BUILD_FLOOR seconds for builds, is
+ignored: that is timer noise). Save a baseline with --save-baseline, on the
+machine that will run --check.
+
+Usage:
+    python website/scripts/benchmark-retrieval.py
+    python website/scripts/benchmark-retrieval.py --modes keyword,hybrid -k 5
+    python website/scripts/benchmark-retrieval.py --check
+    python website/scripts/benchmark-retrieval.py --save-baseline
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from raglib.corpus import BASE_DIR, iter_pages
+from raglib.retrieval import Retriever
+from raglib.search_index import build_client_index, page_description
+from raglib.text import tokenize
+
+BENCHMARK_DIR = BASE_DIR / "website" / "benchmarks"
+QUERIES_FILE = BENCHMARK_DIR / "queries.json"
+BASELINE_FILE = BENCHMARK_DIR / "baseline.json"
+
+MODES = ("substring", "client", "keyword", "semantic", "hybrid")
+QUALITY_METRICS = ("recall", "mrr", "ndcg")
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+# p99 of a few hundred sub-millisecond timings is mostly scheduler noise: reported, not checked
+CHECKED_LATENCY_METRICS = ("p50_ms", "p95_ms")
+# Build time growth below this is not a regression (seconds)
+BUILD_FLOOR = 0.5
+
+
+class ClientSearch:
+    """search.js performSearch() over the in-memory client index (a finished query, no prefix expansion)."""
+
+    def __init__(self, files: dict):
+        self.meta = files["meta.json"]
+        self.shards = files
+        self.prefix_length = self.meta["prefix_length"]
+        self.norms = np.array(self.meta["norms"])
+
+    def search(self, query: str, k: int) -> list:
+        scores = np.zeros(self.meta["doc_count"])
+        k1 = self.meta["k1"]
+        for term in set(tokenize(query)):
+            entry = self.shards.get(f"shard-{term[:self.prefix_length]}.json", {}).get(term)
+            if entry is None:
+                continue
+            idf, deltas, tfs = entry
+            docs = np.cumsum(deltas)
+            tfs = np.array(tfs, dtype=np.float64)
+            scores[docs] += idf * tfs * (k1 + 1) / (tfs + self.norms[docs])
+        found = np.flatnonzero(scores)
+        order = found[np.argsort(-scores[found], kind="stable")][:k]
+        return [self.meta["docs"][doc]["u"] for doc in order]
+
+
+class SubstringSearch:
+    """search.js performMetadataSearch(): the query as a substring of title, description or path."""
+
+    def __init__(self, pages: list):
+        self.docs = [(page.url, f"{page.title}\0{page_description(page)}\0{page.path}".lower()) for page in pages]
+
+    def search(self, query: str, k: int) -> list:
+        query = query.lower()
+        return [url for url, text in self.docs if query in text][:k]
+
+
+def timed_build(build, runs: int):
+    """build()'s result and its best wall time (seconds) over runs."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = build()
+        best = min(best, time.perf_counter() - start)
+    return result, round(best, 3)
+
+
+def retriever_search(retriever: Retriever, mode: str):
+    """Search function returning the URLs of the top k pages (best chunk per page)."""
+    def search(query: str, k: int) -> list:
+        return [result.url.split("#")[0] for result in retriever.search(query, k=k, mode=mode, per_page=1)]
+    return search
+
+
+def quality(ranked: list, relevant: dict, k: int) -> dict:
+    """recall@k, reciprocal rank and nDCG@k of one ranked URL list against graded judgements."""
+    ranked = ranked[:k]
+    hits = [url for url in ranked if url in relevant]
+    reciprocal_rank = next((1.0 / rank for rank, url in enumerate(ranked, 1) if url in relevant), 0.0)
+    dcg = sum((2 ** relevant.get(url, 0) - 1) / math.log2(rank + 1) for rank, url in enumerate(ranked, 1))
+    ideal = sorted(relevant.values(), reverse=True)[:k]
+    idcg = sum((2 ** grade - 1) / math.log2(rank + 1) for rank, grade in enumerate(ideal, 1))
+    return {"recall": len(hits) / len(relevant), "mrr": reciprocal_rank, "ndcg": dcg / idcg if idcg else 0.0}
+
+
+def run_mode(search, queries: list, k: int, repeat: int) -> dict:
+    """Mean quality over queries and latency percentiles over repeat runs of each."""
+    totals = dict.fromkeys(QUALITY_METRICS, 0.0)
+    latencies = []
+    for item in queries:
+        search(item["query"], k)  # warm-up (and caches that a long-running process would have)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            ranked = search(item["query"], k)
+            latencies.append(time.perf_counter() - start)
+        for metric, value in quality(ranked, item["relevant"], k).items():
+            totals[metric] += value
+    latencies = np.array(latencies) * 1000
+    report = {metric: round(total / len(queries), 4) for metric, total in totals.items()}
+    report.update((f"p{p}_ms", round(float(np.percentile(latencies, p)), 4)) for p in (50, 95, 99))
+    return report
+
+
+def regressions(report: dict, baseline: dict, max_quality_drop: float, max_slowdown: float,
+                latency_floor: float) -> list:
+    """Messages for every metric that regressed past the thresholds."""
+    problems = []
+    if baseline.get("k") != report["k"]:
+        return [f"baseline is for k={baseline.get('k')}, this run used k={report['k']}"]
+    for name, seconds in report["build_seconds"].items():
+        before = baseline["build_seconds"].get(name)
+        if before and seconds > before * (1 + max_slowdown) and seconds - before > BUILD_FLOOR:
+            problems.append(f"build {name}: {before:.2f}s -> {seconds:.2f}s")
+    for mode, metrics in report["modes"].items():
+        before = baseline["modes"].get(mode)
+        if before is None:
+            continue
+        for metric in QUALITY_METRICS:
+            if metrics[metric] < before[metric] - max_quality_drop:
+                problems.append(f"{mode} {metric}: {before[metric]:.3f} -> {metrics[metric]:.3f}")
+        for metric in CHECKED_LATENCY_METRICS:
+            if (metrics[metric] > before[metric] * (1 + max_slowdown)
+                    and metrics[metric] - before[metric] > latency_floor):
+                problems.append(f"{mode} {metric}: {before[metric]:.3f} -> {metrics[metric]:.3f}")
+    return problems
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark retrieval quality and latency")
+    parser.add_argument("-k", type=int, default=10, help="Pages per query (default: 10)")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated modes (default: all of {', '.join(MODES)})")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per query (default: 10)")
+    parser.add_argument("--build-runs", type=int, default=2, help="Index builds timed, best kept (default: 2)")
+    parser.add_argument("--queries", type=Path, default=QUERIES_FILE, help="Query set (default: benchmarks/queries.json)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Baseline for --check / --save-baseline")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if quality or speed regressed past the baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run as the baseline")
+    parser.add_argument("--max-quality-drop", type=float, default=0.02,
+                        help="Allowed absolute drop of recall, MRR or nDCG (default: 0.02)")
+    parser.add_argument("--max-slowdown", type=float, default=0.5,
+                        help="Allowed relative growth of latency or build time (default: 0.5 = 50%%)")
+    parser.add_argument("--latency-floor", type=float, default=0.5,
+                        help="Ignore latency growth smaller than this many ms (default: 0.5)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    modes = [mode for mode in args.modes.split(",") if mode]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(sorted(unknown))}")
+    queries = json.loads(args.queries.read_text(encoding="utf-8"))["queries"]
+
+    pages = list(iter_pages())
+    known = {page.url for page in pages}
+    missing = sorted({url for item in queries for url in item["relevant"] if url not in known})
+    if missing:
+        print(f"❌ Judged pages not in rag/: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(1)
+
+    build_seconds = {}
+    files, build_seconds["client"] = timed_build(lambda: build_client_index(pages), args.build_runs)
+    searches = {"substring": SubstringSearch(pages).search, "client": ClientSearch(files).search}
+    if {"keyword", "semantic", "hybrid"} & set(modes):
+        retriever, build_seconds["retrieval"] = timed_build(Retriever.from_corpus, args.build_runs)
+        for mode in ("keyword", "semantic", "hybrid"):
+            searches[mode] = retriever_search(retriever, mode)
+
+    report = {"k": args.k, "queries": len(queries), "build_seconds": build_seconds,
+              "modes": {mode: run_mode(searches[mode], queries, args.k, args.repeat) for mode in modes}}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{len(queries)} queries, k={args.k}, {args.repeat} timed runs each; build: "
+              + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in build_seconds.items()) + "\n")
+        print(f"{'mode':>10} {'recall@' + str(args.k):>10} {'MRR':>7} {'nDCG@' + str(args.k):>8} "
+              f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for mode, metrics in report["modes"].items():
+            print(f"{mode:>10} {metrics['recall']:>10.3f} {metrics['mrr']:>7.3f} {metrics['ndcg']:>8.3f} "
+                  f"{metrics['p50_ms']:>9.3f} {metrics['p95_ms']:>9.3f} {metrics['p99_ms']:>9.3f}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\n✓ Baseline saved to {args.baseline}", file=sys.stderr)
+
+    if args.check:
+        if not args.baseline.exists():
+            print(f"\n❌ No baseline at {args.baseline} (run with --save-baseline first)", file=sys.stderr)
+            sys.exit(1)
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        problems = regressions(report, baseline, args.max_quality_drop, args.max_slowdown, args.latency_floor)
+        if problems:
+            print(f"\n❌ {len(problems)} regression(s) against {args.baseline.name}:", file=sys.stderr)
+            for problem in problems:
+                print(f"  - {problem}", file=sys.stderr)
+            sys.exit(1)
+        print(f"\n✓ No regression against {args.baseline.name}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Build the search indexes for the RAG knowledge library.
+
+This script:
+1. Reads every page in rag/ (full text, not just metadata)
+2. Builds a tokenized inverted index with precomputed BM25 statistics
+3. Writes it as prefix-sharded JSON to website/assets/search/ for search.js,
+   with a typeahead prefix index of page titles and headings (raglib.typeahead)
+   and the vocabulary used for spelling correction (raglib.spelling)
+4. Builds the chunk-level BM25 and vector indexes used by raglib.retrieval
+   and the Q&A and code indexes used by raglib.faq and raglib.code_index,
+   tags each chunk with the glossary terms it mentions (raglib.glossary)
+   and builds the symmetric-delete spelling index (raglib.spelling)
+   (website/build/search-index/, needs NumPy; not published)
+
+Only files whose content changed are rewritten; stale shards are removed.
+With --incremental the retrieval index is updated instead of rebuilt: only
+pages edited since the last run are re-chunked, as a new segment (see
+raglib.segments); when segments pile up a merge is started in the
+background.
+
+Usage:
+    python website/scripts/build-search-index.py
+    python website/scripts/build-search-index.py --dry-run
+    python website/scripts/build-search-index.py --changed-file /tmp/changed.txt
+    python website/scripts/build-search-index.py --target client
+    python website/scripts/build-search-index.py --incremental
+    python website/scripts/build-search-index.py --target server --merge
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+from raglib.artifacts import ArtifactWriter
+from raglib.chunker import MAX_TOKENS
+from raglib.corpus import INDEX_DIR, iter_pages
+from raglib.search_index import CLIENT_INDEX_DIR, build_client_index, write_client_index
+
+
+def build_client(artifacts: ArtifactWriter) -> None:
+    print("Building client search index...")
+    start = time.perf_counter()
+    files = build_client_index(iter_pages())
+    write_client_index(files, artifacts)
+    meta = files["meta.json"]
+    print(f"✓ {meta['doc_count']} pages, {meta['term_count']} terms, {len(meta['shards'])} shards "
+          f"in {time.perf_counter() - start:.2f}s → {CLIENT_INDEX_DIR}")
+
+
+def build_server(artifacts: ArtifactWriter, chunk_tokens: int, ann: bool) -> None:
+    from raglib.incremental import build_index
+
+    print("Building retrieval index...")
+    start = time.perf_counter()
+    retriever = build_index(artifacts, max_tokens=chunk_tokens, ann=ann)
+    if retriever.ann is not None:
+        print(f"✓ IVF index: {retriever.ann.nlist} cells")
+    print(f"✓ {len(retriever.chunks)} chunks, {len(retriever.index.terms)} terms, "
+          f"{retriever.vectors.dim}-d vectors in {time.perf_counter() - start:.2f}s → {INDEX_DIR}")
+
+
+def update_server(artifacts: ArtifactWriter, chunk_tokens: int, ann: bool) -> None:
+    from raglib.incremental import update_index
+    from raglib.segments import needs_merge
+
+    print("Updating retrieval index...")
+    start = time.perf_counter()
+    summary = update_index(artifacts)
+    if summary is None:
+        print("No segmented index to update, doing a full build")
+        build_server(artifacts, chunk_tokens, ann)
+        return
+    manifest = summary["manifest"]
+    print(f"✓ {summary['pages']} changed pages: +{summary['added']} / -{summary['deleted']} chunks, "
+          f"{len(manifest['segments'])} segments in {time.perf_counter() - start:.2f}s → {INDEX_DIR}")
+    if needs_merge(manifest) and not artifacts.dry_run:
+        # Detached, so the pipeline does not wait for it; the lock serializes it with later updates
+        subprocess.Popen([sys.executable, __file__, "--target", "server", "--merge"],
+                         stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         start_new_session=True)
+        print("✓ Merging segments in the background")
+
+
+def merge_server(artifacts: ArtifactWriter) -> None:
+    from raglib.incremental import merge_index
+
+    print("Merging retrieval index segments...")
+    start = time.perf_counter()
+    manifest = merge_index(artifacts, force=True)
+    if manifest is None:
+        print("✓ Nothing to merge")
+        return
+    print(f"✓ {manifest['segments'][0]['chunks']} chunks in one segment "
+          f"in {time.perf_counter() - start:.2f}s → {INDEX_DIR}")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Build the search indexes")
+    parser.add_argument("--dry-run", action="store_true", help="Report which files would change without writing them")
+    parser.add_argument("--changed-file", help="Append the paths of changed artifacts to this file")
+    parser.add_argument("--verbose", action="store_true", help="List every artifact, not just a summary")
+    parser.add_argument("--target", choices=["all", "client", "server"], default="all",
+                        help="Which index to build (default: all)")
+    parser.add_argument("--chunk-tokens", type=int, default=MAX_TOKENS,
+                        help=f"Token budget per retrieval chunk (default: {MAX_TOKENS})")
+    parser.add_argument("--ann", action="store_true",
+                        help="Build the IVF vector index even for a small corpus (always built for large ones)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Update the retrieval index with the pages changed since the last run")
+    parser.add_argument("--merge", action="store_true",
+                        help="Merge the retrieval index segments into one")
+    args = parser.parse_args()
+
+    artifacts = ArtifactWriter(dry_run=args.dry_run)
+
+    if args.target in ("all", "client"):
+        build_client(artifacts)
+    if args.target in ("all", "server"):
+        try:
+            if args.merge:
+                merge_server(artifacts)
+            elif args.incremental:
+                update_server(artifacts, args.chunk_tokens, args.ann)
+            else:
+                build_server(artifacts, args.chunk_tokens, args.ann)
+        except ImportError as e:
+            if args.target == "server":
+                raise
+            print(f"⚠️  Skipping retrieval index ({e}); install it with: pip install numpy")
+
+    if args.verbose:
+        artifacts.print_summary()
+    if args.changed_file:
+        artifacts.write_changed_list(args.changed_file)
+
+    print(f"\n✅ Search index build complete! ({len(artifacts.changed)} of {len(artifacts.results)} files changed)")
+
+
+if __name__ == "__main__":
+    main()
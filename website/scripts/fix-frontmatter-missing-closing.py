@@ -11,59 +11,31 @@ Strategy:
   - If the file starts with --- and has no subsequent --- line:
     - Insert a closing --- just before the first obvious content line
       (heading, list item, numbered list) or before the first blank line.
+
+The same repair is part of `validate-frontmatter.py --fix`, which also fixes
+missing fields and permalinks; this script only closes unterminated headers.
 """
 
 from pathlib import Path
-import re
 
+from raglib.artifacts import atomic_write_text
+from raglib.frontmatter import EXCLUDED_FILES, split_frontmatter
 
-def needs_closing_frontmatter(path: Path) -> bool:
-    text = path.read_text(encoding="utf-8")
-    lines = text.splitlines()
-    if not lines:
-        return False
-    if lines[0].strip() != "---":
-        return False
 
-    for i in range(1, len(lines)):
-        if lines[i].strip() == "---":
-            # Already has a closing marker
-            return False
-    return True
+def needs_closing_frontmatter(path: Path) -> bool:
+    status, _, _ = split_frontmatter(path.read_text(encoding="utf-8"))
+    return status == "unclosed"
 
 
 def insert_closing_frontmatter(path: Path) -> bool:
-    text = path.read_text(encoding="utf-8")
-    lines = text.splitlines()
-    if not lines or lines[0].strip() != "---":
+    status, header_text, body = split_frontmatter(path.read_text(encoding="utf-8"))
+    if status != "unclosed":
         return False
 
-    # Find where to close frontmatter:
-    # - before first blank line
-    # - or before first likely content line (heading, list, numbered list)
-    closing_idx = None
-    for i in range(1, len(lines)):
-        stripped = lines[i].lstrip()
-
-        if stripped == "":
-            closing_idx = i
-            break
-
-        if re.match(r"^(#{1,6}\s|\- |\* |\d+\. )", stripped):
-            closing_idx = i
-            break
-
-    if closing_idx is None:
-        # Fall back to closing at end of file
-        closing_idx = len(lines)
-
-    # Insert closing --- at the chosen location if not already present there
-    if closing_idx > 0 and lines[closing_idx - 1].strip() == "---":
-        return False
-
-    lines.insert(closing_idx, "---")
-    new_text = "\n".join(lines) + "\n"
-    path.write_text(new_text, encoding="utf-8")
+    new_text = "---\n" + header_text + "\n---\n" + body
+    if not new_text.endswith("\n"):
+        new_text += "\n"
+    atomic_write_text(path, new_text)
     return True
 
 
@@ -73,18 +45,10 @@ def main() -> None:
         print("rag/ directory not found; nothing to do.")
         return
 
-    excluded = {
-        "rag-index.md",
-        "README.md",
-        "CONTRIBUTING.md",
-        "MAINTENANCE.md",
-        "code-examples-index.md",
-    }
-
     md_files = [
         f
         for f in rag_dir.rglob("*.md")
-        if f.name not in excluded
+        if f.name not in EXCLUDED_FILES
     ]
 
     fixed = []
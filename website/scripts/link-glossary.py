@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Find glossary terms in the RAG knowledge library and link their first mention.
+
+Terms (with synonyms and plurals) are read from rag/glossary/ and found in
+every page with one Aho-Corasick pass per page (see raglib/glossary.py);
+code, links, HTML and Liquid are skipped. By default the script reports the
+links it would add; --write adds them to the pages: the first mention of
+each term outside headings becomes a link to its definition.
+
+Usage:
+    python website/scripts/link-glossary.py
+    python website/scripts/link-glossary.py --folder integrations
+    python website/scripts/link-glossary.py --write
+    python website/scripts/link-glossary.py --json > glossary-mentions.json
+"""
+
+import argparse
+import json
+import time
+from collections import Counter
+
+from raglib.corpus import iter_pages
+from raglib.glossary import GlossaryMatcher, load_glossary
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Link the first mention of glossary terms")
+    parser.add_argument("--folder", help="Only pages in one rag/ folder (e.g. integrations)")
+    parser.add_argument("--write", action="store_true", help="Add the links to the pages")
+    parser.add_argument("--json", action="store_true", help="Print term mentions per page as JSON")
+    args = parser.parse_args()
+
+    terms = load_glossary()
+    matcher = GlossaryMatcher(terms)
+    start = time.perf_counter()
+    report = []
+    mentions: Counter = Counter()
+    for page in iter_pages():
+        if args.folder and page.folder != args.folder:
+            continue
+        found = matcher.terms_in(page.body)
+        mentions.update(terms[term].term for term in found)
+        body, added = matcher.link_first_occurrences(page.body, page.url)
+        report.append({"path": page.path, "terms": [terms[term].term for term in found], "links": added})
+        if args.write and added:
+            content = page.file_path.read_text(encoding="utf-8")
+            page.file_path.write_text(content[:len(content) - len(page.body)] + body, encoding="utf-8")
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+
+    links = sum(page["links"] for page in report)
+    action = "Added" if args.write else "Would add"
+    print(f"{len(terms)} terms, {len(report)} pages scanned in {elapsed:.2f}s")
+    print(f"{action} {links} links in {sum(1 for page in report if page['links'])} pages\n")
+    for term in terms:
+        print(f"  {mentions[term.term]:4}  {term.term}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""
+Shared helpers for the Salesforce RAG website scripts.
+
+The hyphenated scripts in website/scripts/ are the command-line entry points;
+this package holds the code they share. Scripts run as
+``python website/scripts/<script>.py`` already have website/scripts/ on
+sys.path, so they can simply ``import raglib``.
+"""
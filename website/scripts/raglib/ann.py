@@ -0,0 +1,181 @@
+"""
+Approximate nearest neighbour search: an IVF (inverted file) index.
+
+Vectors are clustered with spherical k-means into nlist cells. Each vector is
+stored once, in its cell, with cells laid out contiguously, so searching is:
+
+    1. score the query against the nlist centroids
+    2. take the nprobe best cells
+    3. score exactly against the vectors in those cells only
+
+Work per query is roughly (nlist + n * nprobe / nlist) dot products instead
+of n. nprobe trades recall for latency at query time; nlist is fixed at
+build time (default ~4 * sqrt(n)).
+
+The index is one raglib.indexfile container, memory-mapped, so loading
+reads only the header and a search only touches the cells it probes.
+"""
+
+import math
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .artifacts import ArtifactWriter
+from .indexfile import IndexFile, pack_index_file
+from .vectors import normalize_rows
+
+ANN_FILE = "ann-ivf.bin"
+
+KMEANS_ITERATIONS = 20
+# k-means trains on at most this many points per cell (a random sample)
+TRAIN_POINTS_PER_CELL = 64
+ASSIGN_BLOCK_ROWS = 65536
+DEFAULT_NPROBE = 8
+
+
+def default_nlist(count: int) -> int:
+    return max(1, min(count, int(round(4 * math.sqrt(count)))))
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the most similar centroid for every vector (blocked)."""
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+        block = np.asarray(vectors[start:start + ASSIGN_BLOCK_ROWS], dtype=np.float32)
+        labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def spherical_kmeans(vectors: np.ndarray, nlist: int, iterations: int = KMEANS_ITERATIONS,
+                     seed: int = 0) -> np.ndarray:
+    """Unit-norm centroids of nlist clusters (cosine k-means, deterministic for a seed)."""
+    rng = np.random.default_rng(seed)
+    count = len(vectors)
+    sample_size = min(count, nlist * TRAIN_POINTS_PER_CELL)
+    sample = np.asarray(vectors[np.sort(rng.choice(count, sample_size, replace=False))], dtype=np.float32)
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        labels = _assign(sample, centroids)
+        order = np.argsort(labels, kind="stable")
+        sizes = np.bincount(labels, minlength=nlist)
+        filled = np.flatnonzero(sizes)
+        sums = np.zeros_like(centroids)
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])[filled]
+        sums[filled] = np.add.reduceat(sample[order], starts, axis=0)
+        empty = np.flatnonzero(sizes == 0)
+        if len(empty):
+            # Re-seed empty cells with the points furthest from their centroid
+            fit = np.einsum("ij,ij->i", sample, centroids[labels])
+            sums[empty] = sample[np.argsort(fit)[:len(empty)]]
+        new_centroids = normalize_rows(sums)
+        if np.allclose(new_centroids, centroids, atol=1e-6):
+            break
+        centroids = new_centroids
+    return centroids
+
+
+class IvfIndex:
+    """
+    IVF index over L2-normalised vectors.
+
+    Usage:
+        ivf = IvfIndex.build(vectors)               # nlist ~ 4 * sqrt(n)
+        ivf.save(artifacts, INDEX_DIR)
+        ivf = IvfIndex.load(INDEX_DIR)              # memory-mapped
+        rows, scores = ivf.search(query_vectors, k=10, nprobe=8)[0]
+    """
+
+    def __init__(self, centroids: np.ndarray, offsets: np.ndarray, rows: np.ndarray,
+                 vectors: np.ndarray, nprobe: int = DEFAULT_NPROBE):
+        self.centroids = centroids   # (nlist, dim)
+        self.offsets = offsets       # (nlist + 1,) cell c is [offsets[c], offsets[c + 1])
+        self.rows = rows             # (n,) original row of each stored vector
+        self.vectors = vectors       # (n, dim) vectors grouped by cell
+        self.nprobe = nprobe
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, nlist: Optional[int] = None, seed: int = 0) -> "IvfIndex":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        nlist = nlist or default_nlist(len(vectors))
+        centroids = spherical_kmeans(vectors, nlist, seed=seed)
+        labels = _assign(vectors, centroids)
+        order = np.argsort(labels, kind="stable")
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(labels, minlength=nlist))
+        return cls(centroids, offsets, order.astype(np.int64), vectors[order])
+
+    def search(self, queries: np.ndarray, k: int = 10, mask: Optional[np.ndarray] = None,
+               nprobe: Optional[int] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Approximate top-k for a batch of (normalised) query vectors.
+
+        Same contract as VectorIndex.search: one (rows, scores) pair per
+        query, best first; rows are original row numbers. mask (over
+        original rows) drops rows from the results. A mask that selects no
+        more rows than a probe would read is searched exactly over its rows;
+        otherwise cells are probed nprobe at a time until k masked rows are
+        found, so a selective filter still fills the results.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        selected = None
+        if mask is not None and np.count_nonzero(mask) <= len(self.rows) * nprobe / self.nlist:
+            selected = np.flatnonzero(mask[self.rows])
+        cell_order = np.argsort(-(queries @ self.centroids.T), axis=1, kind="stable")
+
+        results = []
+        for query, cells in zip(queries, cell_order):
+            if selected is not None:
+                positions = selected
+            else:
+                positions = self._cell_positions(cells[:nprobe], mask)
+                probed = nprobe
+                while mask is not None and len(positions) < k and probed < self.nlist:
+                    positions = np.concatenate([positions, self._cell_positions(cells[probed:probed + nprobe], mask)])
+                    probed += nprobe
+            if not len(positions) or k <= 0:
+                results.append((np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)))
+                continue
+            scores = np.asarray(self.vectors[positions], dtype=np.float32) @ query
+            take = min(k, len(scores))
+            top = np.argpartition(-scores, take - 1)[:take]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            results.append((np.asarray(self.rows[positions[top]]), scores[top]))
+        return results
+
+    def _cell_positions(self, cells: np.ndarray, mask: Optional[np.ndarray]) -> np.ndarray:
+        """Stored positions of the vectors in cells, less those mask drops."""
+        ranges = [np.arange(self.offsets[c], self.offsets[c + 1]) for c in cells]
+        positions = np.concatenate(ranges) if ranges else np.empty(0, dtype=np.int64)
+        positions = positions.astype(np.int64, copy=False)
+        if mask is not None and len(positions):
+            positions = positions[mask[self.rows[positions]]]
+        return positions
+
+    def save(self, artifacts: ArtifactWriter, index_dir: Path) -> None:
+        """Write the index as one memory-mappable file (only if it changed)."""
+        artifacts.write_bytes(Path(index_dir) / ANN_FILE, self.to_bytes())
+
+    def to_bytes(self) -> bytes:
+        return pack_index_file({
+            "centroids": self.centroids.astype(np.float32),
+            "offsets": self.offsets.astype(np.int64),
+            "rows": np.asarray(self.rows, dtype=np.int64),
+            "vectors": np.asarray(self.vectors, dtype=np.float32),
+        }, meta={"kind": "ivf", "nprobe": self.nprobe})
+
+    @classmethod
+    def load(cls, index_dir: Path) -> "IvfIndex":
+        """Open a saved index; arrays are memory-mapped, not read."""
+        index_file = IndexFile.open(Path(index_dir) / ANN_FILE)
+        if index_file.meta.get("kind") != "ivf":
+            raise ValueError(f"{index_file.path} is not an IVF index file")
+        return cls(index_file.array("centroids"), index_file.array("offsets"), index_file.array("rows"),
+                   index_file.array("vectors"), index_file.meta["nprobe"])
@@ -0,0 +1,196 @@
+"""
+Write-if-changed, atomic output layer for generated artifacts.
+
+Generated files (rag-index.md, rag-library.json, the homepage, sitemaps)
+are only rewritten when their content actually changes. Volatile fields such
+as ``last_updated`` timestamps are left out of the comparison, so a run that
+changes nothing but the clock leaves the file - and its old timestamp -
+untouched: no git churn, no Jekyll rebuild.
+
+Writes go to a temp file in the target directory and are renamed into place,
+so readers never see a half-written artifact.
+"""
+
+import copy
+import filecmp
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+
+def _default_file_mode() -> int:
+    """Mode a plain open() would create files with (0666 minus the umask)."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+DEFAULT_FILE_MODE = _default_file_mode()
+
+
+def atomic_write_text(path: Path, content: str) -> None:
+    """Write a file via a temp file in the same directory and an atomic rename."""
+    atomic_write_bytes(path, content.encode("utf-8"))
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Binary counterpart of atomic_write_text."""
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # mkstemp creates 0600 files; keep the existing mode or use the default
+        os.chmod(tmp_name, path.stat().st_mode & 0o777 if path.exists() else DEFAULT_FILE_MODE)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def publish_if_changed(tmp_path: Path, path: Path) -> bool:
+    """
+    Move a finished temp file into place unless path already has the same bytes.
+
+    Returns True if path was (re)written; the temp file is removed either way.
+    """
+    tmp_path, path = Path(tmp_path), Path(path)
+    if path.exists() and filecmp.cmp(tmp_path, path, shallow=False):
+        tmp_path.unlink()
+        return False
+    os.replace(tmp_path, path)
+    return True
+
+
+def _drop_keys(data, dotted_keys: Iterable[str]):
+    """Copy of data with the given dotted keys (e.g. "metadata.last_updated") removed."""
+    data = copy.deepcopy(data)
+    for dotted in dotted_keys:
+        *parents, leaf = dotted.split(".")
+        node = data
+        for key in parents:
+            node = node.get(key) if isinstance(node, dict) else None
+            if node is None:
+                break
+        if isinstance(node, dict):
+            node.pop(leaf, None)
+    return data
+
+
+def _mask(text: str, volatile_patterns: Iterable[str]) -> str:
+    for pattern in volatile_patterns:
+        text = re.sub(pattern, "<volatile>", text, flags=re.MULTILINE)
+    return text
+
+
+class ArtifactWriter:
+    """
+    Write generated artifacts only when they change, and record what changed.
+
+    Usage:
+        artifacts = ArtifactWriter()
+        artifacts.write_text(INDEX_PATH, index_content)
+        artifacts.write_json(LIBRARY_PATH, library_data, volatile_keys=["metadata.last_updated"])
+        artifacts.changed  # paths actually rewritten
+    """
+
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        self.results: List[Tuple[Path, bool]] = []
+
+    @property
+    def changed(self) -> List[Path]:
+        return [path for path, was_changed in self.results if was_changed]
+
+    @property
+    def unchanged(self) -> List[Path]:
+        return [path for path, was_changed in self.results if not was_changed]
+
+    def record(self, path: Path, was_changed: bool) -> bool:
+        """Record the outcome for an artifact written elsewhere (e.g. a streamed sitemap)."""
+        self.results.append((Path(path), was_changed))
+        return was_changed
+
+    def write_text(self, path: Path, content: str, volatile_patterns: Iterable[str] = ()) -> bool:
+        """
+        Write content to path if it differs from what is there.
+
+        volatile_patterns are regexes (multiline) whose matches are ignored
+        when comparing. Returns True if the file was (or, in a dry run, would
+        be) written.
+        """
+        path = Path(path)
+        existing = self._read(path)
+        if existing is not None and _mask(existing, volatile_patterns) == _mask(content, volatile_patterns):
+            return self.record(path, False)
+
+        if not self.dry_run:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(path, content)
+        return self.record(path, True)
+
+    def write_json(self, path: Path, data, volatile_keys: Iterable[str] = (), indent: Optional[int] = 2,
+                   separators: Optional[Tuple[str, str]] = None) -> bool:
+        """
+        Write data as JSON if it differs from what is there, ignoring volatile_keys.
+
+        volatile_keys are dotted paths such as "metadata.last_updated".
+        """
+        path = Path(path)
+        volatile_keys = list(volatile_keys)
+        existing = self._read(path)
+        if existing is not None:
+            try:
+                old_data = json.loads(existing)
+            except ValueError:
+                old_data = None
+            if old_data is not None and _drop_keys(old_data, volatile_keys) == _drop_keys(data, volatile_keys):
+                return self.record(path, False)
+
+        content = json.dumps(data, indent=indent, separators=separators, ensure_ascii=False)
+        if not self.dry_run:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(path, content)
+        return self.record(path, True)
+
+    def write_bytes(self, path: Path, data: bytes) -> bool:
+        """Write binary data (e.g. a NumPy archive) to path if it differs from what is there."""
+        path = Path(path)
+        try:
+            if path.read_bytes() == data:
+                return self.record(path, False)
+        except FileNotFoundError:
+            pass
+
+        if not self.dry_run:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_bytes(path, data)
+        return self.record(path, True)
+
+    def write_changed_list(self, list_path: Path) -> None:
+        """Append the changed artifact paths (one per line) to list_path."""
+        with open(list_path, "a", encoding="utf-8") as f:
+            for path in self.changed:
+                f.write(f"{path}\n")
+
+    def print_summary(self) -> None:
+        """Print which artifacts changed and which were left untouched."""
+        verb = "Would write" if self.dry_run else "Wrote"
+        for path, was_changed in self.results:
+            if was_changed and not self.dry_run and not path.exists():
+                print(f"✓ Removed {path}")
+            elif was_changed:
+                print(f"✓ {verb} {path}")
+            else:
+                print(f"= Unchanged {path}")
+
+    @staticmethod
+    def _read(path: Path) -> Optional[str]:
+        try:
+            return path.read_text(encoding="utf-8")
+        except (FileNotFoundError, UnicodeDecodeError):
+            return None
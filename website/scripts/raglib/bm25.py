@@ -0,0 +1,141 @@
+"""
+Array-backed BM25 index.
+
+Postings are stored CSR-style in three flat NumPy arrays:
+
+    offsets[t] .. offsets[t + 1]   slice of the postings for term id t
+    doc_ids[i]                     document of posting i
+    weights[i]                     its full BM25 contribution,
+                                   idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg_len))
+
+Everything except the per-query sum is precomputed at build time, so scoring
+a query is one vectorised scatter-add per query term plus a partial sort.
+The raw term frequencies (tfs[i]) and document lengths are kept as well, so
+indexes built separately can be scored together with shared statistics
+(raglib.segments).
+"""
+
+import math
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .indexfile import StringTable
+
+K1 = 1.2
+B = 0.75
+# Term lookups remembered when the term dictionary is memory-mapped
+TERM_CACHE_SIZE = 65536
+
+
+class BM25Index:
+    """
+    BM25 over a fixed set of tokenized documents.
+
+    Usage:
+        index = BM25Index.build([["apex", "trigger"], ["flow"]])
+        doc_ids, scores = index.top_k(["trigger"], k=10)
+    """
+
+    def __init__(self, terms: Sequence[str], offsets: np.ndarray, doc_ids: np.ndarray,
+                 weights: np.ndarray, doc_count: int, tfs: Optional[np.ndarray] = None,
+                 lengths: Optional[np.ndarray] = None):
+        if isinstance(terms, StringTable):
+            # Memory-mapped and sorted: binary search in place of a dict
+            self.terms = terms
+            self._term_id = lru_cache(maxsize=TERM_CACHE_SIZE)(terms.index_of)
+        else:
+            self.terms = list(terms)
+            self._term_id = {term: i for i, term in enumerate(self.terms)}.get
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.doc_count = doc_count
+        self.tfs = tfs
+        self.lengths = lengths
+
+    @classmethod
+    def build(cls, documents: Iterable[List[str]], k1: float = K1, b: float = B) -> "BM25Index":
+        """Build from an iterable of token lists (one per document)."""
+        counts = [Counter(tokens) for tokens in documents]
+        doc_count = len(counts)
+        lengths = np.array([sum(c.values()) for c in counts], dtype=np.float64)
+        avg_length = lengths.mean() if doc_count and lengths.any() else 1.0
+        norms = k1 * (1 - b + b * lengths / avg_length)
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_id, counter in enumerate(counts):
+            for term, tf in counter.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        doc_ids = np.empty(sum(len(p) for p in postings.values()), dtype=np.int32)
+        weights = np.empty(len(doc_ids), dtype=np.float32)
+        all_tfs = np.empty(len(doc_ids), dtype=np.float32)
+        position = 0
+        for i, term in enumerate(terms):
+            entries = postings[term]
+            idf = math.log(1 + (doc_count - len(entries) + 0.5) / (len(entries) + 0.5))
+            ids = np.fromiter((doc_id for doc_id, _ in entries), dtype=np.int32, count=len(entries))
+            tfs = np.fromiter((tf for _, tf in entries), dtype=np.float64, count=len(entries))
+            end = position + len(entries)
+            doc_ids[position:end] = ids
+            all_tfs[position:end] = tfs
+            weights[position:end] = idf * tfs * (k1 + 1) / (tfs + norms[ids])
+            offsets[i + 1] = end
+            position = end
+        return cls(terms, offsets, doc_ids, weights, doc_count, all_tfs, lengths.astype(np.float32))
+
+    def term_ids(self, query_terms: Iterable[str]) -> List[int]:
+        """Distinct ids of the query terms the index knows."""
+        ids = []
+        for term in query_terms:
+            term_id = self._term_id(term)
+            if term_id is not None and term_id not in ids:
+                ids.append(term_id)
+        return ids
+
+    def scores(self, query_terms: Iterable[str], mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        BM25 score of every document for the query (float32, zeros if no match).
+
+        Postings of documents where mask is False are skipped, so they score 0.
+        """
+        scores = np.zeros(self.doc_count, dtype=np.float32)
+        for term_id in self.term_ids(query_terms):
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            doc_ids, weights = self.doc_ids[start:end], self.weights[start:end]
+            if mask is not None:
+                keep = mask[doc_ids]
+                doc_ids, weights = doc_ids[keep], weights[keep]
+            # doc ids are unique within a term, so plain fancy-index += is safe
+            scores[doc_ids] += weights
+        return scores
+
+    def top_k(self, query_terms: Iterable[str], k: int = 10,
+              mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The k best matching documents, best first.
+
+        mask is an optional boolean array over documents; documents where it
+        is False are never returned. Returns (doc_ids, scores); documents
+        that match no query term are left out, so fewer than k may come back.
+        """
+        return top_k_scores(self.scores(query_terms, mask), k)
+
+
+def top_k_scores(scores: np.ndarray, k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """The k highest non-zero scores as (doc_ids, scores), best first (scores is modified)."""
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    if mask is not None:
+        scores[~mask] = 0
+    candidates = np.flatnonzero(scores)
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    order = np.argsort(-scores[candidates], kind="stable")
+    candidates = candidates[order]
+    return candidates, scores[candidates]
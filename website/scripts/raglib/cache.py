@@ -0,0 +1,138 @@
+"""
+Query result cache for retrieval: bounded LRU with a time-to-live.
+
+Assistants ask the same questions over and over ("Queueable vs Batch", "how
+to bulkify triggers"), so search() keeps recent results. Keys are
+normalised queries plus every option that changes the results (k, folder,
+mode, ...). The normalised query is the sorted list of search terms the
+retrievers actually see (lowercased, stemmed, stopwords dropped), so
+"How do I bulkify Triggers?" and "bulkify trigger" share one entry. The
+retrievers are bag-of-words, so word order never changes their results.
+Glossary boosting is the exception: it matches glossary phrases in order
+("record type", not "type record"), so with glossary_boost on the key keeps
+the query's words in order (lowercased, whitespace collapsed).
+
+Each cache is tied to an index build id: when the id changes (the index was
+rebuilt, e.g. by update-rag-and-website.sh after sync-homepage.py), every
+entry is dropped on the next access.
+
+Usage:
+    cache = QueryCache(max_entries=1024, ttl=300)
+    key = query_key("How do I bulkify Triggers?", k=5, mode="hybrid")
+    results = cache.get_or_compute(key, lambda: retriever.search(...), build_id)
+    cache.stats()  # {"hits": ..., "misses": ..., "evictions": ..., ...}
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .text import tokenize
+
+MAX_ENTRIES = 1024
+TTL_SECONDS = 300.0
+
+
+def normalize_query(query: str) -> Tuple[str, ...]:
+    """The query as the retrievers see it: its search terms, sorted."""
+    return tuple(sorted(tokenize(query)))
+
+
+def query_key(query: str, **options) -> tuple:
+    """Cache key for a query and its search options (options must be hashable)."""
+    if options.get("glossary_boost"):
+        return (" ".join(query.lower().split()),) + tuple(sorted(options.items()))
+    return (normalize_query(query),) + tuple(sorted(options.items()))
+
+
+class QueryCache:
+    """
+    Thread-safe LRU + TTL cache with hit/miss counters.
+
+    max_entries bounds the size (least recently used entries go first); ttl
+    is the lifetime of an entry in seconds (None: no expiry). Passing a
+    build_id to get/put/get_or_compute that differs from the one the cached
+    entries were stored under clears the cache first.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl: Optional[float] = TTL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, not {max_entries}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.build_id: Optional[str] = None
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, build_id: Optional[str] = None, default: Any = None) -> Any:
+        """The cached value for key, or default (counted as a miss)."""
+        with self._lock:
+            self._check_build(build_id)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, build_id: Optional[str] = None) -> None:
+        with self._lock:
+            self._check_build(build_id)
+            expires = self.clock() + self.ttl if self.ttl is not None else float("inf")
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], build_id: Optional[str] = None) -> Any:
+        """Cached value for key, computing and storing it on a miss."""
+        missing = object()
+        value = self.get(key, build_id, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value, build_id)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters since creation, plus the current size and build id."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "build_id": self.build_id,
+        }
+
+    def _check_build(self, build_id: Optional[str]) -> None:
+        # Called with the lock held
+        if build_id is not None and build_id != self.build_id:
+            if self.build_id is not None:
+                self.invalidations += 1
+            self._entries.clear()
+            self.build_id = build_id
@@ -0,0 +1,369 @@
+"""
+Split pages into retrieval chunks along their heading tree and Q&A pairs.
+
+Each page is parsed into blocks (paragraphs, fenced code, headings) and the
+blocks into a heading tree. Chunks are then cut top-down:
+
+- a section that fits in the token budget is one chunk, subsections included;
+- a section that doesn't is emitted as its own text (packed into as many
+  chunks as needed) followed by each of its subsections, recursively;
+- a Q&A pair - a "### Q: ..." heading or a "**Q:** ..." paragraph plus its
+  answer - is always a chunk of its own, never merged with its neighbours.
+
+page_qa_pairs() extracts the same Q&A pairs as (question, answer) for the
+FAQ index (raglib.faq), and page_code_blocks() every fenced code block with
+its language and enclosing heading for the code index (raglib.code_index).
+
+Blocks are never split unless a single block is over budget. An oversized
+code block is cut between lines and every piece is re-fenced, so a chunk
+never contains half a fence.
+
+Chunk ids are "<path>#<heading anchors>@<content hash>": stable across
+rebuilds while the section keeps its place and content, and different as soon
+as either changes. Pages are processed one at a time, so memory is bounded by
+the largest page, not the corpus.
+"""
+
+import hashlib
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+from .corpus import Page, plain_text
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+FENCE_PATTERN = re.compile(r"^\s*(`{3,}|~{3,})")
+QUESTION_HEADING_PATTERN = re.compile(r"^Q\d*\s*[:.]", re.IGNORECASE)
+QUESTION_PARAGRAPH_PATTERN = re.compile(r"^\*\*(?:Q\d*|Question)\s*[:.]?\*\*\s*:?\s*(.*)", re.IGNORECASE)
+ANSWER_PREFIX_PATTERN = re.compile(r"^(?:\*\*(?:A\d*|Answer)\s*[:.]?\*\*\s*:?|A\d*\s*:)\s*", re.IGNORECASE)
+RELATIVE_URL_PATTERN = re.compile(r"\{\{\s*['\"]([^'\"]*)['\"]\s*\|\s*relative_url\s*\}\}")
+ANCHOR_STRIP_PATTERN = re.compile(r"[^\w\- ]")
+TOKEN_ESTIMATE_PATTERN = re.compile(r"\w+|[^\w\s]")
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+MAX_TOKENS = 400
+BREADCRUMB_SEP = " › "
+HASH_LENGTH = 10
+
+# Depth given to "**Q:**" paragraphs: below every real heading
+QUESTION_LEVEL = 7
+
+
+class Chunk(NamedTuple):
+    """One retrievable unit of a page."""
+    id: str            # path#heading/anchor/path@content-hash
+    path: str
+    url: str           # /rag/...#heading-anchor of the nearest heading
+    folder: str
+    title: str         # breadcrumb: page title › heading › subheading
+    text: str          # markdown source of the chunk
+    tokens: int        # estimated token count of text
+
+
+class QAPair(NamedTuple):
+    """A question and its answer, from a page's Q&A section."""
+    question: str      # plain text, "Q:" prefix removed
+    answer: str        # markdown source, "**A**:" prefix removed
+    path: str
+    url: str           # /rag/...#question-anchor
+    title: str         # breadcrumb, as in Chunk.title
+
+
+class CodeBlock(NamedTuple):
+    """A fenced code block and where it sits in its page."""
+    language: str      # info string of the opening fence, lowercased ("" if none)
+    code: str          # the lines between the fences
+    path: str
+    url: str           # /rag/...#anchor of the nearest heading
+    title: str         # breadcrumb of the enclosing headings, as in Chunk.title
+
+
+class _Block(NamedTuple):
+    kind: str          # "heading", "question", "fence" or "text"
+    lines: List[str]
+    level: int = 0     # heading level
+    heading: str = ""  # heading / question text
+
+
+class _Section:
+    """A heading (or question) with its own blocks and its subsections."""
+
+    def __init__(self, level: int, heading: Optional[str], anchor: str, question: bool = False):
+        self.level = level
+        self.heading = heading
+        self.anchor = anchor
+        self.question = question
+        self.blocks: List[_Block] = []
+        self.children: List["_Section"] = []
+        self._tokens: Optional[int] = None
+
+    def tokens(self) -> int:
+        """Estimated tokens of the section, subsections included (computed once the tree is built)."""
+        if self._tokens is None:
+            self._tokens = (sum(estimate_tokens(block.lines) for block in self.blocks)
+                            + sum(child.tokens() for child in self.children))
+        return self._tokens
+
+    def has_questions(self) -> bool:
+        """Whether any subsection, at any depth, is a Q&A pair."""
+        return any(child.question or child.has_questions() for child in self.children)
+
+    def all_blocks(self) -> Iterator[_Block]:
+        yield from self.blocks
+        for child in self.children:
+            yield from child.all_blocks()
+
+
+def estimate_tokens(lines: Iterable[str]) -> int:
+    """Approximate LLM token count: words and punctuation marks."""
+    return sum(len(TOKEN_ESTIMATE_PATTERN.findall(line)) for line in lines)
+
+
+def heading_anchor(heading: str) -> str:
+    """The id kramdown's GFM parser gives a heading (so chunk URLs jump to it)."""
+    text = plain_text(heading).strip().lower()
+    return ANCHOR_STRIP_PATTERN.sub("", text).replace(" ", "-")
+
+
+def _blocks(lines: Iterable[str]) -> Iterator[_Block]:
+    """Group markdown lines into headings, fenced code blocks and paragraphs."""
+    paragraph: List[str] = []
+    fence: List[str] = []
+    fence_marker = None
+
+    def flush() -> Iterator[_Block]:
+        if paragraph:
+            question = QUESTION_PARAGRAPH_PATTERN.match(paragraph[0])
+            if question:
+                yield _Block("question", list(paragraph), QUESTION_LEVEL, plain_text(question.group(1)).strip())
+            else:
+                yield _Block("text", list(paragraph))
+            paragraph.clear()
+
+    for line in lines:
+        line = RELATIVE_URL_PATTERN.sub(r"\1", line.rstrip("\n"))
+        if fence_marker is not None:
+            fence.append(line)
+            closing = FENCE_PATTERN.match(line)
+            if (closing and closing.group(1)[0] == fence_marker[0]
+                    and len(closing.group(1)) >= len(fence_marker)
+                    and not line.strip().strip(fence_marker[0])):
+                yield _Block("fence", fence)
+                fence, fence_marker = [], None
+            continue
+
+        opening = FENCE_PATTERN.match(line)
+        if opening:
+            yield from flush()
+            fence_marker = opening.group(1)
+            fence = [line]
+            continue
+
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            yield from flush()
+            yield _Block("heading", [line], len(heading.group(1)), heading.group(2))
+        elif not line.strip():
+            yield from flush()
+        else:
+            paragraph.append(line)
+
+    yield from flush()
+    if fence:
+        # Unclosed fence at the end of the page: close it so the chunk renders
+        yield _Block("fence", fence + [fence_marker])
+
+
+def _section_tree(blocks: Iterable[_Block]) -> _Section:
+    """Arrange blocks under their headings; returns the page-level root section."""
+    root = _Section(0, None, "")
+    stack = [root]
+    seen = {}
+    for block in blocks:
+        if block.kind in ("heading", "question"):
+            if block.kind == "heading":
+                anchor = heading_anchor(block.heading)
+                # kramdown numbers repeated ids: faq, faq-1, faq-2, ...
+                count = seen.get(anchor, 0)
+                seen[anchor] = count + 1
+                if count:
+                    anchor = f"{anchor}-{count}"
+                question = bool(QUESTION_HEADING_PATTERN.match(block.heading))
+            else:
+                anchor, question = "", True
+            while stack[-1].level >= block.level:
+                stack.pop()
+            section = _Section(block.level, block.heading, anchor, question)
+            section.blocks.append(block)
+            stack[-1].children.append(section)
+            stack.append(section)
+        else:
+            stack[-1].blocks.append(block)
+    return root
+
+
+def _split_block(block: _Block, max_tokens: int) -> Iterator[_Block]:
+    """Cut an over-budget block into pieces that fit (fences stay fenced)."""
+    if block.kind == "fence":
+        opening, closing = block.lines[0], block.lines[-1]
+        budget = max(max_tokens - estimate_tokens([opening, closing]), 1)
+        piece: List[str] = []
+        piece_tokens = 0
+        for line in block.lines[1:-1]:
+            tokens = estimate_tokens([line])
+            if piece and piece_tokens + tokens > budget:
+                yield _Block("fence", [opening] + piece + [closing])
+                piece, piece_tokens = [], 0
+            piece.append(line)
+            piece_tokens += tokens
+        yield _Block("fence", [opening] + piece + [closing])
+        return
+
+    # Prose: by line, then by sentence, then (for a giant sentence) by word
+    units: List[str] = []
+    for line in block.lines:
+        if estimate_tokens([line]) <= max_tokens:
+            units.append(line)
+            continue
+        for sentence in SENTENCE_END_PATTERN.split(line):
+            words = sentence.split(" ")
+            while words:
+                take = 1
+                while take < len(words) and estimate_tokens([" ".join(words[:take + 1])]) <= max_tokens:
+                    take += 1
+                units.append(" ".join(words[:take]))
+                words = words[take:]
+    piece = []
+    piece_tokens = 0
+    for unit in units:
+        tokens = estimate_tokens([unit])
+        if piece and piece_tokens + tokens > max_tokens:
+            yield _Block(block.kind, piece)
+            piece, piece_tokens = [], 0
+        piece.append(unit)
+        piece_tokens += tokens
+    if piece:
+        yield _Block(block.kind, piece)
+
+
+def _pack(blocks: Iterable[_Block], max_tokens: int) -> Iterator[List[_Block]]:
+    """Greedily group consecutive blocks into lists that fit the budget."""
+    group: List[_Block] = []
+    group_tokens = 0
+    for block in blocks:
+        tokens = estimate_tokens(block.lines)
+        if tokens <= max_tokens:
+            pieces = [block]
+        elif group and all(b.kind == "heading" for b in group):
+            # Leave room for the pending heading, so it isn't left in a chunk of its own
+            pieces = list(_split_block(block, max(max_tokens - group_tokens, 1)))
+        else:
+            pieces = list(_split_block(block, max_tokens))
+        for piece in pieces:
+            tokens = estimate_tokens(piece.lines)
+            if group and group_tokens + tokens > max_tokens:
+                yield group
+                group, group_tokens = [], 0
+            group.append(piece)
+            group_tokens += tokens
+    if group:
+        yield group
+
+
+def _chunk_groups(section: _Section, trail: List[_Section], max_tokens: int) -> Iterator[tuple]:
+    """Yield (trail, blocks) for each chunk of section, in document order."""
+    trail = trail + [section] if section.heading is not None else trail
+    if not section.has_questions() and section.tokens() <= max_tokens:
+        yield trail, list(section.all_blocks())
+        return
+    for group in _pack(section.blocks, max_tokens):
+        yield trail, group
+    for child in section.children:
+        yield from _chunk_groups(child, trail, max_tokens)
+
+
+def page_chunks(page: Page, max_tokens: int = MAX_TOKENS) -> Iterator[Chunk]:
+    """Yield the chunks of one page."""
+    root = _section_tree(_blocks(page.body.splitlines()))
+    emitted = set()
+    for trail, blocks in _chunk_groups(root, [], max_tokens):
+        # Nothing but headings (e.g. "## Q&A" right before its first "### Q:")
+        if all(block.kind == "heading" for block in blocks):
+            continue
+        text = "\n\n".join("\n".join(block.lines) for block in blocks)
+
+        anchors = "/".join(section.anchor or heading_anchor(section.heading) for section in trail)
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:HASH_LENGTH]
+        chunk_id = f"{page.path}#{anchors}@{digest}"
+        # Identical text under the same heading path (rare): keep ids unique
+        suffix = 1
+        while chunk_id in emitted:
+            suffix += 1
+            chunk_id = f"{page.path}#{anchors}@{digest}-{suffix}"
+        emitted.add(chunk_id)
+
+        yield Chunk(
+            id=chunk_id,
+            path=page.path,
+            url=_trail_url(page, trail),
+            folder=page.folder,
+            title=_breadcrumb(page, trail),
+            text=text,
+            tokens=estimate_tokens(text.splitlines()),
+        )
+
+
+def iter_chunks(pages: Iterable[Page], max_tokens: int = MAX_TOKENS) -> Iterator[Chunk]:
+    """Chunks of every page, one page at a time."""
+    for page in pages:
+        yield from page_chunks(page, max_tokens)
+
+
+def _breadcrumb(page: Page, trail: List[_Section]) -> str:
+    # A level-1 heading usually repeats the page title
+    crumbs = [page.title] + [plain_text(s.heading).strip() for s in trail if s.heading != page.title]
+    return BREADCRUMB_SEP.join(crumbs)
+
+
+def _trail_url(page: Page, trail: List[_Section]) -> str:
+    url_anchor = next((section.anchor for section in reversed(trail) if section.anchor), "")
+    return f"{page.url}#{url_anchor}" if url_anchor else page.url
+
+
+def page_code_blocks(page: Page) -> Iterator[CodeBlock]:
+    """Yield the fenced code blocks of one page, in order."""
+
+    def walk(section: _Section, trail: List[_Section]) -> Iterator[CodeBlock]:
+        trail = trail + [section] if section.heading is not None else trail
+        for block in section.blocks:
+            if block.kind == "fence":
+                info = FENCE_PATTERN.sub("", block.lines[0], count=1).strip().split()
+                yield CodeBlock(info[0].lower() if info else "", "\n".join(block.lines[1:-1]), page.path,
+                                _trail_url(page, trail), _breadcrumb(page, trail))
+        for child in section.children:
+            yield from walk(child, trail)
+
+    yield from walk(_section_tree(_blocks(page.body.splitlines())), [])
+
+
+def page_qa_pairs(page: Page) -> Iterator[QAPair]:
+    """Yield the Q&A pairs of one page (questions without an answer are skipped)."""
+
+    def walk(section: _Section, trail: List[_Section]) -> Iterator[QAPair]:
+        trail = trail + [section] if section.heading is not None else trail
+        if section.question:
+            question_block, *answer_blocks = list(section.all_blocks())
+            if question_block.kind == "question":
+                # "**Q:** ..." paragraph: the answer may start on its next line
+                question = question_block.heading
+                answer_blocks.insert(0, _Block("text", question_block.lines[1:]))
+            else:
+                question = plain_text(QUESTION_HEADING_PATTERN.sub("", section.heading, count=1)).strip()
+            answer = "\n\n".join("\n".join(block.lines) for block in answer_blocks if block.lines)
+            answer = ANSWER_PREFIX_PATTERN.sub("", answer.strip(), count=1)
+            if question and answer:
+                yield QAPair(question, answer, page.path, _trail_url(page, trail), _breadcrumb(page, trail))
+            return
+        for child in section.children:
+            yield from walk(child, trail)
+
+    yield from walk(_section_tree(_blocks(page.body.splitlines())), [])
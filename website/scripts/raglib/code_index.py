@@ -0,0 +1,237 @@
+"""
+Code snippet index: every fenced code block in rag/, looked up by identifier.
+
+code-examples/ (Apex, LWC, Flow, integrations, ...) is the most copied part
+of the library, but plain_text() drops code fences, so BM25 never sees a
+class or method name. This index keeps every fenced block
+(raglib.chunker.page_code_blocks) with its language tag and enclosing
+heading, keyed by the identifiers in the code:
+
+    Database.executeBatch    database.executebatch, database, executebatch,
+                             execute, batch
+    @wire(getRecord, ...)    @wire, wire, getrecord, get, record
+    implements Queueable     implements queueable, queueable
+
+Keys are lowercased; dotted names are also split on dots, and every part on
+camelCase and underscores. Keys are stored sorted with their postings laid
+out in the same order, so an exact lookup is one binary search and a prefix
+lookup ("Database.exec") is two binary searches and one contiguous slice of
+postings: well under a millisecond either way.
+
+The index is built by build-search-index.py into CODE_INDEX_FILE in
+INDEX_DIR (a raglib.indexfile container).
+
+Usage:
+    code = CodeIndex.load()
+    code.lookup("Database.executeBatch")
+    code.lookup("implements Queueable", language="apex")
+    code.lookup("@wi", prefix=True)
+"""
+
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from .artifacts import ArtifactWriter
+from .chunker import CodeBlock, page_code_blocks
+from .corpus import INDEX_DIR, iter_pages
+from .indexfile import IndexFile, pack_index_file
+
+CODE_INDEX_FILE = "code.idx"
+
+IDENTIFIER_PATTERN = re.compile(r"@?[A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*)*")
+DECLARATION_PATTERN = re.compile(
+    r"\b(implements|extends)\s+([\w.$]+(?:\s*<[^>{]*>)?(?:\s*,\s*[\w.$]+(?:\s*<[^>{]*>)?)*)")
+WORD_PART_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+# Fence info strings that name the same language
+LANGUAGE_ALIASES = {"js": "javascript", "cls": "apex", "htm": "html", "sh": "bash", "shell": "bash",
+                    "yml": "yaml", "soql": "sql"}
+
+_FIELDS = ("language", "code", "path", "url", "title")
+# Sorts after every character a key can contain, for prefix ranges
+_KEY_END = "\U0010ffff"
+
+
+class CodeMatch(NamedTuple):
+    language: str
+    code: str
+    path: str
+    url: str           # /rag/...#anchor of the enclosing heading
+    title: str         # breadcrumb of the enclosing headings
+    score: int         # occurrences of the matched keys in the block
+
+
+def normalize_language(language: str) -> str:
+    language = language.lower()
+    return LANGUAGE_ALIASES.get(language, language)
+
+
+def identifier_keys(identifier: str) -> List[str]:
+    """Lookup keys of one identifier: itself, its dotted segments and their camelCase parts."""
+    keys = [identifier.lower()]
+    segments = identifier.lstrip("@").split(".")
+    for segment in segments:
+        if len(segments) > 1 or identifier.startswith("@"):
+            keys.append(segment.lower())
+        parts = WORD_PART_PATTERN.findall(segment)
+        if len(parts) > 1:
+            keys.extend(part.lower() for part in parts if len(part) > 1)
+    return keys
+
+
+def code_keys(code: str) -> Counter:
+    """Every lookup key of a code block, with its number of occurrences."""
+    keys: Counter = Counter()
+    for identifier in IDENTIFIER_PATTERN.findall(code):
+        keys.update(identifier_keys(identifier))
+    for keyword, names in DECLARATION_PATTERN.findall(code):
+        for name in re.sub(r"<[^>]*>", "", names).split(","):
+            keys[f"{keyword} {name.strip().lower()}"] += 1
+    return keys
+
+
+class CodeIndex:
+    """
+    Fenced code blocks with a sorted identifier-key index.
+
+    Build with CodeIndex.build(blocks) (or from_corpus()), then save();
+    load() maps the saved file.
+    """
+
+    def __init__(self, fields: Dict[str, Sequence[str]], keys: Sequence[str], offsets: np.ndarray,
+                 block_ids: np.ndarray, counts: np.ndarray):
+        self.fields = fields
+        self.keys = keys
+        self.offsets = offsets
+        self.block_ids = block_ids
+        self.counts = counts
+        self.languages = sorted(set(fields["language"]))
+        codes = {language: i for i, language in enumerate(self.languages)}
+        self.language_codes = np.array([codes[language] for language in fields["language"]], dtype=np.int16)
+
+    def __len__(self) -> int:
+        return len(self.fields["code"])
+
+    @classmethod
+    def build(cls, blocks: Iterable[CodeBlock]) -> "CodeIndex":
+        blocks = [block._replace(language=normalize_language(block.language)) for block in blocks]
+        postings: Dict[str, List[tuple]] = {}
+        for block_id, block in enumerate(blocks):
+            for key, count in code_keys(block.code).items():
+                postings.setdefault(key, []).append((block_id, count))
+        keys = sorted(postings)
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(postings[key]) for key in keys])
+        flat = [posting for key in keys for posting in postings[key]]
+        block_ids = np.array([block_id for block_id, _ in flat], dtype=np.int32)
+        counts = np.array([min(count, 65535) for _, count in flat], dtype=np.uint16)
+        fields = {name: [getattr(block, name) for block in blocks] for name in _FIELDS}
+        return cls(fields, keys, offsets, block_ids, counts)
+
+    @classmethod
+    def from_corpus(cls) -> "CodeIndex":
+        return cls.build(block for page in iter_pages() for block in page_code_blocks(page))
+
+    @classmethod
+    def load(cls, index_dir: Path = INDEX_DIR) -> "CodeIndex":
+        """Open the index written by save(); raises FileNotFoundError if there is none."""
+        index_file = IndexFile.open(Path(index_dir) / CODE_INDEX_FILE)
+        fields = {name: index_file.strings(name) for name in _FIELDS}
+        return cls(fields, index_file.strings("keys"), index_file.array("offsets"),
+                   index_file.array("block_ids"), index_file.array("counts"))
+
+    def to_bytes(self) -> bytes:
+        strings = {name: list(values) for name, values in self.fields.items()}
+        strings["keys"] = list(self.keys)
+        arrays = {"offsets": self.offsets, "block_ids": self.block_ids, "counts": self.counts}
+        return pack_index_file(arrays, strings, {"kind": "code", "blocks": len(self)})
+
+    def save(self, artifacts: ArtifactWriter, index_dir: Path = INDEX_DIR) -> None:
+        artifacts.write_bytes(Path(index_dir) / CODE_INDEX_FILE, self.to_bytes())
+
+    def block(self, i: int) -> CodeBlock:
+        return CodeBlock(*(self.fields[name][i] for name in _FIELDS))
+
+    def blocks(self) -> List[CodeBlock]:
+        return [self.block(i) for i in range(len(self))]
+
+    def _lower_bound(self, value: str) -> int:
+        """Position of the first key >= value."""
+        low, high = 0, len(self.keys)
+        while low < high:
+            middle = (low + high) // 2
+            if self.keys[middle] < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _key_range(self, key: str, prefix: bool) -> tuple:
+        """Range of key rows equal to key (or starting with it)."""
+        low = self._lower_bound(key)
+        if prefix:
+            return low, self._lower_bound(key + _KEY_END)
+        return low, low + 1 if low < len(self.keys) and self.keys[low] == key else low
+
+    def _postings(self, key: str, prefix: bool) -> np.ndarray:
+        """Occurrences of key (or of every key with that prefix) per block."""
+        low, high = self._key_range(key, prefix)
+        start, end = int(self.offsets[low]), int(self.offsets[high])
+        return np.bincount(self.block_ids[start:end], weights=self.counts[start:end], minlength=len(self))
+
+    def lookup(self, query: str, language: Optional[str] = None, prefix: bool = False,
+               k: int = 10) -> List[CodeMatch]:
+        """
+        Blocks containing query, most occurrences first.
+
+        query is an identifier ("Database.executeBatch", "@wire"), a
+        declaration ("implements Queueable") or several identifiers, all of
+        which must occur. prefix matches keys starting with the (last)
+        identifier. language restricts results to one fence language.
+        """
+        query = " ".join(query.split()).lower()
+        if not query:
+            return []
+        # A declaration ("implements queueable") is a key of its own; otherwise one key per identifier
+        low, high = self._key_range(query, prefix)
+        terms = [query] if high > low else query.split()
+        scores = None
+        for i, term in enumerate(terms):
+            occurrences = self._postings(term, prefix and i == len(terms) - 1)
+            scores = occurrences if scores is None else (scores + occurrences) * ((scores > 0) & (occurrences > 0))
+        if language is not None:
+            language = normalize_language(language)
+            if language not in self.languages:
+                return []
+            scores = np.where(self.language_codes == self.languages.index(language), scores, 0)
+        found = np.flatnonzero(scores)
+        order = found[np.lexsort((found, -scores[found]))][:k]
+        return [CodeMatch(*self.block(int(i)), int(scores[i])) for i in order]
+
+
+_default_code_index: Optional[CodeIndex] = None
+_code_file_stat = None
+
+
+def default_code_index() -> CodeIndex:
+    """The index lookup() uses: the built one if present, else built from rag/ (reloaded when rebuilt)."""
+    global _default_code_index, _code_file_stat
+    try:
+        stat = os.stat(INDEX_DIR / CODE_INDEX_FILE)
+        file_stat = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        file_stat = None
+    if _default_code_index is None or file_stat != _code_file_stat:
+        _default_code_index = CodeIndex.load() if file_stat is not None else CodeIndex.from_corpus()
+        _code_file_stat = file_stat
+    return _default_code_index
+
+
+def lookup(query: str, language: Optional[str] = None, prefix: bool = False, k: int = 10) -> List[CodeMatch]:
+    """Look up code blocks by identifier (see CodeIndex.lookup)."""
+    return default_code_index().lookup(query, language, prefix, k)
@@ -0,0 +1,160 @@
+"""
+Token-budgeted context for LLM prompts: a diverse set of chunks, with citations.
+
+The top k chunks of a search often say the same thing several times: a
+guide section, its summary and the Q&A about it. Put into a prompt as they
+are, they spend the token budget on repeats. pack_context() takes a deep
+candidate pool instead (Retriever.candidates, CANDIDATES chunks) and picks
+from it greedily by maximal marginal relevance:
+
+    gain = (1 - diversity) * relevance - diversity * (max similarity to the chunks picked so far)
+
+relevance is the retrieval score scaled to 0..1 over the pool, and
+similarity is the cosine of the stored chunk embeddings. Each pick costs a
+single matrix-vector product over the pool, so packing hundreds of
+candidates takes a few milliseconds. A chunk is picked only if it fits in
+what is left of the budget: its tokens (Chunk.tokens, counted by the chunker
+at build time) plus its citation lines. Smaller chunks further down the pool
+can still fill the rest.
+
+The picked chunks are then put back in reading order. Pages come in the
+order of their best chunk, and a page's chunks come in page order. Each
+chunk is numbered, and a Sources list maps each number to the chunk's
+/rag/... permalink. An index built without vectors has no similarities, so
+its pool is packed in relevance order.
+
+Usage:
+    context = pack_context(retriever, "bulkify trigger", budget=1500)
+    context.text       # "[1] Trigger Patterns › Bulkification\\n...\\n\\nSources:\\n[1] /rag/...#bulkification"
+    context.passages   # [Passage(citation=1, id=..., url="/rag/...", ...), ...]
+"""
+
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from .chunker import Chunk, estimate_tokens
+
+DEFAULT_BUDGET = 2000
+CANDIDATES = 100
+# Weight of redundancy against relevance (0: plain relevance order)
+DIVERSITY = 0.3
+SOURCES_HEADING = "Sources:"
+
+
+class Passage(NamedTuple):
+    """One chunk of a context."""
+    citation: int      # its [n] in the context text
+    id: str
+    url: str           # /rag/...#heading-anchor
+    title: str
+    text: str
+    tokens: int        # text plus citation lines
+    score: float       # retrieval score
+
+
+class Context(NamedTuple):
+    """Passages packed into a token budget and rendered for a prompt."""
+    query: str
+    text: str
+    tokens: int        # estimated, as Chunk.tokens
+    budget: int
+    passages: List[Passage]
+
+
+def _citation_lines(citation: int, chunk: Chunk) -> List[str]:
+    """The heading line of a passage and its line in the Sources list."""
+    return [f"[{citation}] {chunk.title}", f"[{citation}] {chunk.url}"]
+
+
+def mmr_select(relevance: np.ndarray, vectors: Optional[np.ndarray], costs: np.ndarray, budget: int,
+               diversity: float = DIVERSITY, price: Optional[Callable[[int], int]] = None) -> List[int]:
+    """
+    Indexes of the candidates picked by budgeted maximal marginal relevance, in pick order.
+
+    relevance (0..1) and costs are per candidate; vectors are their
+    normalised embeddings (None: no redundancy, relevance order). price(i),
+    if given, is the full cost of candidate i, asked once it is the best
+    pick; costs must not exceed it.
+    """
+    relevance = np.asarray(relevance, dtype=np.float32)
+    costs = np.asarray(costs, dtype=np.int64)
+    available = costs <= budget
+    redundancy = np.zeros(len(relevance), dtype=np.float32)
+    picked: List[int] = []
+    remaining = budget
+    while available.any():
+        gain = np.where(available, (1 - diversity) * relevance - diversity * redundancy, -np.inf)
+        best = int(np.argmax(gain))
+        available[best] = False
+        cost = int(costs[best]) if price is None else price(best)
+        if cost > remaining:
+            continue
+        picked.append(best)
+        remaining -= cost
+        available &= costs <= remaining
+        if vectors is not None:
+            redundancy = np.maximum(redundancy, vectors @ vectors[best])
+    return picked
+
+
+def pack_context(retriever, query: str, budget: int = DEFAULT_BUDGET, candidates: int = CANDIDATES,
+                 diversity: float = DIVERSITY, mode: Optional[str] = None, folder: Optional[str] = None,
+                 tags: Optional[Sequence[str]] = None, spellcheck: bool = False,
+                 timings: Optional[Dict[str, float]] = None) -> Context:
+    """
+    The most relevant, least redundant chunks for query that fit in budget tokens.
+
+    candidates is the size of the pool ranked by retriever.candidates()
+    (mode defaults to hybrid if the index has vectors, else keyword; folder,
+    tags and spellcheck as for Retriever.search). diversity trades
+    relevance for coverage (0: top chunks in rank order). If a timings dict
+    is passed, it also receives "packing" and a "total" covering both (ms).
+    """
+    timings = {} if timings is None else timings
+    start = time.perf_counter()
+    if mode is None:
+        mode = "hybrid" if retriever.vectors is not None else "keyword"
+    rows, scores = retriever.candidates(query, candidates, folder, mode, tags=tags, spellcheck=spellcheck,
+                                        timings=timings)
+    packing = time.perf_counter()
+    rows = np.asarray(rows, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float32)
+    picked: List[int] = []
+    chunks: Dict[int, Chunk] = {}
+    if len(rows):
+        low, high = float(scores.min()), float(scores.max())
+        relevance = (scores - low) / (high - low) if high > low else np.ones(len(rows), dtype=np.float32)
+        vectors = retriever.vectors.gather(rows) if retriever.vectors is not None else None
+
+        def price(i: int) -> int:
+            chunk = chunks[i] = retriever.chunks[int(rows[i])]
+            return chunk.tokens + estimate_tokens(_citation_lines(0, chunk))
+
+        available = budget - estimate_tokens([SOURCES_HEADING])
+        picked = mmr_select(relevance, vectors, retriever.token_counts[rows], available, diversity, price)
+
+    # Reading order: pages by their best pick, then each page's chunks in page order
+    page_best: Dict[str, float] = {}
+    for i in picked:
+        page_best[chunks[i].path] = max(page_best.get(chunks[i].path, -np.inf), float(scores[i]))
+    page_chunks = retriever.page_chunks or {}
+
+    def position(i: int) -> int:
+        ids = page_chunks.get(chunks[i].path)
+        return ids.index(chunks[i].id) if ids and chunks[i].id in ids else int(rows[i])
+
+    order = sorted(picked, key=lambda i: (-page_best[chunks[i].path], chunks[i].path, position(i)))
+    passages = []
+    for citation, i in enumerate(order, 1):
+        chunk = chunks[i]
+        tokens = chunk.tokens + estimate_tokens(_citation_lines(citation, chunk))
+        passages.append(Passage(citation, chunk.id, chunk.url, chunk.title, chunk.text, tokens, float(scores[i])))
+    text = "\n\n".join(f"[{passage.citation}] {passage.title}\n{passage.text.strip()}" for passage in passages)
+    if passages:
+        text += "\n\n" + "\n".join([SOURCES_HEADING] + [f"[{p.citation}] {p.url}" for p in passages])
+    timings["packing"] = (time.perf_counter() - packing) * 1000
+    timings["total"] = (time.perf_counter() - start) * 1000
+    tokens = sum(passage.tokens for passage in passages) + (estimate_tokens([SOURCES_HEADING]) if passages else 0)
+    return Context(query, text, tokens, budget, passages)
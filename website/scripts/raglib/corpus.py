@@ -0,0 +1,100 @@
+"""
+Read the rag/ knowledge corpus as pages of plain searchable text.
+
+Used by every index builder so they all see the same set of pages, the same
+URLs and the same cleaned text.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple
+
+from .frontmatter import parse_header, split_frontmatter, FrontmatterError, expected_permalink
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
+RAG_DIR = BASE_DIR / "rag"
+
+# Server-side search indexes (not published with the site)
+INDEX_DIR = BASE_DIR / "website" / "build" / "search-index"
+
+# Same exclusions as sync-homepage.py: generated and meta files are not pages
+EXCLUDE_FILES = {"README.md", "CONTRIBUTING.md", "MAINTENANCE.md", "rag-index.md", "index.md"}
+EXCLUDE_DIRS = {"meta"}
+
+LIQUID_PATTERN = re.compile(r"\{\{.*?\}\}|\{%.*?%\}", re.DOTALL)
+HTML_TAG_PATTERN = re.compile(r"<[^>\n]+>")
+MARKDOWN_LINK_PATTERN = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+EMPHASIS_PATTERN = re.compile(r"(\*\*|__|\*|`)")
+
+
+class Page(NamedTuple):
+    """One knowledge page."""
+    path: str          # relative to rag/, forward slashes
+    url: str           # /rag/... permalink
+    folder: str
+    title: str
+    frontmatter: Dict
+    body: str          # markdown body without frontmatter
+    file_path: Path
+
+
+def page_url(rel_path: str, frontmatter: Dict) -> str:
+    """Permalink from frontmatter if it is a /rag/ URL, else derived from the path."""
+    permalink = frontmatter.get("permalink")
+    if isinstance(permalink, str) and permalink.startswith("/rag/"):
+        return permalink
+    return expected_permalink(rel_path)
+
+
+def read_page(file_path: Path, rag_dir: Path = RAG_DIR) -> Page:
+    """Read one markdown file as a Page."""
+    rel_path = file_path.relative_to(rag_dir).as_posix()
+    content = file_path.read_text(encoding="utf-8")
+    status, header_text, body = split_frontmatter(content)
+    frontmatter = {}
+    if status == "ok":
+        try:
+            frontmatter = parse_header(header_text)
+        except FrontmatterError:
+            frontmatter = {}
+    else:
+        body = content
+
+    title = frontmatter.get("title")
+    if not isinstance(title, str) or not title:
+        heading = re.search(r"^#{1,2}\s+(.+)$", body, re.MULTILINE)
+        title = heading.group(1).strip() if heading else Path(rel_path).stem.replace("-", " ").title()
+
+    parts = rel_path.split("/")
+    folder = parts[0] if len(parts) > 1 else "root"
+    return Page(rel_path, page_url(rel_path, frontmatter), folder, title, frontmatter, body, file_path)
+
+
+def iter_page_files(rag_dir: Path = RAG_DIR) -> Iterator[Path]:
+    """Paths of every knowledge page under rag/, in path order (without reading them)."""
+    for file_path in sorted(rag_dir.rglob("*.md")):
+        if file_path.name in EXCLUDE_FILES:
+            continue
+        if any(part in EXCLUDE_DIRS for part in file_path.relative_to(rag_dir).parts):
+            continue
+        yield file_path
+
+
+def iter_pages(rag_dir: Path = RAG_DIR) -> Iterator[Page]:
+    """Yield every knowledge page under rag/, in path order, one file at a time."""
+    for file_path in iter_page_files(rag_dir):
+        yield read_page(file_path, rag_dir)
+
+
+def plain_text(markdown: str) -> str:
+    """
+    Markdown body reduced to searchable text.
+
+    Liquid tags, HTML tags and link targets are removed; link text, code and
+    prose are kept.
+    """
+    text = LIQUID_PATTERN.sub(" ", markdown)
+    text = HTML_TAG_PATTERN.sub(" ", text)
+    text = MARKDOWN_LINK_PATTERN.sub(r"\1", text)
+    text = EMPHASIS_PATTERN.sub("", text)
+    return text
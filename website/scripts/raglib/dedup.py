@@ -0,0 +1,114 @@
+"""
+Near-duplicate chunk detection with MinHash LSH (raglib.minhash).
+
+Pages overlap: governor limits are explained in development/, patterns/ and
+observability/, and the same code example appears in several guides.
+Duplicated chunks crowd diverse material out of the top k.
+
+Every chunk is reduced to the set of its SHINGLE_SIZE-word shingles (plain
+text, lowercased, stopwords kept). The sets get MinHash signatures, computed
+for all chunks in a few vectorized passes. LSH bucketing of the signatures
+proposes candidate pairs in time near-linear in the number of chunks, and
+each candidate is checked with the exact Jaccard similarity of the shingle
+sets. Pairs at or above the threshold are joined into clusters
+(union-find). The canonical chunk of a cluster is its longest member.
+
+build-search-index.py writes the clusters to DUPLICATES_FILE next to the
+retrieval index; Retriever.search(collapse=True) then returns one chunk per
+cluster. report-duplicates.py prints them.
+
+Usage:
+    clusters = find_duplicates(chunks, threshold=0.6)   # [[canonical row, row, ...], ...]
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .artifacts import ArtifactWriter
+from .chunker import Chunk
+from .corpus import INDEX_DIR, plain_text
+from .minhash import MinHasher, candidate_pairs, hash_tokens, jaccard, shingle_hashes
+from .text import TOKEN_PATTERN
+
+DUPLICATES_FILE = "duplicates.json"
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+# 32 bands of 4 rows: pairs at Jaccard 0.6 are candidates 99% of the time
+BANDS = 32
+THRESHOLD = 0.6
+SEED = 1
+# Chunks with fewer shingles (a heading and a link) are not compared
+MIN_SHINGLES = 8
+
+
+def chunk_shingles(chunk: Chunk, size: int = SHINGLE_SIZE, cache: Optional[Dict[str, int]] = None) -> np.ndarray:
+    """Sorted distinct hashes of the word shingles of a chunk's text."""
+    words = TOKEN_PATTERN.findall(plain_text(chunk.text).lower())
+    return shingle_hashes(hash_tokens(words, cache), size)
+
+
+def find_duplicates(chunks: Sequence[Chunk], threshold: float = THRESHOLD, shingle_size: int = SHINGLE_SIZE,
+                    num_perm: int = NUM_PERM, bands: int = BANDS, seed: int = SEED) -> List[List[int]]:
+    """
+    Clusters of near-duplicate chunks, as lists of rows.
+
+    Each cluster starts with its canonical row (most tokens, then first in
+    order) followed by the others in order; clusters are sorted by
+    canonical row.
+    """
+    cache: Dict[str, int] = {}
+    shingles = [chunk_shingles(chunk, shingle_size, cache) for chunk in chunks]
+    signatures = MinHasher(num_perm, seed).signatures(shingles)
+    valid = np.array([len(s) >= MIN_SHINGLES for s in shingles], dtype=bool)
+
+    parent = list(range(len(chunks)))
+
+    def root(row: int) -> int:
+        while parent[row] != row:
+            parent[row] = parent[parent[row]]
+            row = parent[row]
+        return row
+
+    for i, j in candidate_pairs(signatures, bands, valid):
+        if root(i) != root(j) and jaccard(shingles[i], shingles[j]) >= threshold:
+            parent[max(root(i), root(j))] = min(root(i), root(j))
+
+    members: Dict[int, List[int]] = {}
+    for row in range(len(chunks)):
+        members.setdefault(root(row), []).append(row)
+    clusters = []
+    for rows in members.values():
+        if len(rows) > 1:
+            canonical = max(rows, key=lambda row: (chunks[row].tokens, -row))
+            clusters.append([canonical] + [row for row in rows if row != canonical])
+    return sorted(clusters)
+
+
+def canonical_rows(clusters: List[List[int]], count: int) -> np.ndarray:
+    """Row -> canonical row of its cluster (itself if it has no duplicate)."""
+    canonical = np.arange(count)
+    for cluster in clusters:
+        canonical[cluster] = cluster[0]
+    return canonical
+
+
+def write_duplicates(artifacts: ArtifactWriter, index_dir: Path, chunks: Sequence[Chunk],
+                     clusters: List[List[int]], threshold: float = THRESHOLD) -> None:
+    """Save clusters as chunk ids, so they survive segment changes."""
+    artifacts.write_json(Path(index_dir) / DUPLICATES_FILE, {
+        "threshold": threshold,
+        "shingle_size": SHINGLE_SIZE,
+        "clusters": [[chunks[row].id for row in cluster] for cluster in clusters],
+    }, indent=None, separators=(",", ":"))
+
+
+def read_duplicates(index_dir: Path = INDEX_DIR) -> Optional[List[List[str]]]:
+    """Clusters of chunk ids saved by write_duplicates(), or None."""
+    try:
+        data = json.loads((Path(index_dir) / DUPLICATES_FILE).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    return data["clusters"]
@@ -0,0 +1,67 @@
+"""
+Edit rules of spelling correction, without NumPy.
+
+raglib.spelling builds the symmetric-delete index for the retriever on
+these, and the client index builder (raglib.search_index, which runs in the
+deploy workflow without NumPy) writes the vocabulary search.js corrects
+against: CLIENT_SPELLING_FILE, from client_vocabulary(). search.js
+deleteVariants(), editDistance() and its token limits are the twins of
+deletes(), edit_distance() and token_budget(); keep them in step.
+"""
+
+from typing import List, Mapping, Set
+
+CLIENT_SPELLING_FILE = "spelling.json"
+MAX_DISTANCE = 2
+# Vocabulary terms shorter than this are never suggested
+MIN_TERM_LENGTH = 3
+# Tokens shorter than this are never corrected; up to SHORT_TOKEN_LENGTH, one edit at most
+MIN_TOKEN_LENGTH = 4
+SHORT_TOKEN_LENGTH = 5
+
+
+def deletes(word: str, distance: int) -> Set[str]:
+    """word and every string obtained by deleting up to distance of its characters."""
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (adjacent transpositions count once); limit + 1 if above limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[len(b)], limit + 1)
+
+
+def token_budget(token: str) -> int:
+    """Edits allowed when correcting token (0: left as it is)."""
+    if len(token) < MIN_TOKEN_LENGTH or not token.isalpha():
+        return 0
+    return 1 if len(token) <= SHORT_TOKEN_LENGTH else MAX_DISTANCE
+
+
+def suggestible(term: str) -> bool:
+    """Whether a vocabulary term may be offered as a correction."""
+    return len(term) >= MIN_TERM_LENGTH and term.isalpha()
+
+
+def client_vocabulary(counts: Mapping[str, int]) -> dict:
+    """CLIENT_SPELLING_FILE data: the terms search.js may suggest, with their document counts."""
+    terms = sorted(term for term in counts if suggestible(term))
+    return {"max_distance": MAX_DISTANCE, "terms": terms, "counts": [counts[term] for term in terms]}
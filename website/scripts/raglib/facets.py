@@ -0,0 +1,122 @@
+"""
+Facet bitsets: which chunks are in each folder and carry each frontmatter tag.
+
+A chunk belongs to:
+- every folder on its page's path: code-examples/apex/batch-examples.md is
+  in "code-examples" and "code-examples/apex" (root pages are in "root");
+- "tag:<tag>" for every entry of its page's frontmatter tags.
+
+The index stores one packed bitset per facet (np.packbits, a bit per chunk)
+in each segment, built with the chunks. A filtered search turns the facets
+it asks for into one boolean mask (AND of the bitsets, cached), which BM25
+applies while scoring and the vector index applies before the multiply, so
+a query on a small folder costs no more than an unfiltered one and still
+returns the k best chunks in the folder. counts() gives exact chunk counts
+per facet (optionally of the chunks matching a query) from popcounts.
+
+Usage:
+    facets = FacetIndex.build(paths, {"security/sharing-fundamentals.md": ["sharing"]})
+    mask = facets.mask(["code-examples/apex", "tag:performance"])
+    facets.counts(matched)   # {"code-examples": 12, "code-examples/apex": 4, ...}
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+TAG_PREFIX = "tag:"
+
+# Set bits per byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+
+def page_tags(frontmatter: dict) -> List[str]:
+    """The lowercased frontmatter tags of a page."""
+    tags = frontmatter.get("tags")
+    if isinstance(tags, str):
+        tags = [tags]
+    if not isinstance(tags, list):
+        return []
+    return sorted({str(tag).strip().lower() for tag in tags if str(tag).strip()})
+
+
+def path_facets(path: str, tags: Iterable[str] = ()) -> List[str]:
+    """The facets of a page: its folders (outermost first), then its tags."""
+    folders = path.split("/")[:-1]
+    facets = ["/".join(folders[:depth]) for depth in range(1, len(folders) + 1)] or ["root"]
+    return facets + [TAG_PREFIX + tag for tag in tags]
+
+
+class FacetIndex:
+    """One packed bitset of rows per facet name."""
+
+    def __init__(self, names: Sequence[str], bits: np.ndarray, count: int):
+        self.names = list(names)
+        self.bits = bits
+        self.count = count
+        self._positions = {name: i for i, name in enumerate(self.names)}
+        self._masks: Dict[tuple, np.ndarray] = {}
+
+    @classmethod
+    def build(cls, paths: Sequence[str], tags: Optional[Dict[str, Sequence[str]]] = None) -> "FacetIndex":
+        """Facets of rows whose pages are paths; tags maps a page path to its tags."""
+        tags = tags or {}
+        rows: Dict[str, List[int]] = {}
+        facets_of: Dict[str, List[str]] = {}
+        for row, path in enumerate(paths):
+            if path not in facets_of:
+                facets_of[path] = path_facets(path, tags.get(path, ()))
+            for name in facets_of[path]:
+                rows.setdefault(name, []).append(row)
+        names = sorted(rows)
+        members = np.zeros((len(names), len(paths)), dtype=bool)
+        for i, name in enumerate(names):
+            members[i, rows[name]] = True
+        return cls(names, np.packbits(members, axis=1), len(paths))
+
+    @classmethod
+    def concat(cls, indexes: List["FacetIndex"]) -> "FacetIndex":
+        """The facets of several indexes' rows laid end to end (e.g. segments)."""
+        names = sorted({name for index in indexes for name in index.names})
+        count = sum(index.count for index in indexes)
+        members = np.zeros((len(names), count), dtype=bool)
+        base = 0
+        for index in indexes:
+            for name in index.names:
+                members[names.index(name), base:base + index.count] = index.row_mask(name)
+            base += index.count
+        return cls(names, np.packbits(members, axis=1), count)
+
+    def take(self, rows: Sequence[int]) -> "FacetIndex":
+        """The facets of the given rows, in that order (empty facets dropped)."""
+        members = np.unpackbits(self.bits, axis=1, count=self.count).astype(bool)[:, rows]
+        keep = members.any(axis=1)
+        return FacetIndex([name for name, kept in zip(self.names, keep) if kept],
+                          np.packbits(members[keep], axis=1), len(rows))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._positions
+
+    def row_mask(self, name: str) -> np.ndarray:
+        """Boolean mask of the rows in one facet."""
+        return np.unpackbits(self.bits[self._positions[name]], count=self.count).astype(bool)
+
+    def mask(self, names: Iterable[str]) -> Optional[np.ndarray]:
+        """
+        Boolean mask of the rows in every one of names (cached).
+
+        None if a name is not a facet: no row can match.
+        """
+        key = tuple(sorted(set(names)))
+        if key not in self._masks:
+            if any(name not in self._positions for name in key):
+                return None
+            bits = np.bitwise_and.reduce(self.bits[[self._positions[name] for name in key]], axis=0)
+            self._masks[key] = np.unpackbits(bits, count=self.count).astype(bool)
+        return self._masks[key]
+
+    def counts(self, rows: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """Rows per facet; rows, a boolean mask, restricts the count to those rows."""
+        bits = self.bits if rows is None else self.bits & np.packbits(rows)
+        totals = _POPCOUNT[bits].sum(axis=1)
+        return {name: int(total) for name, total in zip(self.names, totals) if total}
@@ -0,0 +1,179 @@
+"""
+FAQ fast path: answer a question from the library's Q&A pairs directly.
+
+Many pages end with a "## Q&A" section of "### Q: ..." / "**A**: ..." pairs
+(raglib.chunker.page_qa_pairs). An assistant asking one of those questions,
+or a near-duplicate of it, can be handed the stored answer and its source
+anchor without running retrieval at all.
+
+Questions are normalised to their set of search terms (raglib.text.tokenize:
+lowercased, stemmed, stopwords dropped), so "How do I bulkify triggers?" and
+"how to bulkify a trigger" are the same key and match with one dict lookup.
+Near-duplicates are found with MinHash signatures of the term sets and
+locality-sensitive hashing (raglib.minhash): the signature is cut into
+BANDS bands and every stored question is filed under each band, so a lookup
+probes BANDS buckets (constant time, whatever the number of questions) and
+only compares the questions it finds there. A candidate matches when the Jaccard similarity of
+the term sets is at least THRESHOLD.
+
+The index is built by build-search-index.py next to the retrieval index
+(FAQ_FILE in INDEX_DIR, a raglib.indexfile container).
+
+Usage:
+    faq = FaqIndex.load()
+    match = faq.lookup("When should I use Apex rather than Flow?")
+    if match:
+        match.answer, match.url, match.similarity
+"""
+
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .artifacts import ArtifactWriter
+from .chunker import QAPair, page_qa_pairs
+from .corpus import INDEX_DIR, iter_pages
+from .indexfile import IndexFile, pack_index_file
+from .minhash import MinHasher, band_digests, hash_tokens
+from .text import tokenize
+
+FAQ_FILE = "faq.idx"
+NUM_PERM = 64
+BANDS = 16
+THRESHOLD = 0.7
+SEED = 20240101
+
+_FIELDS = ("question", "answer", "path", "url", "title")
+
+
+class FaqMatch(NamedTuple):
+    question: str      # the stored question that matched
+    answer: str
+    path: str
+    url: str
+    title: str
+    similarity: float  # Jaccard similarity of the term sets (1.0: same key)
+
+
+def question_terms(question: str) -> Tuple[str, ...]:
+    """The normalised question: its distinct search terms, sorted."""
+    return tuple(sorted(set(tokenize(question))))
+
+
+def jaccard(x: frozenset, y: frozenset) -> float:
+    return len(x & y) / len(x | y) if x or y else 0.0
+
+
+class FaqIndex:
+    """
+    Q&A pairs with an exact-key dict and MinHash LSH buckets over their questions.
+
+    Build with FaqIndex.build(pairs) (or from_corpus()), then save(); load()
+    maps the saved file.
+    """
+
+    def __init__(self, fields: Dict[str, List[str]], keys: List[str], signatures: np.ndarray,
+                 num_perm: int = NUM_PERM, bands: int = BANDS, seed: int = SEED):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.fields = fields
+        self.keys = keys
+        self.signatures = signatures
+        self.num_perm = num_perm
+        self.bands = bands
+        self.seed = seed
+        self._hasher = MinHasher(num_perm, seed)
+        self._exact: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for i, key in enumerate(keys):
+            self._exact.setdefault(key, i)  # the same question on two pages: the first wins
+            for band, digest in enumerate(band_digests(signatures[i], bands)):
+                self._buckets[(band, digest)].append(i)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def build(cls, pairs: Iterable[QAPair], num_perm: int = NUM_PERM, bands: int = BANDS,
+              seed: int = SEED) -> "FaqIndex":
+        pairs = list(pairs)
+        terms = [question_terms(pair.question) for pair in pairs]
+        signatures = MinHasher(num_perm, seed).signatures([hash_tokens(t) for t in terms])
+        fields = {name: [getattr(pair, name) for pair in pairs] for name in _FIELDS}
+        return cls(fields, [" ".join(t) for t in terms], signatures, num_perm, bands, seed)
+
+    @classmethod
+    def from_corpus(cls) -> "FaqIndex":
+        return cls.build(pair for page in iter_pages() for pair in page_qa_pairs(page))
+
+    @classmethod
+    def load(cls, index_dir: Path = INDEX_DIR) -> "FaqIndex":
+        """Open the index written by save(); raises FileNotFoundError if there is none."""
+        index_file = IndexFile.open(Path(index_dir) / FAQ_FILE)
+        meta = index_file.meta
+        fields = {name: index_file.strings(name) for name in _FIELDS}
+        return cls(fields, list(index_file.strings("keys")), index_file.array("signatures"),
+                   meta["num_perm"], meta["bands"], meta["seed"])
+
+    def to_bytes(self) -> bytes:
+        strings = {name: list(values) for name, values in self.fields.items()}
+        strings["keys"] = self.keys
+        meta = {"kind": "faq", "num_perm": self.num_perm, "bands": self.bands, "seed": self.seed}
+        return pack_index_file({"signatures": np.asarray(self.signatures, dtype=np.uint32)}, strings, meta)
+
+    def save(self, artifacts: ArtifactWriter, index_dir: Path = INDEX_DIR) -> None:
+        artifacts.write_bytes(Path(index_dir) / FAQ_FILE, self.to_bytes())
+
+    def pair(self, i: int) -> QAPair:
+        return QAPair(*(self.fields[name][i] for name in _FIELDS))
+
+    def pairs(self) -> List[QAPair]:
+        return [self.pair(i) for i in range(len(self))]
+
+    def lookup(self, question: str, threshold: float = THRESHOLD) -> Optional[FaqMatch]:
+        """The stored pair whose question is the closest near-duplicate of question, or None."""
+        terms = question_terms(question)
+        if not terms:
+            return None
+        best = self._exact.get(" ".join(terms))
+        similarity = 1.0
+        if best is None:
+            query = frozenset(terms)
+            candidates = set()
+            signature = self._hasher.signature(hash_tokens(terms))
+            for band, digest in enumerate(band_digests(signature, self.bands)):
+                candidates.update(self._buckets.get((band, digest), ()))
+            similarity = 0.0
+            for i in sorted(candidates):
+                score = jaccard(query, frozenset(self.keys[i].split()))
+                if score > similarity:
+                    best, similarity = i, score
+            if best is None or similarity < threshold:
+                return None
+        return FaqMatch(*self.pair(best), similarity)
+
+
+_default_faq: Optional[FaqIndex] = None
+_faq_file_stat = None
+
+
+def default_faq() -> FaqIndex:
+    """The FAQ index lookup() uses: the built one if present, else built from rag/ (reloaded when rebuilt)."""
+    global _default_faq, _faq_file_stat
+    try:
+        stat = os.stat(INDEX_DIR / FAQ_FILE)
+        file_stat = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        file_stat = None
+    if _default_faq is None or file_stat != _faq_file_stat:
+        _default_faq = FaqIndex.load() if file_stat is not None else FaqIndex.from_corpus()
+        _faq_file_stat = file_stat
+    return _default_faq
+
+
+def lookup(question: str, threshold: float = THRESHOLD) -> Optional[FaqMatch]:
+    """Answer question from the library's Q&A pairs if one closely matches (see FaqIndex.lookup)."""
+    return default_faq().lookup(question, threshold)
@@ -0,0 +1,461 @@
+"""
+Jekyll frontmatter parsing, schema validation and repair for rag/ markdown files.
+
+The schema is declared once in FRONTMATTER_SCHEMA and compiled into a
+FrontmatterSchema at import time. Validation runs against the *parsed* header
+of each file (never substring checks on raw text), and repair rewrites a file
+in a single atomic write.
+
+Headers are parsed by a native fast path for the flat ``key: value`` subset
+our pages use; PyYAML is imported lazily and only for headers outside it.
+"""
+
+import json
+import re
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .artifacts import atomic_write_text
+
+# Declarative frontmatter schema.
+#   type     - accepted Python type(s) after parsing
+#   required - the key must be present
+#   default  - value written by repair when the key is missing
+#   derive   - name of a derivation used by repair (and checked by validate)
+FRONTMATTER_SCHEMA = {
+    "layout": {"type": str, "required": True, "default": "default"},
+    "title": {"type": str, "required": True, "derive": "title"},
+    "permalink": {"type": str, "required": True, "derive": "permalink"},
+    "description": {"type": str},
+    "level": {"type": str},
+    "tags": {"type": list, "items": str},
+    "last_reviewed": {"type": (str, date)},
+}
+
+# Files that are generated or are not Jekyll pages
+EXCLUDED_FILES = {"rag-index.md", "README.md", "CONTRIBUTING.md", "MAINTENANCE.md", "code-examples-index.md"}
+
+# Likely first content line when a header was never closed
+CONTENT_LINE_PATTERN = re.compile(r"^(#{1,6}\s|\- |\* |\d+\. )")
+
+# A line a header may hold: "key:", an indented continuation or a "- item"
+HEADER_LINE_PATTERN = re.compile(r"^([A-Za-z_][\w-]*\s*:|\s+\S|- )")
+
+# A top-level "key: value" line
+FLAT_LINE_PATTERN = re.compile(r"^([A-Za-z_][\w-]*)\s*:\s+(\S.*?)\s*$")
+
+# "key:" opening a block list, and its "  - item" lines
+LIST_KEY_PATTERN = re.compile(r"^([A-Za-z_][\w-]*)\s*:\s*$")
+LIST_ITEM_PATTERN = re.compile(r"^\s+-\s+(\S.*?)\s*$")
+
+# Scalars the fast path leaves to PyYAML
+YAML_INDICATORS = set("-?:,[]{}#&*!|>%@`")
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+IMPLICIT_TYPE_PATTERN = re.compile(
+    r"^(?:[-+]?[\d._]+(?:[eE][-+]?\d+)?|0[xob][\da-fA-F_]+|[-+]?\.(?:inf|Inf|INF)|\.(?:nan|NaN|NAN)"
+    r"|~|null|Null|NULL|true|True|TRUE|false|False|FALSE|yes|Yes|YES|no|No|NO|on|On|ON|off|Off|OFF|y|Y|n|N"
+    r"|\d{4}-\d\d?-\d\d?(?:[Tt ].*)?|[-+]?\d[\d_]*(?::[0-5]?\d)+(?:\.[\d_]*)?)$"
+)
+
+HEADING_PATTERN = re.compile(r"^#{1,2}\s+(.+)$", re.MULTILINE)
+
+# Characters that force a scalar to be quoted when we write it back
+NEEDS_QUOTING_PATTERN = re.compile(r"(^[\s\-?:,\[\]{}#&*!|>'\"%@`])|(:\s)|(\s#)|(\s$)")
+
+
+class FrontmatterError(ValueError):
+    """Raised when a header cannot be parsed."""
+
+
+def expected_permalink(rel_path: str) -> str:
+    """Permalink derived from a path relative to rag/."""
+    rel_path = str(rel_path).replace("\\", "/")
+    if rel_path.endswith(".md"):
+        rel_path = rel_path[:-3] + ".html"
+    return f"/rag/{rel_path}"
+
+
+def derive_title(body: str, filename: str) -> str:
+    """Title from the first H1/H2 heading, falling back to the filename."""
+    match = HEADING_PATTERN.search(body)
+    if match:
+        return match.group(1).strip()
+    return Path(filename).stem.replace("-", " ").replace("_", " ").title()
+
+
+def find_unclosed_end(lines: List[str]) -> int:
+    """
+    Index where an unclosed header should be closed.
+
+    Closes before the first blank line or the first obvious content line
+    (heading, list item, numbered list); falls back to end of file.
+    """
+    for i in range(1, len(lines)):
+        stripped = lines[i].lstrip()
+        if stripped == "" or CONTENT_LINE_PATTERN.match(stripped):
+            return i
+    return len(lines)
+
+
+def find_swallowed_body(header_lines: List[str]) -> Optional[int]:
+    """
+    Index where a closed header runs into the page body, or None.
+
+    A header that was never closed takes the body up to the next ---
+    horizontal rule. That text can still parse (headings read as YAML
+    comments), so it is spotted by shape instead: a line that is not a
+    header line, or a top-level line after a blank line. The body is taken
+    to start at the blank line before it, if any.
+    """
+    blank = None
+    for i, line in enumerate(header_lines):
+        if not line.strip():
+            blank = i if blank is None else blank
+            continue
+        indented = line[0].isspace()
+        if not HEADER_LINE_PATTERN.match(line) or (blank is not None and not indented):
+            return i if blank is None else blank
+        if not indented:
+            blank = None
+    return None
+
+
+def split_frontmatter(content: str) -> Tuple[str, Optional[str], str]:
+    """
+    Split a markdown file into (status, header_text, body).
+
+    status is one of:
+        "ok"       - header opened and closed with ---
+        "missing"  - file does not start with --- (header_text is None)
+        "unclosed" - header opened but never closed; the header is cut where
+                     find_unclosed_end() would insert the closing ---
+    """
+    text = content.lstrip("\ufeff").lstrip()
+    lines = text.split("\n")
+    if lines[0].strip() != "---":
+        return "missing", None, text
+
+    for i in range(1, len(lines)):
+        if lines[i].strip() == "---":
+            return "ok", "\n".join(lines[1:i]), "\n".join(lines[i + 1:])
+
+    end = find_unclosed_end(lines)
+    return "unclosed", "\n".join(lines[1:end]), "\n".join(lines[end:])
+
+
+def parse_flat(header_text: str) -> Optional[Dict]:
+    """
+    Fast path for the flat subset of YAML our frontmatter uses.
+
+    Handles ``key: plain value`` lines, simply quoted strings, ISO dates and
+    block lists of plain scalars (``tags:`` followed by ``  - item`` lines).
+    Returns None for anything else so the caller can fall back to PyYAML;
+    whatever this returns is what yaml.safe_load would return.
+    """
+    data = {}
+    list_key = None
+    for line in header_text.split("\n"):
+        if not line.strip():
+            continue
+        if list_key is not None:
+            item = LIST_ITEM_PATTERN.match(line)
+            if item:
+                value = _flat_scalar(item.group(1))
+                if value is None:
+                    return None
+                data[list_key].append(value)
+                continue
+            list_key = None
+
+        match = FLAT_LINE_PATTERN.match(line)
+        if match:
+            key, raw = match.groups()
+            value = _flat_scalar(raw)
+            if value is None or key in data:
+                return None
+            data[key] = value
+            continue
+
+        match = LIST_KEY_PATTERN.match(line)
+        if match and match.group(1) not in data:
+            list_key = match.group(1)
+            data[list_key] = []
+            continue
+        return None
+
+    for key, value in data.items():
+        if value == []:
+            # "key:" with no items is null in YAML
+            data[key] = None
+    return data
+
+
+def _flat_scalar(raw: str):
+    """Resolve a scalar the way yaml.safe_load would, or None if unsure."""
+    first = raw[0]
+    if first == '"':
+        if len(raw) > 1 and raw.endswith('"') and '"' not in raw[1:-1] and "\\" not in raw:
+            return raw[1:-1]
+        return None
+    if first == "'":
+        if len(raw) > 1 and raw.endswith("'") and "'" not in raw[1:-1]:
+            return raw[1:-1]
+        return None
+    if first in YAML_INDICATORS or ": " in raw or " #" in raw or raw.endswith(":") or "\t" in raw:
+        return None
+    if DATE_PATTERN.match(raw):
+        try:
+            return date.fromisoformat(raw)
+        except ValueError:
+            return None
+    if IMPLICIT_TYPE_PATTERN.match(raw):
+        # bools, nulls and numbers: let PyYAML resolve them
+        return None
+    return raw
+
+
+def parse_header(header_text: str) -> Dict:
+    """
+    Parse header text into a dict.
+
+    Flat headers go through parse_flat(); PyYAML is only imported and used
+    for headers outside that subset.
+    """
+    data = parse_flat(header_text)
+    if data is not None:
+        return data
+    return parse_yaml(header_text)
+
+
+def parse_yaml(header_text: str) -> Dict:
+    """Parse header text with PyYAML."""
+    import yaml
+
+    try:
+        data = yaml.safe_load(header_text) if header_text.strip() else {}
+    except yaml.YAMLError as e:
+        mark = getattr(e, "problem_mark", None)
+        where = f" (line {mark.line + 1})" if mark is not None else ""
+        problem = getattr(e, "problem", None) or str(e).splitlines()[0]
+        raise FrontmatterError(f"Invalid YAML in frontmatter: {problem}{where}") from e
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise FrontmatterError("Frontmatter is not a key/value mapping")
+    return data
+
+
+def read_frontmatter(content: str) -> Dict:
+    """Parsed frontmatter of a markdown document, or {} if it has none or it is invalid."""
+    status, header_text, _ = split_frontmatter(content)
+    if status != "ok":
+        return {}
+    try:
+        return parse_header(header_text)
+    except FrontmatterError:
+        return {}
+
+
+def quote_flat_values(header_lines: List[str]) -> List[str]:
+    """Quote top-level scalar values that contain ': ' (e.g. titles with a colon)."""
+    quoted = []
+    for line in header_lines:
+        match = FLAT_LINE_PATTERN.match(line)
+        if match and ": " in match.group(2) and match.group(2)[0] not in "\"'":
+            line = f"{match.group(1)}: {json.dumps(match.group(2), ensure_ascii=False)}"
+        quoted.append(line)
+    return quoted
+
+
+def recover_header(content: str) -> Tuple[str, List[str], Dict, str]:
+    """
+    Parse a header the way repair would, recovering from common breakage.
+
+    Returns (status, header_lines, header, body). Two recoveries are tried:
+      - the header was never closed and a later --- horizontal rule was taken
+        as the closing marker: the header is re-cut where the body starts
+        (find_swallowed_body), tried first even if the header parses, or
+        before the first content line when it does not parse as-is
+      - a flat value contains an unquoted ': ': the value is quoted
+    Raises FrontmatterError when neither helps.
+    """
+    status, header_text, body = split_frontmatter(content)
+    if header_text is None:
+        return status, [], {}, body
+
+    header_lines = header_text.split("\n")
+    candidates = [(status, header_lines, body)]
+    if status == "ok":
+        lines = content.lstrip("\ufeff").lstrip().split("\n")
+        swallowed = find_swallowed_body(header_lines)
+        if swallowed is not None:
+            candidates.insert(0, ("unclosed", lines[1:swallowed + 1], "\n".join(lines[swallowed + 1:])))
+        end = find_unclosed_end(lines)
+        candidates.append(("unclosed", lines[1:end], "\n".join(lines[end:])))
+
+    first_error = None
+    for quote in (False, True):
+        for candidate_status, header_lines, candidate_body in candidates:
+            if quote:
+                header_lines = quote_flat_values(header_lines)
+            try:
+                header = parse_header("\n".join(header_lines))
+            except FrontmatterError as e:
+                first_error = first_error or e
+                continue
+            return candidate_status, header_lines, header, candidate_body
+    raise first_error
+
+
+def _type_name(types) -> str:
+    if isinstance(types, tuple):
+        return " or ".join(t.__name__ for t in types)
+    return types.__name__
+
+
+def _format_scalar(value: str) -> str:
+    """Format a string as a YAML scalar, quoting only when needed."""
+    if value == "" or NEEDS_QUOTING_PATTERN.search(value):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+class FrontmatterSchema:
+    """A compiled frontmatter schema."""
+
+    def __init__(self, spec: Dict[str, Dict]):
+        self.spec = spec
+        self.required = tuple(key for key, rule in spec.items() if rule.get("required"))
+        self.type_checks = tuple(
+            (key, rule["type"], rule.get("items")) for key, rule in spec.items() if "type" in rule
+        )
+        self.derived = {key: rule["derive"] for key, rule in spec.items() if "derive" in rule}
+        self.defaults = {key: rule["default"] for key, rule in spec.items() if "default" in rule}
+
+    def validate(self, header: Dict, rel_path: str) -> List[str]:
+        """Return a list of problems with a parsed header (empty when valid)."""
+        errors = []
+
+        missing = [key for key in self.required if header.get(key) in (None, "")]
+        if missing:
+            errors.append(f"Missing required fields: {', '.join(missing)}")
+
+        for key, types, item_type in self.type_checks:
+            value = header.get(key)
+            if value is None:
+                continue
+            if not isinstance(value, types):
+                errors.append(f"Field '{key}' should be {_type_name(types)}, got {type(value).__name__}")
+            elif item_type and any(not isinstance(item, item_type) for item in value):
+                errors.append(f"Field '{key}' should only contain {_type_name(item_type)} values")
+
+        if self.derived.get("permalink") and isinstance(header.get("permalink"), str):
+            permalink = header["permalink"].strip()
+            expected = expected_permalink(rel_path)
+            if permalink != expected:
+                errors.append(f"Permalink mismatch: {permalink} != {expected}")
+
+        return errors
+
+    def repairs(self, header: Dict, rel_path: str, body: str) -> Dict[str, str]:
+        """Values that must be written to make a header valid."""
+        updates = {}
+        for key in self.required:
+            if header.get(key) not in (None, ""):
+                continue
+            if key in self.defaults:
+                updates[key] = self.defaults[key]
+            elif self.derived.get(key) == "title":
+                updates[key] = derive_title(body, rel_path)
+            elif self.derived.get(key) == "permalink":
+                updates[key] = expected_permalink(rel_path)
+
+        if self.derived.get("permalink"):
+            expected = expected_permalink(rel_path)
+            current = header.get("permalink")
+            if isinstance(current, str) and current.strip() != expected:
+                updates["permalink"] = expected
+
+        return updates
+
+
+SCHEMA = FrontmatterSchema(FRONTMATTER_SCHEMA)
+
+
+def check_content(content: str, rel_path: str, schema: FrontmatterSchema = SCHEMA) -> List[str]:
+    """Validate the frontmatter of a markdown document."""
+    status, header_text, _ = split_frontmatter(content)
+    if status == "missing":
+        return ["Missing frontmatter (doesn't start with ---)"]
+    if status == "unclosed":
+        return ["Invalid frontmatter format (no closing ---)"]
+    try:
+        header = parse_header(header_text)
+    except FrontmatterError as e:
+        try:
+            recovered_status, _, _, _ = recover_header(content)
+        except FrontmatterError:
+            return [str(e)]
+        if recovered_status == "unclosed":
+            return ["Invalid frontmatter format (no closing --- before content)"]
+        return [str(e)]
+    if find_swallowed_body(header_text.split("\n")) is not None:
+        return ["Invalid frontmatter format (no closing --- before content)"]
+    return schema.validate(header, rel_path)
+
+
+def repair_content(content: str, rel_path: str, schema: FrontmatterSchema = SCHEMA) -> str:
+    """
+    Return content with generated or repaired frontmatter.
+
+    Existing keys, their order and their formatting are preserved; missing
+    required keys are appended and a wrong permalink line is replaced. A
+    missing header is generated and an unclosed one is closed.
+    Raises FrontmatterError if the existing header cannot be recovered.
+    """
+    status, header_lines, header, body = recover_header(content)
+
+    updates = schema.repairs(header, rel_path, body)
+    for key, value in updates.items():
+        line = f"{key}: {_format_scalar(value)}"
+        for i, existing in enumerate(header_lines):
+            if re.match(rf"^{re.escape(key)}\s*:", existing):
+                header_lines[i] = line
+                break
+        else:
+            header_lines.append(line)
+
+    if status == "missing":
+        body = "\n" + body
+
+    return "---\n" + "\n".join(header_lines) + "\n---\n" + body
+
+
+def process_file(file_path: Path, rag_dir: Path, fix: bool = False) -> Tuple[Path, List[str], bool]:
+    """
+    Validate (and optionally repair) one file.
+
+    Returns (file_path, remaining_errors, fixed). Designed to be mapped over
+    a process pool, so it only takes and returns picklable values.
+    """
+    rel_path = str(Path(file_path).relative_to(rag_dir))
+    try:
+        content = Path(file_path).read_text(encoding="utf-8")
+    except Exception as e:
+        return file_path, [f"Error reading file: {e}"], False
+
+    errors = check_content(content, rel_path)
+    if not errors or not fix:
+        return file_path, errors, False
+
+    try:
+        repaired = repair_content(content, rel_path)
+    except FrontmatterError as e:
+        return file_path, [f"Cannot auto-fix: {e}"], False
+
+    remaining = check_content(repaired, rel_path)
+    if repaired != content:
+        atomic_write_text(file_path, repaired)
+        return file_path, remaining, True
+    return file_path, remaining, False
@@ -0,0 +1,93 @@
+"""
+Last-modified dates from git history.
+
+Filesystem mtimes reset on every fresh clone (e.g. each CI run), so using
+them for <lastmod> or rag-library.json makes every run look like every page
+changed. Instead we collect the last commit date of every file with a single
+``git log --name-only`` call, parsed in one pass, and fall back to mtime only
+for files git knows nothing about (new, untracked, or git unavailable).
+
+CI checkouts must fetch full history (fetch-depth: 0) for the dates to be
+meaningful; in a shallow clone every file gets the date of the oldest
+fetched commit that touched it.
+"""
+
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+# Record separator placed before each commit's date in the log output
+RECORD_SEP = "\x1e"
+
+
+def git_last_commit_dates(repo_dir: Path, pathspecs: Iterable[str] = ()) -> Dict[str, datetime]:
+    """
+    Map each path (relative to repo_dir, forward slashes) to its last commit date.
+
+    Runs one ``git log`` over the whole history of the pathspecs. Log output
+    is newest first, so the first date seen for a path is its last change.
+    Returns {} if git is unavailable or repo_dir is not a work tree.
+    """
+    cmd = [
+        "git", "-C", str(repo_dir), "-c", "core.quotePath=false",
+        "log", f"--format=format:{RECORD_SEP}%cI", "--name-only", "-z", "--no-renames",
+        "--",
+    ]
+    cmd.extend(pathspecs)
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8", check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    return parse_log(result.stdout)
+
+
+def parse_log(output: str) -> Dict[str, datetime]:
+    """
+    Path -> date of its first (newest) record in ``git log -z --name-only`` output.
+
+    Each record is RECORD_SEP, the ISO date, a newline and the NUL-separated
+    paths the commit touched, taken verbatim (spaces, non-ASCII, no quoting).
+    """
+    dates = {}
+    for record in output.split(RECORD_SEP):
+        if not record:
+            continue
+        stamp, _, names = record.partition("\n")
+        committed = None
+        for name in names.split("\0"):
+            if not name or name in dates:
+                continue
+            if committed is None:
+                committed = datetime.fromisoformat(stamp.strip())
+            dates[name] = committed
+    return dates
+
+
+class LastModified:
+    """
+    Last-modified lookup for files under a git work tree.
+
+    Usage:
+        last_modified = LastModified(BASE_DIR, ["rag"])
+        last_modified.get(BASE_DIR / "rag" / "development" / "apex-patterns.md")
+    """
+
+    def __init__(self, repo_dir: Path, pathspecs: Iterable[str] = ()):
+        self.repo_dir = Path(repo_dir).resolve()
+        self.dates = git_last_commit_dates(self.repo_dir, pathspecs)
+
+    def get(self, path: Path) -> datetime:
+        """Last commit date of path, or its (timezone-aware) mtime if git has none."""
+        path = Path(path).resolve()
+        try:
+            key = path.relative_to(self.repo_dir).as_posix()
+        except ValueError:
+            key = None
+        if key in self.dates:
+            return self.dates[key]
+        return datetime.fromtimestamp(path.stat().st_mtime).astimezone()
+
+    def latest(self, paths: Iterable[Path]) -> Optional[datetime]:
+        """Most recent last-modified date among paths (None if there are none)."""
+        return max((self.get(path) for path in paths), default=None)
@@ -0,0 +1,308 @@
+"""
+Glossary term matching with an Aho-Corasick automaton.
+
+Terms come from the "- **Term**: definition" entries of rag/glossary/. Each
+term also matches:
+- its "(also: X, Y)" synonyms;
+- for an acronym, the expansion before " - " in its definition
+  ("**ETL**: Extract, Transform, Load - ...");
+- its plural (or singular, for a term ending in "s").
+
+Entries whose definition is only a list of file paths are cross-references,
+not terms.
+
+Every term and synonym is compiled into one automaton, so a page is scanned
+in a single pass. The cost is linear in the page length plus the number of
+matches, whatever the number of terms. Matching is case-insensitive on word
+boundaries, except for acronyms, which must match case. Matches inside code
+fences, inline code, links, HTML tags and Liquid tags are dropped.
+
+Uses:
+- annotate(): the glossary terms each chunk mentions. build-search-index.py
+  stores them (GLOSSARY_FILE) and Retriever.search(glossary_boost=True)
+  ranks chunks that mention the query's glossary terms higher.
+- link_first_occurrences(): a page body with the first mention of each term
+  linked to the glossary. Run it with link-glossary.py.
+
+Usage:
+    matcher = GlossaryMatcher(load_glossary())
+    for match in matcher.find(page.body):
+        matcher.terms[match.term].term, match.start, match.end
+"""
+
+import json
+import re
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .artifacts import ArtifactWriter
+from .chunker import heading_anchor
+from .corpus import INDEX_DIR, RAG_DIR, iter_page_files, read_page
+
+GLOSSARY_DIR = "glossary"
+GLOSSARY_FILE = "glossary.json"
+
+ENTRY_PATTERN = re.compile(r"^\s*[-*]\s+\*\*(?P<term>[^*]+)\*\*\s*(?:\(also:\s*(?P<also>[^)]*)\))?\s*:\s*(?P<definition>.+)$")
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+FENCE_PATTERN = re.compile(r"^\s*(`{3,}|~{3,})")
+# Spans on a line that must never be matched or linked
+PROTECTED_PATTERN = re.compile(
+    r"`+[^`]*`+"                        # inline code
+    r"|!?\[[^\]]*\]\([^)]*\)"           # markdown links and images
+    r"|!?\[[^\]]*\]\[[^\]]*\]"          # reference links
+    r"|\{\{.*?\}\}|\{%.*?%\}"           # Liquid
+    r"|<[^>\n]+>"                       # HTML tags and autolinks
+    r"|https?://\S+")
+PATHS_ONLY_PATTERN = re.compile(r"`[^`]*`|[,;.\s]|and")
+ACRONYM_PATTERN = re.compile(r"^[A-Z][A-Z0-9]{1,7}$")
+
+
+class GlossaryTerm(NamedTuple):
+    term: str
+    synonyms: Tuple[str, ...]
+    definition: str
+    url: str           # glossary page, at the heading above the entry
+
+
+class TermMatch(NamedTuple):
+    term: int          # index into the matcher's terms
+    start: int         # character offsets in the scanned text
+    end: int
+    heading: bool      # inside a heading line (annotated, never linked)
+
+
+def parse_glossary(body: str, url: str) -> List[GlossaryTerm]:
+    """The "- **Term**: definition" entries of one glossary page body."""
+    terms = []
+    anchor = ""
+    for line in body.splitlines():
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            anchor = heading_anchor(heading.group(2))
+            continue
+        entry = ENTRY_PATTERN.match(line)
+        if not entry:
+            continue
+        term, definition = entry.group("term").strip(), entry.group("definition").strip()
+        if not PATHS_ONLY_PATTERN.sub("", definition):
+            continue  # "- **Operations Terms**: `rag/operations/...`": a cross-reference
+        synonyms = [s.strip() for s in (entry.group("also") or "").split(",") if s.strip()]
+        if ACRONYM_PATTERN.match(term) and " - " in definition:
+            synonyms.append(definition.split(" - ", 1)[0].strip())
+        terms.append(GlossaryTerm(term, tuple(synonyms), definition, f"{url}#{anchor}" if anchor else url))
+    return terms
+
+
+def load_glossary(rag_dir: Path = RAG_DIR) -> List[GlossaryTerm]:
+    """Every term defined in rag/glossary/, in page order."""
+    pages = (read_page(file_path, rag_dir) for file_path in iter_page_files(rag_dir / GLOSSARY_DIR))
+    return [term for page in pages for term in parse_glossary(page.body, page.url)]
+
+
+def _lower(text: str) -> str:
+    """text.lower(), one character per character (so offsets carry over)."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c.lower()[0] for c in text)
+
+
+class AhoCorasick:
+    """
+    Multi-pattern string matcher: all occurrences of all patterns in one pass.
+
+    States form a trie of the patterns. Each state has a failure link (the
+    longest proper suffix that is also a trie path) and an output link (the
+    nearest state along failure links that ends a pattern), so a scan costs
+    O(len(text) + matches) however many patterns there are.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self.goto: List[Dict[str, int]] = [{}]
+        self.ends: List[List[int]] = [[]]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.ends.append([])
+                state = next_state
+            self.ends[state].append(index)
+
+        self.fail = [0] * len(self.goto)
+        self.output = [0] * len(self.goto)  # 0: no pattern ends on the suffix chain
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.output[child] = target if self.ends[target] else self.output[target]
+
+    def iter(self, text: str) -> Iterable[Tuple[int, int]]:
+        """(pattern index, end offset) of every occurrence, in order of end offset."""
+        goto, fail, ends, output = self.goto, self.fail, self.ends, self.output
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            match_state = state
+            while match_state:
+                for index in ends[match_state]:
+                    yield index, position + 1
+                match_state = output[match_state]
+
+
+def _forms(name: str, acronym: bool) -> Tuple[str, ...]:
+    """name and its plural (or, for "Platform Events", its singular)."""
+    if name.endswith("s") and not acronym:
+        return name, name[:-1]
+    return name, name + "s"
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class GlossaryMatcher:
+    """Finds glossary terms (and synonyms, plurals) in markdown text."""
+
+    def __init__(self, terms: Sequence[GlossaryTerm]):
+        self.terms = list(terms)
+        patterns: Dict[str, Tuple[int, Optional[str]]] = {}
+        for index, term in enumerate(self.terms):
+            for name in (term.term,) + term.synonyms:
+                # Acronyms must match case; everything else is case-insensitive
+                acronym = ACRONYM_PATTERN.match(name) is not None
+                for form in _forms(name, acronym):
+                    patterns.setdefault(_lower(form), (index, form if acronym else None))
+        self._patterns = list(patterns.items())
+        self._automaton = AhoCorasick([pattern for pattern, _ in self._patterns])
+
+    def _protected(self, text: str) -> List[Tuple[int, int, bool]]:
+        """(start, end, is_heading) spans: protected spans are code, links and tags; heading spans are lines."""
+        spans = []
+        fence = None
+        offset = 0
+        for line in text.splitlines(keepends=True):
+            opening = FENCE_PATTERN.match(line)
+            if fence is not None or opening:
+                spans.append((offset, offset + len(line), False))
+                if opening and fence is None:
+                    fence = opening.group(1)
+                elif opening and opening.group(1)[0] == fence[0] and len(opening.group(1)) >= len(fence):
+                    fence = None
+            else:
+                if HEADING_PATTERN.match(line.rstrip("\n")):
+                    spans.append((offset, offset + len(line), True))
+                for protected in PROTECTED_PATTERN.finditer(line):
+                    spans.append((offset + protected.start(), offset + protected.end(), False))
+            offset += len(line)
+        return spans
+
+    def find(self, text: str, ignore_case: bool = False) -> List[TermMatch]:
+        """
+        Non-overlapping term matches outside code and links, leftmost-longest, in text order.
+
+        ignore_case also matches acronyms in any case (for queries: "cdc").
+        """
+        lowered = _lower(text)
+        candidates = []
+        for pattern_index, end in self._automaton.iter(lowered):
+            pattern, (term, exact) = self._patterns[pattern_index]
+            start = end - len(pattern)
+            if start > 0 and _is_word_char(text[start - 1]) or end < len(text) and _is_word_char(text[end]):
+                continue
+            if exact is not None and not ignore_case and text[start:end] != exact:
+                continue
+            candidates.append((start, end, term))
+        candidates.sort(key=lambda match: (match[0], -match[1]))
+
+        spans = self._protected(text)
+        protected = [(start, end) for start, end, heading in spans if not heading]
+        headings = [(start, end) for start, end, heading in spans if heading]
+        matches: List[TermMatch] = []
+        last_end = 0
+        p = h = 0
+        for start, end, term in candidates:
+            if start < last_end:
+                continue
+            # Spans are in text order, as are candidates: advance past spans that end before start
+            while p < len(protected) and protected[p][1] <= start:
+                p += 1
+            if p < len(protected) and protected[p][0] < end:
+                continue
+            while h < len(headings) and headings[h][1] <= start:
+                h += 1
+            in_heading = h < len(headings) and headings[h][0] <= start
+            matches.append(TermMatch(term, start, end, in_heading))
+            last_end = end
+        return matches
+
+    def terms_in(self, text: str, ignore_case: bool = False) -> List[int]:
+        """Indexes of the terms text mentions, in order of first mention."""
+        return list(dict.fromkeys(match.term for match in self.find(text, ignore_case)))
+
+    def link_first_occurrences(self, body: str, page_url: str) -> Tuple[str, int]:
+        """
+        body with the first mention of each term (outside headings) linked to its definition.
+
+        Terms the page already links to its definition are skipped, and
+        glossary pages are returned unchanged. Returns (body, links added).
+        """
+        linked = set()
+        for index, term in enumerate(self.terms):
+            if term.url.split("#")[0] == page_url:
+                return body, 0
+            if term.url.split("#")[0] in body:
+                linked.add(index)
+        parts = []
+        position = 0
+        for match in self.find(body):
+            if match.heading or match.term in linked:
+                continue
+            linked.add(match.term)
+            target = self.terms[match.term].url
+            parts.append(body[position:match.start])
+            parts.append(f"[{body[match.start:match.end]}]({{{{ '{target}' | relative_url }}}})")
+            position = match.end
+        parts.append(body[position:])
+        return "".join(parts), len(parts) // 2
+
+
+def annotate(matcher: GlossaryMatcher, chunks: Iterable) -> Dict[str, List[int]]:
+    """Chunk id -> indexes of the glossary terms its title or text mentions (chunks that mention none are left out)."""
+    annotations = {}
+    for chunk in chunks:
+        terms = matcher.terms_in(f"{chunk.title}\n{chunk.text}")
+        if terms:
+            annotations[chunk.id] = terms
+    return annotations
+
+
+def write_annotations(artifacts: ArtifactWriter, index_dir: Path, terms: Sequence[GlossaryTerm],
+                      annotations: Dict[str, List[int]]) -> None:
+    artifacts.write_json(Path(index_dir) / GLOSSARY_FILE, {
+        "terms": [term._asdict() for term in terms],
+        "chunks": dict(sorted(annotations.items())),
+    }, indent=None, separators=(",", ":"))
+
+
+def read_annotations(index_dir: Path = INDEX_DIR) -> Optional[Tuple[List[GlossaryTerm], Dict[str, List[int]]]]:
+    """(terms, chunk id -> term indexes) saved by write_annotations(), or None."""
+    try:
+        data = json.loads((Path(index_dir) / GLOSSARY_FILE).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    terms = [GlossaryTerm(t["term"], tuple(t["synonyms"]), t["definition"], t["url"]) for t in data["terms"]]
+    return terms, data["chunks"]
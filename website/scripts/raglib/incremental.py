@@ -0,0 +1,300 @@
+"""
+Build, update and compact the segmented retrieval index (raglib.segments).
+
+build_index()   full build: every page chunked, one segment
+update_index()  re-chunk only the pages whose files changed since the last
+                build or update, and write their new chunks as one small
+                segment plus tombstones for the chunks they replaced
+merge_index()   compact all segments into one, dropping tombstoned chunks
+
+An update stats every page (cheap) but reads, chunks and embeds only the
+changed ones, with the embedder fitted by the last full build, so it takes
+time proportional to the edit. Updates and merges hold a lock on the index
+directory; readers are never blocked: segments are immutable and the
+manifest is replaced atomically.
+
+The FAQ and code indexes (raglib.faq, raglib.code_index) are small and are
+rewritten whole by builds and updates, from the items of the changed pages
+plus the stored ones (PAGE_INDEXES).
+Near-duplicate clusters (raglib.dedup) and the spelling index
+(raglib.spelling) are built by builds and merges; chunks and terms added by
+an update join them at the next merge. Glossary annotations
+(raglib.glossary) are keyed by chunk id: updates annotate the chunks they
+add, or every chunk when the glossary itself changed. Page records keep each
+page's outgoing links, so PageRank (raglib.linkgraph) is recomputed from the
+manifest without rereading unchanged pages. Each segment stores the folder
+and tag facets of its own chunks (raglib.facets); a page whose tags change
+has all its chunks replaced.
+"""
+
+import contextlib
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .artifacts import ArtifactWriter
+from .bm25 import BM25Index
+from .chunker import MAX_TOKENS, Chunk, page_chunks, page_code_blocks, page_qa_pairs
+from .code_index import CODE_INDEX_FILE, CodeIndex
+from .corpus import INDEX_DIR, RAG_DIR, Page, iter_page_files, read_page
+from .dedup import find_duplicates, write_duplicates
+from .facets import page_tags
+from .faq import FAQ_FILE, FaqIndex
+from .glossary import GlossaryMatcher, annotate, load_glossary, read_annotations, write_annotations
+from .linkgraph import page_links, page_ranks, write_ranks
+from .retrieval import ANN_MIN_VECTORS, Retriever, chunk_terms, write_manifest
+from .spelling import SpellingIndex, term_counts
+from .segments import manifest_build_id, needs_merge, read_manifest, segment_file
+from .vectors import VectorIndex, load_embedder
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, updates must not overlap
+    fcntl = None
+
+LOCK_FILE = ".lock"
+
+# Indexes rebuilt whole from per-page items: file -> (index class, page items, stored items)
+PAGE_INDEXES = {
+    FAQ_FILE: (FaqIndex, page_qa_pairs, FaqIndex.pairs),
+    CODE_INDEX_FILE: (CodeIndex, page_code_blocks, CodeIndex.blocks),
+}
+
+
+@contextlib.contextmanager
+def index_lock(index_dir: Path) -> Iterator[None]:
+    """Exclusive lock on index_dir for the duration of an update or merge."""
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    with open(index_dir / LOCK_FILE, "w") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def _file_record(file_path: Path, data: bytes) -> dict:
+    stat = file_path.stat()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha1": hashlib.sha1(data).hexdigest()}
+
+
+def _page_record(page: Page, file_path: Path, chunks: List[Chunk]) -> dict:
+    # Title, URL and tags belong to every chunk but are not in its id
+    return {**_file_record(file_path, file_path.read_bytes()), "title": page.title, "url": page.url,
+            "tags": page_tags(page.frontmatter), "chunks": [chunk.id for chunk in chunks],
+            "links": page_links(page.body)}
+
+
+def _ranks(pages: Dict[str, dict]) -> Dict[str, float]:
+    """PageRank of the pages, from the links in their records."""
+    return page_ranks([(path, record["url"], record.get("links", [])) for path, record in sorted(pages.items())])
+
+
+def build_index(artifacts: ArtifactWriter, index_dir: Path = INDEX_DIR, rag_dir: Path = RAG_DIR,
+                max_tokens: int = MAX_TOKENS, ann: bool = False) -> Retriever:
+    """Chunk and index every page as a single segment (ann: also build the IVF index)."""
+    pages: Dict[str, dict] = {}
+    chunks: List[Chunk] = []
+    items: Dict[str, List[Any]] = {name: [] for name in PAGE_INDEXES}
+    for file_path in iter_page_files(rag_dir):
+        page = read_page(file_path, rag_dir)
+        page_chunk_list = list(page_chunks(page, max_tokens))
+        pages[page.path] = _page_record(page, file_path, page_chunk_list)
+        chunks.extend(page_chunk_list)
+        for name, (_, page_items, _) in PAGE_INDEXES.items():
+            items[name].extend(page_items(page))
+    retriever = Retriever.from_chunks(chunks, tags={path: record["tags"] for path, record in pages.items()})
+    if ann or len(chunks) >= ANN_MIN_VECTORS:
+        retriever.build_ann()
+    duplicates = find_duplicates(chunks)
+    terms = load_glossary(rag_dir)
+    annotations = annotate(GlossaryMatcher(terms), chunks)
+    ranks = _ranks(pages)
+    spelling = SpellingIndex.build(term_counts(retriever.index))
+    with index_lock(index_dir):
+        retriever.save(artifacts, index_dir, pages=pages, chunk_tokens=max_tokens)
+        for name, (index_class, _, _) in PAGE_INDEXES.items():
+            index_class.build(items[name]).save(artifacts, index_dir)
+        write_duplicates(artifacts, index_dir, chunks, duplicates)
+        write_annotations(artifacts, index_dir, terms, annotations)
+        write_ranks(artifacts, index_dir, ranks)
+        spelling.save(artifacts, index_dir)
+    retriever.set_duplicates([[chunks[row].id for row in cluster] for cluster in duplicates])
+    retriever.set_glossary(terms, annotations)
+    retriever.set_page_ranks(ranks)
+    retriever.set_spelling(spelling)
+    return retriever
+
+
+def _changed_pages(manifest: dict, rag_dir: Path) -> Tuple[Dict[str, dict], List[Tuple[str, Optional[Path]]]]:
+    """
+    Updated page records and the pages whose content changed.
+
+    Returns (pages, changed) where changed lists (path, file path) pairs,
+    with file path None for deleted pages. Files whose size and mtime match
+    the manifest are not read.
+    """
+    pages = dict(manifest["pages"])
+    changed = []
+    seen = set()
+    for file_path in iter_page_files(rag_dir):
+        path = file_path.relative_to(rag_dir).as_posix()
+        seen.add(path)
+        record = pages.get(path)
+        stat = file_path.stat()
+        if record and record["mtime_ns"] == stat.st_mtime_ns and record["size"] == stat.st_size:
+            continue
+        data = file_path.read_bytes()
+        new_record = _file_record(file_path, data)
+        if record and record["sha1"] == new_record["sha1"]:
+            pages[path] = {**record, **new_record}  # touched, not edited
+            continue
+        changed.append((path, file_path))
+    for path in sorted(set(pages) - seen):
+        changed.append((path, None))
+    return pages, changed
+
+
+def update_index(artifacts: ArtifactWriter, index_dir: Path = INDEX_DIR,
+                 rag_dir: Path = RAG_DIR) -> Optional[dict]:
+    """
+    Apply the page edits made since the last build or update as a new segment.
+
+    Returns a summary {"pages", "added", "deleted", "segment", "manifest"},
+    or None when there is no index to update (or it was built without page
+    records or vectors) and a full build is needed.
+    """
+    index_dir = Path(index_dir)
+    with index_lock(index_dir):
+        manifest = read_manifest(index_dir)
+        if manifest is None or manifest.get("pages") is None or not manifest.get("embedder"):
+            return None
+        pages, changed = _changed_pages(manifest, rag_dir)
+        generation = manifest["generation"] + 1
+        added: List[Chunk] = []
+        deleted: List[str] = []
+        items: Dict[str, List[Any]] = {name: [] for name in PAGE_INDEXES}
+        for path, file_path in changed:
+            record = pages.get(path, {})
+            old_ids = record.get("chunks", [])
+            if file_path is None:
+                deleted.extend(old_ids)
+                del pages[path]
+                continue
+            page = read_page(file_path, rag_dir)
+            new_chunks = list(page_chunks(page, manifest["chunk_tokens"]))
+            new_ids = {chunk.id for chunk in new_chunks}
+            kept = set(old_ids) & new_ids
+            pages[path] = _page_record(page, file_path, new_chunks)
+            carried = ("title", "url", "tags")
+            if [record.get(key) for key in carried] != [pages[path][key] for key in carried]:
+                kept = set()  # every chunk carries them: replace all
+            added.extend(chunk for chunk in new_chunks if chunk.id not in kept)
+            deleted.extend(chunk_id for chunk_id in old_ids if chunk_id not in kept)
+            for name, (_, page_items, _) in PAGE_INDEXES.items():
+                items[name].extend(page_items(page))
+        if changed:
+            _update_page_indexes(artifacts, index_dir, rag_dir, {path for path, _ in changed}, items)
+            _update_glossary(artifacts, index_dir, rag_dir, manifest["chunk_tokens"], added, deleted)
+            write_ranks(artifacts, index_dir, _ranks(pages))
+
+        summary = {"pages": len(changed), "added": len(added), "deleted": len(deleted), "segment": None}
+        if not added and not deleted:
+            if pages != manifest["pages"]:
+                write_manifest(artifacts, index_dir, {**manifest, "pages": pages})
+            summary["manifest"] = {**manifest, "pages": pages}
+            return summary
+
+        segments = list(manifest["segments"])
+        segment_digest = ""
+        if added:
+            embedder = load_embedder(index_dir, manifest["embedder"])
+            tags = {path: pages[path]["tags"] for path in {chunk.path for chunk in added}}
+            data = Retriever.from_chunks(added, embedder=embedder, tags=tags).to_bytes()
+            segment = segment_file(generation)
+            artifacts.write_bytes(index_dir / segment, data)
+            segments.append({"file": segment, "generation": generation, "chunks": len(added)})
+            segment_digest = hashlib.sha1(data).hexdigest()
+            summary["segment"] = segment
+        tombstones = dict(manifest["tombstones"])
+        tombstones.update((chunk_id, generation) for chunk_id in deleted)
+        new_manifest = {
+            **manifest,
+            "build_id": manifest_build_id(manifest["build_id"], segment_digest, deleted),
+            "generation": generation,
+            "segments": segments,
+            "tombstones": tombstones,
+            "pages": pages,
+        }
+        write_manifest(artifacts, index_dir, new_manifest)
+        summary["manifest"] = new_manifest
+        return summary
+
+
+def _update_page_indexes(artifacts: ArtifactWriter, index_dir: Path, rag_dir: Path, paths: set,
+                         items: Dict[str, List[Any]]) -> None:
+    """Rebuild every PAGE_INDEXES index with the items of the changed pages (paths) replaced."""
+    for name, (index_class, page_items, stored_items) in PAGE_INDEXES.items():
+        if (index_dir / name).exists():
+            new_items = [item for item in stored_items(index_class.load(index_dir)) if item.path not in paths]
+            new_items += items[name]
+        else:
+            # Index built before this one existed: take every page
+            new_items = [item for file_path in iter_page_files(rag_dir)
+                         for item in page_items(read_page(file_path, rag_dir))]
+        index_class.build(sorted(new_items, key=lambda item: Path(item.path).parts)).save(artifacts, index_dir)
+
+
+def _update_glossary(artifacts: ArtifactWriter, index_dir: Path, rag_dir: Path, max_tokens: int,
+                     added: List[Chunk], deleted: List[str]) -> None:
+    """Annotate the added chunks and drop the deleted ones (re-annotate all if the glossary changed)."""
+    terms = load_glossary(rag_dir)
+    stored = read_annotations(index_dir)
+    if stored is None or stored[0] != terms:
+        chunks = [chunk for file_path in iter_page_files(rag_dir)
+                  for chunk in page_chunks(read_page(file_path, rag_dir), max_tokens)]
+        write_annotations(artifacts, index_dir, terms, annotate(GlossaryMatcher(terms), chunks))
+        return
+    annotations = stored[1]
+    for chunk_id in deleted:
+        annotations.pop(chunk_id, None)
+    annotations.update(annotate(GlossaryMatcher(terms), added))
+    write_annotations(artifacts, index_dir, terms, annotations)
+
+
+def merge_index(artifacts: ArtifactWriter, index_dir: Path = INDEX_DIR, force: bool = False) -> Optional[dict]:
+    """
+    Compact all segments into one (if needs_merge() says so, or force).
+
+    Live chunks are kept in page order, with the vectors they already have;
+    only BM25 is rebuilt. Returns the new manifest, or None if nothing was
+    merged.
+    """
+    index_dir = Path(index_dir)
+    with index_lock(index_dir):
+        manifest = read_manifest(index_dir)
+        if manifest is None or not (force or needs_merge(manifest)):
+            return None
+        if len(manifest["segments"]) <= 1 and not manifest["tombstones"]:
+            return None
+        old = Retriever.load(index_dir)
+        rows = np.arange(len(old.chunks)) if old.live is None else np.flatnonzero(old.live)
+        # Page order, as a full build would have it
+        position = {chunk_id: (path, i) for path, record in manifest["pages"].items()
+                    for i, chunk_id in enumerate(record["chunks"])}
+        rows = sorted(rows.tolist(), key=lambda row: position.get(old.chunks.ids[row], (old.chunks[row].path, 0)))
+        chunks = [old.chunks[row] for row in rows]
+        index = BM25Index.build(chunk_terms(chunk) for chunk in chunks)
+        vectors = None
+        if old.vectors is not None:
+            vectors = VectorIndex([chunk.id for chunk in chunks], old.vectors.vectors[rows],
+                                  old.vectors.embedder_config)
+        merged = Retriever(chunks, index, vectors, old.embedder, facets=old.facets.take(rows))
+        if manifest.get("ann") or len(chunks) >= ANN_MIN_VECTORS:
+            merged.build_ann()
+        merged.save(artifacts, index_dir, pages=manifest["pages"], chunk_tokens=manifest["chunk_tokens"],
+                    generation=manifest["generation"] + 1)
+        write_duplicates(artifacts, index_dir, chunks, find_duplicates(chunks))
+        SpellingIndex.build(term_counts(index)).save(artifacts, index_dir)
+        return read_manifest(index_dir) if not artifacts.dry_run else None
@@ -0,0 +1,178 @@
+"""
+Versioned single-file container for memory-mapped indexes.
+
+Layout:
+
+    MAGIC (8 bytes) | version (u32) | reserved (u32) | header length (u64)
+    header: JSON {"meta": {...}, "arrays": {name: {offset, dtype, shape}},
+                  "strings": [name, ...]}
+    array data, each array starting on a 64-byte boundary
+
+A string table is stored as two arrays: "<name>.blob" (UTF-8 bytes of all
+strings back to back) and "<name>.offsets" (n + 1 int64 offsets into it).
+
+IndexFile.open() maps the file and hands out NumPy views (np.frombuffer
+over a memoryview of the map): nothing is parsed or copied up front, so
+opening takes the same time whatever the index size, and every process that
+opens the same file shares one copy in the page cache. Files are replaced by
+an atomic rename, so a reader keeps the version it opened.
+"""
+
+import json
+import mmap
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, Mapping, Optional, Sequence
+
+import numpy as np
+
+MAGIC = b"RAGINDEX"
+VERSION = 1
+ALIGN = 64
+_PREFIX = struct.Struct("<8sIIQ")
+
+
+def _aligned(size: int) -> int:
+    return (size + ALIGN - 1) // ALIGN * ALIGN
+
+
+def pack_strings(strings: Sequence[str]) -> Dict[str, np.ndarray]:
+    """The blob and offsets arrays of a string table."""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded], dtype=np.int64)
+    return {"blob": np.frombuffer(b"".join(encoded), dtype=np.uint8), "offsets": offsets}
+
+
+def pack_index_file(arrays: Mapping[str, np.ndarray], strings: Optional[Mapping[str, Sequence[str]]] = None,
+                    meta: Optional[dict] = None) -> bytes:
+    """
+    Serialize arrays (stored little-endian, C order) and string tables.
+
+    The output is deterministic: the same input gives the same bytes.
+    """
+    arrays = {name: np.ascontiguousarray(array, dtype=np.asarray(array).dtype.newbyteorder("<"))
+              for name, array in arrays.items()}
+    for name, values in (strings or {}).items():
+        for part, array in pack_strings(values).items():
+            arrays[f"{name}.{part}"] = array
+
+    layout: Dict[str, dict] = {}
+    position = 0
+    for name, array in arrays.items():
+        layout[name] = {"offset": position, "dtype": array.dtype.str, "shape": list(array.shape)}
+        position += _aligned(array.nbytes)
+    header = json.dumps({"meta": meta or {}, "arrays": layout, "strings": sorted(strings or {})},
+                        sort_keys=True, separators=(",", ":")).encode("utf-8")
+    base = _aligned(_PREFIX.size + len(header))
+    parts = [_PREFIX.pack(MAGIC, VERSION, 0, len(header)), header, b"\0" * (base - _PREFIX.size - len(header))]
+    for array in arrays.values():
+        parts.append(array.tobytes())
+        parts.append(b"\0" * (_aligned(array.nbytes) - array.nbytes))
+    return b"".join(parts)
+
+
+class StringTable(Sequence):
+    """Read-only sequence of strings decoded on access from a blob and offsets."""
+
+    def __init__(self, blob: memoryview, offsets: np.ndarray):
+        self._blob = blob
+        # A memoryview indexes to plain ints, several times faster than NumPy scalars
+        self._offsets = memoryview(np.ascontiguousarray(offsets, dtype=np.int64)).cast("B").cast("q")
+        self._length = len(offsets) - 1
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._length))]
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("string table index out of range")
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        blob, offsets = self._blob, self._offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield str(blob[start:end], "utf-8")
+
+    def index_of(self, value: str, order: Optional[np.ndarray] = None) -> Optional[int]:
+        """
+        Position of value by binary search, or None.
+
+        The table must be sorted (by code point), or order must be the
+        permutation that sorts it (e.g. np.argsort of the strings).
+        """
+        low, high = 0, self._length
+        while low < high:
+            middle = (low + high) // 2
+            candidate = self[int(order[middle]) if order is not None else middle]
+            if candidate < value:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._length:
+            position = int(order[low]) if order is not None else low
+            if self[position] == value:
+                return position
+        return None
+
+
+class IndexFile:
+    """
+    A memory-mapped index container.
+
+    Usage:
+        data = pack_index_file({"weights": weights}, {"terms": terms}, {"doc_count": 10})
+        index_file = IndexFile.open(path)
+        index_file.meta["doc_count"], index_file.array("weights"), index_file.strings("terms")[0]
+    """
+
+    def __init__(self, buffer, header: dict, base: int, path: Optional[Path] = None):
+        self._buffer = memoryview(buffer)
+        self.meta = header["meta"]
+        self._arrays = header["arrays"]
+        self._strings = set(header["strings"])
+        self._base = base
+        self.path = path
+
+    @classmethod
+    def open(cls, path: Path) -> "IndexFile":
+        """Map a file written from pack_index_file() (read-only)."""
+        path = Path(path)
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.from_buffer(buffer, path)
+
+    @classmethod
+    def from_buffer(cls, buffer, path: Optional[Path] = None) -> "IndexFile":
+        name = path or "buffer"
+        if len(buffer) < _PREFIX.size:
+            raise ValueError(f"{name} is not an index file")
+        magic, version, _, header_length = _PREFIX.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{name} is not an index file")
+        if version != VERSION:
+            raise ValueError(f"{name} is index format version {version}; this code reads version {VERSION}")
+        header = json.loads(bytes(buffer[_PREFIX.size:_PREFIX.size + header_length]))
+        return cls(buffer, header, _aligned(_PREFIX.size + header_length), path)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._arrays or name in self._strings
+
+    def array(self, name: str) -> np.ndarray:
+        """Zero-copy read-only view of an array."""
+        spec = self._arrays[name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = self._base + spec["offset"]
+        array = np.frombuffer(self._buffer, dtype=dtype, count=count, offset=start) if count else np.empty(0, dtype)
+        return array.reshape(spec["shape"])
+
+    def strings(self, name: str) -> StringTable:
+        spec = self._arrays[f"{name}.blob"]
+        start = self._base + spec["offset"]
+        blob = self._buffer[start:start + spec["shape"][0]]
+        return StringTable(blob, self.array(f"{name}.offsets"))
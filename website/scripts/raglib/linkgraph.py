@@ -0,0 +1,148 @@
+"""
+Page authority from the internal link graph (PageRank).
+
+Pages link to each other with Jekyll links,
+[text]({{ '/rag/development/flow-patterns.html' | relative_url }}); a page
+that many pages (or a few well-linked ones) point to is central to the
+library. link_graph() collects those links as edge lists and
+pagerank() runs power iteration over them: each iteration is one gather and
+one np.bincount over the edges, O(edges) with no per-node Python loop, so
+graphs with hundreds of thousands of edges converge in well under a second.
+NumPy is imported lazily; without it (the deploy workflow installs only
+PyYAML for sync-homepage.py, update-website.py and build-search-index.py
+--target client) the same iteration runs as a plain-Python loop, which is
+fine at the library's size but not at that scale. Dangling pages (no
+outgoing links) spread their rank evenly.
+
+Ranks are scaled so the average page has rank 1.0. rank_weights() maps them
+to [0, 1] on a log scale (PageRank is heavy-tailed) for:
+- sitemap <priority> (update-website.py);
+- the "rank" field of rag-library.json (sync-homepage.py);
+- Retriever.search(rank_boost=True), from RANKS_FILE written next to the
+  retrieval index by build-search-index.py.
+
+Usage:
+    ranks = corpus_ranks()               # {"development/flow-patterns.md": 3.2, ...}
+    weights = rank_weights(ranks)        # same keys, 0.0 (least linked) .. 1.0
+"""
+
+import json
+import math
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .artifacts import ArtifactWriter
+from .corpus import INDEX_DIR, RAG_DIR, iter_pages
+
+RANKS_FILE = "pagerank.json"
+DAMPING = 0.85
+TOLERANCE = 1e-10
+MAX_ITERATIONS = 100
+
+RELATIVE_URL_PATTERN = re.compile(r"\{\{\s*['\"](/rag/[^'\"#?]+)[^'\"]*['\"]\s*\|\s*relative_url\s*\}\}")
+FENCED_CODE_PATTERN = re.compile(r"^(`{3,}|~{3,}).*?^\1", re.MULTILINE | re.DOTALL)
+
+
+def page_links(body: str) -> List[str]:
+    """Distinct /rag/ URLs a page body links to with relative_url (outside code fences), sorted."""
+    return sorted(set(RELATIVE_URL_PATTERN.findall(FENCED_CODE_PATTERN.sub("", body))))
+
+
+def link_graph(pages: Sequence[Tuple[str, str, Iterable[str]]]) -> Tuple[List[int], List[int]]:
+    """
+    Edge lists (sources, targets) of pages given as (path, url, linked URLs), sorted.
+
+    Rows follow the order of pages. Links to unknown URLs and to the page
+    itself are dropped; repeated links count once.
+    """
+    rows = {url: row for row, (_, url, _) in enumerate(pages)}
+    edges = sorted({(row, rows[link]) for row, (_, url, links) in enumerate(pages)
+                    for link in links if link in rows and link != url})
+    return [source for source, _ in edges], [target for _, target in edges]
+
+
+def pagerank(sources: Sequence[int], targets: Sequence[int], count: int, damping: float = DAMPING,
+             tolerance: float = TOLERANCE, max_iterations: int = MAX_ITERATIONS) -> List[float]:
+    """PageRank of count nodes over the edges sources[i] -> targets[i]; sums to 1."""
+    if count == 0:
+        return []
+    try:
+        import numpy as np
+    except ImportError:
+        return _pagerank_python(sources, targets, count, damping, tolerance, max_iterations)
+
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    out_degree = np.bincount(sources, minlength=count).astype(np.float64)
+    dangling = out_degree == 0
+    # Share of a source's rank each of its edges carries
+    edge_share = 1.0 / out_degree[sources]
+    rank = np.full(count, 1.0 / count)
+    for _ in range(max_iterations):
+        incoming = np.bincount(targets, weights=rank[sources] * edge_share, minlength=count)
+        new_rank = (1 - damping) / count + damping * (incoming + rank[dangling].sum() / count)
+        converged = np.abs(new_rank - rank).sum() < tolerance
+        rank = new_rank
+        if converged:
+            break
+    return (rank / rank.sum()).tolist()
+
+
+def _pagerank_python(sources: Sequence[int], targets: Sequence[int], count: int, damping: float,
+                     tolerance: float, max_iterations: int) -> List[float]:
+    """pagerank() without NumPy: the same iteration, one Python loop over the edges."""
+    edges = list(zip(sources, targets))
+    out_degree = [0] * count
+    for source in sources:
+        out_degree[source] += 1
+    dangling = [node for node in range(count) if not out_degree[node]]
+    rank = [1.0 / count] * count
+    for _ in range(max_iterations):
+        incoming = [0.0] * count
+        for source, target in edges:
+            incoming[target] += rank[source] / out_degree[source]
+        base = (1 - damping) / count + damping * sum(rank[node] for node in dangling) / count
+        new_rank = [base + damping * value for value in incoming]
+        converged = sum(abs(new - old) for new, old in zip(new_rank, rank)) < tolerance
+        rank = new_rank
+        if converged:
+            break
+    total = sum(rank)
+    return [value / total for value in rank]
+
+
+def page_ranks(pages: Sequence[Tuple[str, str, Iterable[str]]]) -> Dict[str, float]:
+    """Path -> PageRank of pages given as (path, url, linked URLs), scaled so the mean is 1."""
+    pages = list(pages)
+    sources, targets = link_graph(pages)
+    rank = pagerank(sources, targets, len(pages))
+    return {path: round(value * len(pages), 4) for (path, _, _), value in zip(pages, rank)}
+
+
+def corpus_ranks(rag_dir: Path = RAG_DIR) -> Dict[str, float]:
+    """page_ranks() of every page in rag/."""
+    return page_ranks([(page.path, page.url, page_links(page.body)) for page in iter_pages(rag_dir)])
+
+
+def rank_weights(ranks: Dict[str, float]) -> Dict[str, float]:
+    """Ranks mapped to [0, 1] on a log scale: 0 for the least-linked page, 1 for the most."""
+    if not ranks:
+        return {}
+    logs = {path: math.log(max(rank, 1e-12)) for path, rank in ranks.items()}
+    low, high = min(logs.values()), max(logs.values())
+    spread = high - low or 1.0
+    return {path: (value - low) / spread for path, value in logs.items()}
+
+
+def write_ranks(artifacts: ArtifactWriter, index_dir: Path, ranks: Dict[str, float]) -> None:
+    artifacts.write_json(Path(index_dir) / RANKS_FILE, {"damping": DAMPING, "ranks": dict(sorted(ranks.items()))},
+                         indent=None, separators=(",", ":"))
+
+
+def read_ranks(index_dir: Path = INDEX_DIR) -> Optional[Dict[str, float]]:
+    """Path -> rank saved by write_ranks(), or None."""
+    try:
+        return json.loads((Path(index_dir) / RANKS_FILE).read_text(encoding="utf-8"))["ranks"]
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,160 @@
+"""
+MinHash signatures and LSH banding, vectorized with NumPy.
+
+The Jaccard similarity of two sets is the probability that they have the
+same minimum under a random hash permutation, so a signature of num_perm
+minima estimates it. LSH cuts signatures into bands of rows: two sets share
+a band (land in the same bucket) with probability 1 - (1 - J^rows)^bands, a
+steep S-curve around (1 / bands) ** (1 / rows). Only pairs sharing a bucket
+are candidates, so finding near-duplicates takes time close to linear in the
+number of sets instead of comparing all pairs.
+
+Used by raglib.faq (questions as term sets) and raglib.dedup (chunks as
+word shingles).
+
+Usage:
+    hasher = MinHasher(num_perm=128, seed=1)
+    hashes = [shingle_hashes(hash_tokens(words), 5) for words in documents]
+    signatures = hasher.signatures(hashes)            # (documents, 128) uint32
+    for i, j in candidate_pairs(signatures, bands=32):
+        jaccard(hashes[i], hashes[j])
+"""
+
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Modulus of the permutations (a Mersenne prime, so a * h + b fits in uint64)
+PRIME = (1 << 31) - 1
+# Shingles hashed per block of signatures(): bounds memory to
+# num_perm * BLOCK_SHINGLES * 8 bytes
+BLOCK_SHINGLES = 1 << 16
+# Multiplier combining word hashes into a shingle hash (odd, so invertible mod 2^64)
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def hash_tokens(tokens: Iterable[str], cache: Optional[Dict[str, int]] = None) -> np.ndarray:
+    """CRC-32 of every token (deterministic across runs, unlike hash()), as uint64."""
+    if cache is None:
+        return np.array([zlib.crc32(token.encode("utf-8")) for token in tokens], dtype=np.uint64)
+    hashes = []
+    for token in tokens:
+        value = cache.get(token)
+        if value is None:
+            value = cache[token] = zlib.crc32(token.encode("utf-8"))
+        hashes.append(value)
+    return np.array(hashes, dtype=np.uint64)
+
+
+def shingle_hashes(token_hashes: np.ndarray, size: int) -> np.ndarray:
+    """
+    Distinct hashes of the size-token shingles (sliding windows), sorted.
+
+    A sequence shorter than size is one shingle; an empty one has none.
+    """
+    count = len(token_hashes)
+    if count == 0:
+        return np.empty(0, dtype=np.uint64)
+    size = min(size, count)
+    windows = count - size + 1
+    combined = np.zeros(windows, dtype=np.uint64)
+    with np.errstate(over="ignore"):  # wrapping mod 2^64 is intended
+        for offset in range(size):
+            combined = combined * _SHINGLE_MULTIPLIER + token_hashes[offset:offset + windows]
+    return np.unique(combined)
+
+
+def jaccard(x: np.ndarray, y: np.ndarray) -> float:
+    """Jaccard similarity of two sorted arrays of distinct hashes."""
+    if not len(x) and not len(y):
+        return 0.0
+    common = len(np.intersect1d(x, y, assume_unique=True))
+    return common / (len(x) + len(y) - common)
+
+
+class MinHasher:
+    """num_perm seeded permutations h -> (a * h + b) mod PRIME."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        self.num_perm = num_perm
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, PRIME, num_perm, dtype=np.uint64)[:, None]
+        self.b = rng.integers(0, PRIME, num_perm, dtype=np.uint64)[:, None]
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        """MinHash of one set of hashes (all PRIME if it is empty)."""
+        return self.signatures([hashes])[0]
+
+    def signatures(self, hash_sets: Sequence[np.ndarray]) -> np.ndarray:
+        """
+        MinHash of every set, as a (len(hash_sets), num_perm) uint32 array.
+
+        The sets are concatenated and permuted in blocks of about
+        BLOCK_SHINGLES hashes; np.minimum.reduceat takes each set's minima.
+        """
+        result = np.full((len(hash_sets), self.num_perm), PRIME, dtype=np.uint32)
+        sizes = np.array([len(hashes) for hashes in hash_sets], dtype=np.int64)
+        start = 0
+        while start < len(hash_sets):
+            end, total = start, 0
+            while end < len(hash_sets) and (end == start or total + sizes[end] <= BLOCK_SHINGLES):
+                total += sizes[end]
+                end += 1
+            members = [i for i in range(start, end) if sizes[i]]
+            if members:
+                block = np.concatenate([hash_sets[i] for i in members]).astype(np.uint64) % np.uint64(PRIME)
+                permuted = (self.a * block[None, :] + self.b) % np.uint64(PRIME)
+                offsets = np.concatenate([[0], np.cumsum(sizes[members])[:-1]])
+                result[members] = np.minimum.reduceat(permuted, offsets, axis=1).T
+            start = end
+        return result
+
+
+def band_keys(signatures: np.ndarray, bands: int) -> np.ndarray:
+    """One uint64 bucket key per (set, band): a (len(signatures), bands) array."""
+    count, num_perm = signatures.shape
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+    rows = num_perm // bands
+    parts = signatures.reshape(count, bands, rows).astype(np.uint64)
+    keys = np.zeros((count, bands), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for row in range(rows):
+            keys = keys * _SHINGLE_MULTIPLIER + parts[:, :, row]
+    return keys
+
+
+def candidate_pairs(signatures: np.ndarray, bands: int,
+                    valid: Optional[np.ndarray] = None) -> Iterator[Tuple[int, int]]:
+    """
+    Distinct pairs (i < j) of rows that share at least one band bucket.
+
+    valid masks out rows that must not pair (e.g. empty sets, whose
+    signatures are all equal).
+    """
+    keys = band_keys(signatures, bands)
+    rows = np.arange(len(signatures)) if valid is None else np.flatnonzero(valid)
+    seen = set()
+    for band in range(bands):
+        column = keys[rows, band]
+        order = np.argsort(column, kind="stable")
+        sorted_keys = column[order]
+        # Runs of equal keys are buckets; only those with two or more members matter
+        boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+        starts = np.concatenate([[0], boundaries])
+        ends = np.concatenate([boundaries, [len(sorted_keys)]])
+        for bucket in np.flatnonzero(ends - starts > 1).tolist():
+            members = rows[order[starts[bucket]:ends[bucket]]].tolist()
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    pair = (members[x], members[y]) if members[x] < members[y] else (members[y], members[x])
+                    if pair not in seen:
+                        seen.add(pair)
+                        yield pair
+
+
+def band_digests(signature: np.ndarray, bands: int) -> List[int]:
+    """The bucket keys of one signature (same values as band_keys)."""
+    return band_keys(signature[None, :], bands)[0].tolist()
@@ -0,0 +1,831 @@
+"""
+Retrieval over the rag/ knowledge library.
+
+Pages are split into heading- and Q&A-level chunks (raglib.chunker) and
+ranked with BM25 (raglib.bm25, mode="keyword"), by cosine similarity of
+offline embeddings (raglib.vectors, mode="semantic"), or by both at once,
+fused with reciprocal rank fusion (mode="hybrid"). The indexes are built by
+build-search-index.py into INDEX_DIR as memory-mapped segments
+(raglib.indexfile, raglib.segments), so loading takes milliseconds and page
+edits are applied incrementally; if they aren't there, search() builds them
+from rag/ on first use. search() caches results (raglib.cache) until
+the index is rebuilt. Searches filtered by folder or frontmatter tag use the
+facet bitsets stored with the index (raglib.facets).
+
+Usage:
+    from raglib.retrieval import search
+
+    for result in search("bulkify trigger", k=5, folder="development"):
+        print(f"{result.score:.2f}  {result.url}  {result.title}")
+
+    search("avoid hitting SOQL limits in triggers", mode="semantic")
+    search("Database.Stateful batch", mode="hybrid")
+    search("batch apex", folder="code-examples/apex", tags=("performance",))
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .artifacts import ArtifactWriter
+from .bm25 import BM25Index
+from .cache import QueryCache, query_key
+from .chunker import MAX_TOKENS, Chunk, iter_chunks
+from .corpus import INDEX_DIR, iter_pages, plain_text
+from .dedup import read_duplicates
+from .facets import TAG_PREFIX, FacetIndex, page_tags
+from .glossary import GlossaryMatcher, GlossaryTerm, read_annotations
+from .linkgraph import rank_weights, read_ranks
+from .indexfile import IndexFile, pack_index_file
+from .spelling import SpellingIndex, read_spelling, term_counts
+from .segments import (FORMAT, MANIFEST_FILE, SEGMENT_PATTERN, ConcatChunks, SegmentedBM25, SegmentedVectors,
+                       live_mask, read_manifest, segment_file)
+from .text import tokenize
+from .ann import ANN_FILE, IvfIndex
+from .vectors import LSA_FILE, LsaEmbedder, VectorIndex, load_embedder
+
+BUILD_FILE = "build.json"
+# Written by earlier versions; removed on save
+LEGACY_FILES = ("retrieval.idx", "chunks.json", "bm25.npz", "vectors.bin", "vector-ids.json", "vectors.json")
+
+MODES = ("keyword", "semantic", "hybrid")
+FUSIONS = ("rrf", "weighted")
+
+# Reciprocal rank fusion constant (the usual 60: damps the top ranks' lead)
+RRF_K = 60
+# Share of the semantic side in weighted fusion
+SEMANTIC_WEIGHT = 0.5
+# Candidates each side contributes to fusion: k * FUSION_DEPTH, at least FUSION_MIN_CANDIDATES
+FUSION_DEPTH = 5
+FUSION_MIN_CANDIDATES = 50
+# Score multiplier for chunks that mention a glossary term the query names (glossary_boost=True)
+GLOSSARY_BOOST = 1.25
+# Score bonus for the most-linked page under rank_boost=True (scaled down to 0 for the least-linked)
+RANK_BOOST = 0.2
+SEARCH_THREADS = 4
+
+# (rows, scores) arrays, best first
+Ranking = Tuple[np.ndarray, np.ndarray]
+_EMPTY_RANKING: Ranking = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+
+# Above this many chunks an IVF index is built for semantic search
+ANN_MIN_VECTORS = 50000
+
+
+class Result(NamedTuple):
+    """One ranked chunk."""
+    id: str
+    score: float
+    url: str           # /rag/...#heading-anchor
+    path: str
+    title: str
+    folder: str
+    text: str
+
+
+def chunk_terms(chunk: Chunk) -> List[str]:
+    """Index terms of a chunk: breadcrumb title plus text (so its own heading counts twice)."""
+    return tokenize(chunk.title) + tokenize(plain_text(chunk.text))
+
+
+class ChunkTable(Sequence):
+    """The chunks of a memory-mapped index file, decoded one at a time on access."""
+
+    def __init__(self, index_file: IndexFile):
+        self.ids = index_file.strings("chunk_ids")
+        self.folders = list(index_file.strings("folders"))
+        self.folder_codes = index_file.array("chunk_folders")
+        self._paths = index_file.strings("chunk_paths")
+        self._urls = index_file.strings("chunk_urls")
+        self._titles = index_file.strings("chunk_titles")
+        self._texts = index_file.strings("chunk_texts")
+        self.token_counts = index_file.array("chunk_tokens")
+        self._id_order = index_file.array("chunk_id_order")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return Chunk(self.ids[i], self._paths[i], self._urls[i], self.folders[self.folder_codes[i]],
+                     self._titles[i], self._texts[i], int(self.token_counts[i]))
+
+    def index_of(self, chunk_id: str) -> Optional[int]:
+        return self.ids.index_of(chunk_id, self._id_order)
+
+
+class Retriever:
+    """
+    Keyword (BM25), semantic (vector) and hybrid search over a list of chunks.
+
+    Usage:
+        retriever = Retriever.load()          # or Retriever.from_chunks(chunks)
+        retriever.search("sharing rules", k=10, folder="security")
+        retriever.search("who can see which records", mode="semantic")
+
+        timings = {}
+        retriever.search("WITH SECURITY_ENFORCED", mode="hybrid", timings=timings)
+        retriever.search("queuable permision set", spellcheck=True)
+        timings  # {"keyword": 0.1, "semantic": 0.3, "fusion": 0.05, "total": 0.4} (ms)
+    """
+
+    def __init__(self, chunks: Sequence[Chunk], index: BM25Index,
+                 vectors: Optional[VectorIndex] = None, embedder=None, ann: Optional[IvfIndex] = None,
+                 build_id: Optional[str] = None, live: Optional[np.ndarray] = None,
+                 facets: Optional[FacetIndex] = None):
+        if len(chunks) != index.doc_count:
+            raise ValueError(f"index has {index.doc_count} documents but {len(chunks)} chunks were given")
+        if (vectors is not None and vectors.ids is not getattr(chunks, "ids", None)
+                and list(vectors.ids) != [chunk.id for chunk in chunks]):
+            raise ValueError("vector index ids do not match the chunks")
+        self.chunks = chunks
+        self.index = index
+        self.vectors = vectors
+        self.embedder = embedder
+        # Approximate index used for semantic search when present; its nprobe
+        # attribute trades recall for latency
+        self.ann = ann
+        # Rows not hidden by a tombstone (None: all of them)
+        self.live = live
+        # Row -> canonical row of its near-duplicate cluster (see set_duplicates)
+        self.canonical: Optional[np.ndarray] = None
+        # Glossary terms and term -> rows mentioning it (see set_glossary)
+        self.glossary: Optional[GlossaryMatcher] = None
+        self.glossary_rows: Dict[int, np.ndarray] = {}
+        # Page path -> link-graph weight in [0, 1] (see set_page_ranks)
+        self.page_weights: Optional[Dict[str, float]] = None
+        if hasattr(chunks, "folder_codes"):
+            self.folders, self.folder_codes = chunks.folders, chunks.folder_codes
+        else:
+            self.folders = sorted({chunk.folder for chunk in chunks})
+            codes = {folder: i for i, folder in enumerate(self.folders)}
+            self.folder_codes = np.array([codes[chunk.folder] for chunk in chunks], dtype=np.int16)
+        # Folder and tag bitsets (built from the chunk paths on first use if not given)
+        self._facets = facets
+        self._facet_masks: Dict[tuple, Optional[np.ndarray]] = {}
+        # Symmetric-delete index of the vocabulary (built from BM25 on first use if not set)
+        self._spelling: Optional[SpellingIndex] = None
+        # Page path -> its chunk ids in page order (None: rows are in page order)
+        self.page_chunks: Optional[Dict[str, List[str]]] = None
+        self._token_counts: Optional[np.ndarray] = None
+        self._build_id = build_id
+        self._chunk_rows: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Chunk], embedder=None, dense: bool = True,
+                    tags: Optional[Dict[str, List[str]]] = None) -> "Retriever":
+        """
+        Build the indexes for chunks.
+
+        embedder defaults to an LsaEmbedder fitted on the chunks; any object
+        with embed(texts) works. dense=False skips the vector index. tags
+        (page path -> frontmatter tags) become tag facets.
+        """
+        chunks = list(chunks)
+        token_lists = [chunk_terms(chunk) for chunk in chunks]
+        index = BM25Index.build(token_lists)
+        facets = FacetIndex.build([chunk.path for chunk in chunks], tags)
+        if not dense:
+            return cls(chunks, index, facets=facets)
+        if embedder is None:
+            embedder = LsaEmbedder.fit(token_lists)
+        if hasattr(embedder, "embed_tokens"):
+            vectors = embedder.embed_tokens(token_lists)
+        else:
+            vectors = embedder.embed([f"{chunk.title}\n{plain_text(chunk.text)}" for chunk in chunks])
+        config = embedder.config() if hasattr(embedder, "config") else {"name": type(embedder).__name__}
+        return cls(chunks, index, VectorIndex([chunk.id for chunk in chunks], vectors, config), embedder,
+                   facets=facets)
+
+    @classmethod
+    def from_corpus(cls, max_tokens: int = MAX_TOKENS, dense: bool = True) -> "Retriever":
+        """Build from the rag/ pages on disk, chunked to at most max_tokens each."""
+        pages = list(iter_pages())
+        tags = {page.path: page_tags(page.frontmatter) for page in pages}
+        return cls.from_chunks(iter_chunks(pages, max_tokens), dense=dense, tags=tags)
+
+    def build_ann(self, nlist: Optional[int] = None) -> IvfIndex:
+        """Build the IVF index over the chunk vectors and use it for semantic search."""
+        self.ann = IvfIndex.build(self.vectors.vectors, nlist=nlist)
+        self._build_id = None
+        return self.ann
+
+    @property
+    def build_id(self) -> str:
+        """
+        Identifies the indexed content: changes whenever a chunk, the embedder
+        or the ANN index does, and only then (rebuilding unchanged pages keeps it).
+        """
+        if self._build_id is None:
+            digest = hashlib.sha1()
+            for chunk in self.chunks:
+                digest.update(f"{chunk.id}\0{chunk.url}\0{chunk.title}\n".encode("utf-8"))
+            if self.vectors is not None:
+                digest.update(json.dumps(self.vectors.embedder_config, sort_keys=True).encode("utf-8"))
+            if self.ann is not None:
+                digest.update(f"ann:{self.ann.nlist}".encode("utf-8"))
+            self._build_id = digest.hexdigest()[:16]
+        return self._build_id
+
+    @classmethod
+    def load(cls, index_dir: Path = INDEX_DIR, embedder=None) -> "Retriever":
+        """
+        Open indexes written by save(); raises FileNotFoundError if there are none.
+
+        Segment files are memory-mapped: nothing is parsed up front, and
+        processes serving the same index share its pages. Pass embedder if
+        the index was built with a custom one.
+        """
+        index_dir = Path(index_dir)
+        manifest = read_manifest(index_dir)
+        if manifest is None:
+            raise FileNotFoundError(index_dir / MANIFEST_FILE)
+        files = [IndexFile.open(index_dir / segment["file"]) for segment in manifest["segments"]]
+        tables = [ChunkTable(index_file) for index_file in files]
+        config = manifest.get("embedder")
+        dense = bool(files) and all("vectors" in index_file for index_file in files)
+        if dense and embedder is None:
+            embedder = load_embedder(index_dir, config)
+
+        if len(files) == 1 and not manifest["tombstones"]:
+            chunks, index_file = tables[0], files[0]
+            index = _segment_bm25(index_file)
+            vectors = ann = None
+            if dense:
+                vectors = VectorIndex(chunks.ids, index_file.array("vectors"), config)
+                if (index_dir / ANN_FILE).exists():
+                    ann = IvfIndex.load(index_dir)
+                    if len(ann.rows) != len(chunks):
+                        ann = None  # left over from an older build
+            retriever = cls(chunks, index, vectors, embedder, ann, manifest["build_id"],
+                            facets=_segment_facets(index_file))
+        else:
+            retriever = cls._load_segments(files, tables, manifest, embedder if dense else None)
+        duplicates = read_duplicates(index_dir)
+        if duplicates:
+            retriever.set_duplicates(duplicates)
+        annotations = read_annotations(index_dir)
+        if annotations:
+            retriever.set_glossary(*annotations)
+        ranks = read_ranks(index_dir)
+        if ranks:
+            retriever.set_page_ranks(ranks)
+        spelling = read_spelling(index_dir)
+        if spelling is not None:
+            retriever.set_spelling(spelling)
+        # Updates append a page's new chunks to a later segment, and merges keep that row order
+        retriever.page_chunks = {path: record.get("chunks", []) for path, record in manifest.get("pages", {}).items()}
+        return retriever
+
+    @classmethod
+    def _load_segments(cls, files: List[IndexFile], tables: List[ChunkTable], manifest: dict,
+                       embedder) -> "Retriever":
+        # Several segments: fan out, with tombstoned rows masked
+        config = manifest.get("embedder")
+        chunks = ConcatChunks(tables)
+        index = SegmentedBM25([_segment_bm25(index_file) for index_file in files])
+        vectors = None
+        if embedder is not None:
+            vectors = SegmentedVectors([VectorIndex(table.ids, index_file.array("vectors"), config)
+                                        for table, index_file in zip(tables, files)], chunks.ids, config)
+        live = live_mask(tables, [segment["generation"] for segment in manifest["segments"]],
+                         manifest["tombstones"])
+        facets = [_segment_facets(index_file) for index_file in files]
+        facets = FacetIndex.concat(facets) if all(f is not None for f in facets) else None
+        return cls(chunks, index, vectors, embedder, None, manifest["build_id"], live, facets)
+
+    def to_bytes(self) -> bytes:
+        """The chunks, BM25 index and vectors as one index file (see raglib.indexfile)."""
+        chunks = list(self.chunks)
+        ids = [chunk.id for chunk in chunks]
+        facets = self.facets
+        arrays = {
+            "chunk_folders": np.asarray(self.folder_codes, dtype=np.int16),
+            "chunk_tokens": np.array([chunk.tokens for chunk in chunks], dtype=np.int32),
+            "chunk_id_order": np.array(sorted(range(len(ids)), key=ids.__getitem__), dtype=np.int64),
+            "bm25_offsets": np.asarray(self.index.offsets, dtype=np.int64),
+            "bm25_doc_ids": np.asarray(self.index.doc_ids, dtype=np.int32),
+            "bm25_weights": np.asarray(self.index.weights, dtype=np.float32),
+            "bm25_tfs": np.asarray(self.index.tfs, dtype=np.float32),
+            "bm25_lengths": np.asarray(self.index.lengths, dtype=np.float32),
+            "facet_bits": facets.bits,
+        }
+        meta = {"doc_count": self.index.doc_count, "build_id": self.build_id}
+        if self.vectors is not None:
+            arrays["vectors"] = np.asarray(self.vectors.vectors, dtype=np.float32)
+            meta["embedder"] = self.vectors.embedder_config
+        strings = {
+            "chunk_ids": ids,
+            "chunk_paths": [chunk.path for chunk in chunks],
+            "chunk_urls": [chunk.url for chunk in chunks],
+            "chunk_titles": [chunk.title for chunk in chunks],
+            "chunk_texts": [chunk.text for chunk in chunks],
+            "folders": self.folders,
+            "facets": facets.names,
+            "terms": self.index.terms,
+        }
+        return pack_index_file(arrays, strings, meta)
+
+    def save(self, artifacts: ArtifactWriter, index_dir: Path = INDEX_DIR, pages: Optional[dict] = None,
+             chunk_tokens: int = MAX_TOKENS, generation: int = 1) -> None:
+        """
+        Write the index as a single segment (only the files that changed).
+
+        pages (path -> file stats and chunk ids, see raglib.incremental) lets
+        later updates re-chunk only the pages that change; without it, the
+        next update is a full build.
+        """
+        index_dir = Path(index_dir)
+        segment = segment_file(generation)
+        artifacts.write_bytes(index_dir / segment, self.to_bytes())
+        if self.vectors is not None and hasattr(self.embedder, "to_bytes"):
+            artifacts.write_bytes(index_dir / LSA_FILE, self.embedder.to_bytes())
+        if self.ann is not None:
+            self.ann.save(artifacts, index_dir)
+        write_manifest(artifacts, index_dir, {
+            "format": FORMAT,
+            "build_id": self.build_id,
+            "generation": generation,
+            "chunk_tokens": chunk_tokens,
+            "embedder": self.vectors.embedder_config if self.vectors is not None else None,
+            "ann": self.ann is not None,
+            "segments": [{"file": segment, "generation": generation, "chunks": len(self.chunks)}],
+            "tombstones": {},
+            "pages": pages,
+        })
+        stale = [path.name for path in sorted(index_dir.glob(SEGMENT_PATTERN)) if path.name != segment]
+        stale += [name for name in LEGACY_FILES + (ANN_FILE,) if name != ANN_FILE or self.ann is None]
+        remove_files(artifacts, index_dir, stale)
+
+    def row_of(self, chunk_id: str) -> Optional[int]:
+        """Row of the live chunk with this id, or None."""
+        if hasattr(self.chunks, "index_of"):
+            row = self.chunks.index_of(chunk_id)
+        else:
+            if self._chunk_rows is None:
+                self._chunk_rows = {chunk.id: i for i, chunk in enumerate(self.chunks)}
+            row = self._chunk_rows.get(chunk_id)
+        if row is None or (self.live is not None and not self.live[row]):
+            return None
+        return row
+
+    def chunk(self, chunk_id: str) -> Optional[Chunk]:
+        """The chunk with this id, or None."""
+        row = self.row_of(chunk_id)
+        return None if row is None else self.chunks[row]
+
+    @property
+    def token_counts(self) -> np.ndarray:
+        """Estimated tokens of each row's chunk text (Chunk.tokens, stored with the index)."""
+        if self._token_counts is None:
+            counts = getattr(self.chunks, "token_counts", None)
+            if counts is None:
+                counts = [chunk.tokens for chunk in self.chunks]
+            self._token_counts = np.asarray(counts, dtype=np.int64)
+        return self._token_counts
+
+    def set_duplicates(self, clusters: List[List[str]]) -> None:
+        """
+        Use near-duplicate clusters (chunk ids, canonical first; see raglib.dedup) for collapse=True.
+
+        Ids no longer in the index are ignored; a cluster whose canonical
+        chunk is gone falls back to its next member.
+        """
+        canonical = np.arange(len(self.chunks))
+        for cluster in clusters:
+            rows = [row for row in map(self.row_of, cluster) if row is not None]
+            if len(rows) > 1:
+                canonical[rows] = rows[0]
+        self.canonical = canonical
+
+    def set_glossary(self, terms: Sequence[GlossaryTerm], annotations: Dict[str, List[int]]) -> None:
+        """Use glossary annotations (chunk id -> term indexes; see raglib.glossary) for glossary_boost=True."""
+        rows: Dict[int, List[int]] = {}
+        for chunk_id, term_indexes in annotations.items():
+            row = self.row_of(chunk_id)
+            if row is not None:
+                for term in term_indexes:
+                    rows.setdefault(term, []).append(row)
+        self.glossary = GlossaryMatcher(terms)
+        self.glossary_rows = {term: np.array(term_rows, dtype=np.int64) for term, term_rows in rows.items()}
+
+    def set_page_ranks(self, ranks: Dict[str, float]) -> None:
+        """Use page PageRanks (path -> rank; see raglib.linkgraph) for rank_boost=True."""
+        self.page_weights = rank_weights(ranks)
+
+    @property
+    def facets(self) -> FacetIndex:
+        """Folder and tag bitsets of the chunks (see raglib.facets)."""
+        if self._facets is None:
+            # Index written before facets were stored: folders only, no tags
+            self._facets = FacetIndex.build([chunk.path for chunk in self.chunks])
+        return self._facets
+
+    @property
+    def spelling(self) -> SpellingIndex:
+        """Spelling correction over the indexed vocabulary (see raglib.spelling)."""
+        if self._spelling is None:
+            self._spelling = SpellingIndex.build(term_counts(self.index))
+        return self._spelling
+
+    def set_spelling(self, spelling: SpellingIndex) -> None:
+        """Use a prebuilt spelling index (see raglib.spelling) for spellcheck=True."""
+        self._spelling = spelling
+
+    def correct(self, query: str) -> Tuple[str, Dict[str, str]]:
+        """
+        (query with misspelled words corrected, {word: correction}); see SpellingIndex.correct.
+
+        Words the index knows are never corrected, even if the spelling
+        index predates them (it is rebuilt by full builds and merges only).
+        """
+        parts = getattr(self.index, "indexes", [self.index])
+        return self.spelling.correct(query, known=lambda term: any(part.term_ids([term]) for part in parts))
+
+    def facet_mask(self, folder: Optional[str] = None, tags: Sequence[str] = ()) -> Optional[np.ndarray]:
+        """
+        Boolean mask of the live chunks in folder that carry every one of tags (cached).
+
+        folder may be nested ("code-examples/apex"). None if no chunk matches
+        a facet at all.
+        """
+        names = ([folder.strip("/")] if folder else []) + [TAG_PREFIX + tag.lower() for tag in tags]
+        if not names:
+            return self.live
+        key = tuple(sorted(names))
+        if key not in self._facet_masks:
+            mask = self.facets.mask(names)
+            if mask is not None and self.live is not None:
+                mask = mask & self.live
+            self._facet_masks[key] = mask
+        return self._facet_masks[key]
+
+    def folder_mask(self, folder: str) -> Optional[np.ndarray]:
+        """Boolean mask of the chunks in folder (None if no chunk is)."""
+        return self.facet_mask(folder)
+
+    def facet_counts(self, query: Optional[str] = None, folder: Optional[str] = None,
+                     tags: Sequence[str] = ()) -> Dict[str, int]:
+        """
+        Exact number of live chunks per facet ("security", "code-examples/apex", "tag:sharing", ...).
+
+        With a query, only the chunks that match one of its terms are
+        counted; folder and tags narrow the count like they narrow search().
+        Facets with no chunk are left out.
+        """
+        rows = self.live
+        if folder or tags:
+            rows = self.facet_mask(folder, tags)
+            if rows is None:
+                return {}
+        if query is not None:
+            rows = self.index.scores(tokenize(query), rows) > 0
+        return self.facets.counts(rows)
+
+    def search(self, query: str, k: int = 10, folder: Optional[str] = None, mode: str = "keyword",
+               fusion: str = "rrf", per_page: Optional[int] = None, collapse: bool = False,
+               glossary_boost: bool = False, rank_boost: bool = False, tags: Optional[Sequence[str]] = None,
+               spellcheck: bool = False, timings: Optional[Dict[str, float]] = None) -> List[Result]:
+        """
+        The k chunks that best match query, best first.
+
+        folder restricts results to one rag/ folder, top-level ("security")
+        or nested ("code-examples/apex"); tags to chunks of pages with every
+        one of these frontmatter tags. Both are applied as precomputed
+        bitsets while scoring, so the k best chunks that pass come back.
+        mode is "keyword" (BM25 scores), "semantic" (cosine similarity) or
+        "hybrid": both run concurrently and are fused with reciprocal rank
+        fusion (fusion="rrf") or min-max normalised scores (fusion="weighted").
+        per_page caps the chunks returned from one page (hybrid default: 1).
+        collapse returns one chunk per near-duplicate cluster: the canonical
+        one, ranked where its best-ranked member was (no-op for an index
+        built without duplicate detection).
+        glossary_boost multiplies the scores of chunks that mention a
+        glossary term named in the query (e.g. "CDC") by GLOSSARY_BOOST.
+        rank_boost raises the scores of chunks from pages many others link to
+        (PageRank of the internal link graph) by up to RANK_BOOST.
+        spellcheck searches for the query with words the index does not
+        know corrected to the closest indexed term (correct() shows them).
+        If a timings dict is passed, it receives the milliseconds spent per
+        retriever ("keyword", "semantic", "fusion") and in total.
+        """
+        return self.search_many([query], k, folder, mode, fusion, per_page, collapse, glossary_boost, rank_boost,
+                                tags, spellcheck, timings)[0]
+
+    def search_many(self, queries: List[str], k: int = 10, folder: Optional[str] = None,
+                    mode: str = "keyword", fusion: str = "rrf", per_page: Optional[int] = None,
+                    collapse: bool = False, glossary_boost: bool = False, rank_boost: bool = False,
+                    tags: Optional[Sequence[str]] = None, spellcheck: bool = False,
+                    timings: Optional[Dict[str, float]] = None,
+                    searched: Optional[List[str]] = None) -> List[List[Result]]:
+        """
+        search() for a batch of queries sharing the same options.
+
+        The semantic side embeds the whole batch and scores it against the
+        vectors in one matrix multiply, which is much cheaper than one call
+        per query. timings are for the whole batch. If a searched list is
+        passed, it receives the queries as searched (spellcheck: corrected).
+        """
+        timings = {} if timings is None else timings
+        start = time.perf_counter()
+        collapse = collapse and self.canonical is not None
+        glossary_boost = glossary_boost and self.glossary is not None
+        rank_boost = rank_boost and self.page_weights is not None
+        reranked = glossary_boost or rank_boost
+        depth = k if per_page is None and not collapse and not reranked else k * FUSION_DEPTH
+        queries, mask, rankings = self._rank(queries, k, depth, folder, mode, fusion, tags, spellcheck, timings)
+        if searched is not None:
+            searched.extend(queries)
+        if mode == "hybrid" and self.vectors is not None:
+            per_page = 1 if per_page is None else per_page
+        if glossary_boost:
+            rankings = [self._glossary_boost(query, ranking) for query, ranking in zip(queries, rankings)]
+        if rank_boost:
+            rankings = [self._rank_boost(ranking) for ranking in rankings]
+        results = [self._results(doc_ids, scores, k, per_page, mask if collapse else None, collapse)
+                   for doc_ids, scores in rankings]
+        timings["total"] = (time.perf_counter() - start) * 1000
+        return results
+
+    def candidates(self, query: str, k: int = 100, folder: Optional[str] = None, mode: str = "keyword",
+                   fusion: str = "rrf", tags: Optional[Sequence[str]] = None, spellcheck: bool = False,
+                   timings: Optional[Dict[str, float]] = None) -> Ranking:
+        """
+        (rows, scores) of the k best chunks for query, best first, as search() ranks them.
+
+        No Results are built, so callers that rerank a deep pool themselves
+        (raglib.context) read only the rows they keep; see search() for the
+        options.
+        """
+        timings = {} if timings is None else timings
+        start = time.perf_counter()
+        rows, scores = self._rank([query], k, k, folder, mode, fusion, tags, spellcheck, timings)[2][0]
+        timings["total"] = (time.perf_counter() - start) * 1000
+        return rows[:k], scores[:k]
+
+    def _rank(self, queries: List[str], k: int, depth: int, folder: Optional[str], mode: str, fusion: str,
+              tags: Optional[Sequence[str]], spellcheck: bool,
+              timings: Dict[str, float]) -> Tuple[List[str], Optional[np.ndarray], List[Ranking]]:
+        """(queries as searched, row mask, one ranking per query) for search_many() and candidates()."""
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}, not {mode!r}")
+        if fusion not in FUSIONS:
+            raise ValueError(f"fusion must be one of {', '.join(FUSIONS)}, not {fusion!r}")
+        if mode == "semantic" and self.vectors is None:
+            raise ValueError("this index was built without vectors; semantic search is unavailable")
+        if spellcheck:
+            start = time.perf_counter()
+            queries = [self.correct(query)[0] for query in queries]
+            timings["spelling"] = (time.perf_counter() - start) * 1000
+        mask = self.live
+        if folder is not None or tags:
+            mask = self.facet_mask(folder, tags or ())
+            if mask is None:
+                return queries, mask, [_EMPTY_RANKING for _ in queries]
+        if mode == "hybrid" and self.vectors is not None:
+            rankings = self._hybrid(queries, k, mask, fusion, timings)
+        elif mode == "semantic":
+            rankings = self._semantic(queries, depth, mask, timings)
+        else:
+            rankings = self._keyword(queries, depth, mask, timings)
+        return queries, mask, rankings
+
+    def _keyword(self, queries: List[str], k: int, mask: Optional[np.ndarray],
+                 timings: Dict[str, float]) -> List[Ranking]:
+        start = time.perf_counter()
+        rankings = [self.index.top_k(tokenize(query), k, mask) for query in queries]
+        timings["keyword"] = (time.perf_counter() - start) * 1000
+        return rankings
+
+    def _semantic(self, queries: List[str], k: int, mask: Optional[np.ndarray],
+                  timings: Dict[str, float]) -> List[Ranking]:
+        start = time.perf_counter()
+        query_vectors = self.embedder.embed(queries)
+        known = np.flatnonzero(query_vectors.any(axis=1))
+        # A query with no term the embedder knows matches nothing
+        rankings = [_EMPTY_RANKING] * len(queries)
+        if len(known):
+            found = (self.ann or self.vectors).search(query_vectors[known], k, mask)
+            for row, ranking in zip(known.tolist(), found):
+                rankings[row] = ranking
+        timings["semantic"] = (time.perf_counter() - start) * 1000
+        return rankings
+
+    def _hybrid(self, queries: List[str], k: int, mask: Optional[np.ndarray], fusion: str,
+                timings: Dict[str, float]) -> List[Ranking]:
+        # Each side returns a deep pool, so fusion (and per-page dedupe) has
+        # enough candidates to fill k. The semantic side runs on the shared
+        # pool while the keyword side runs here, so a query costs about the
+        # slower of the two rather than their sum.
+        depth = max(k * FUSION_DEPTH, FUSION_MIN_CANDIDATES)
+        semantic = _executor().submit(self._semantic, queries, depth, mask, timings)
+        keyword = self._keyword(queries, depth, mask, timings)
+        semantic = semantic.result()
+
+        start = time.perf_counter()
+        if fusion == "rrf":
+            fused = [reciprocal_rank_fusion(pair) for pair in zip(keyword, semantic)]
+        else:
+            weights = [1 - SEMANTIC_WEIGHT, SEMANTIC_WEIGHT]
+            fused = [weighted_fusion(list(pair), weights) for pair in zip(keyword, semantic)]
+        timings["fusion"] = (time.perf_counter() - start) * 1000
+        return fused
+
+    def _glossary_boost(self, query: str, ranking: Ranking) -> Ranking:
+        """ranking re-sorted with the rows that mention one of the query's glossary terms boosted."""
+        terms = self.glossary.terms_in(query, ignore_case=True)
+        rows = [self.glossary_rows[term] for term in terms if term in self.glossary_rows]
+        if not rows or not len(ranking[0]):
+            return ranking
+        doc_ids, scores = ranking
+        boosted = np.where(np.isin(doc_ids, np.concatenate(rows)), scores + np.abs(scores) * (GLOSSARY_BOOST - 1), scores)
+        order = np.lexsort((doc_ids, -boosted))
+        return doc_ids[order], boosted[order]
+
+    def _rank_boost(self, ranking: Ranking) -> Ranking:
+        """ranking re-sorted with each row's score raised by its page's link-graph weight."""
+        doc_ids, scores = ranking
+        if not len(doc_ids):
+            return ranking
+        weights = np.array([self.page_weights.get(self.chunks[row].path, 0.0) for row in doc_ids.tolist()])
+        boosted = scores + np.abs(scores) * RANK_BOOST * weights
+        order = np.lexsort((doc_ids, -boosted))
+        return doc_ids[order], boosted[order]
+
+    def _results(self, doc_ids: np.ndarray, scores: np.ndarray, k: int, per_page: Optional[int],
+                 mask: Optional[np.ndarray] = None, collapse: bool = False) -> List[Result]:
+        """
+        Results for the first k rows, keeping at most per_page from any one page.
+
+        collapse keeps the first row of each duplicate cluster and returns
+        its canonical chunk instead, unless mask excludes that one.
+        """
+        results: List[Result] = []
+        per_path: Dict[str, int] = {}
+        clusters = set()
+        for doc_id, score in zip(doc_ids.tolist(), scores.tolist()):
+            if len(results) == k:
+                break
+            if collapse:
+                canonical = int(self.canonical[doc_id])
+                if canonical in clusters:
+                    continue
+                clusters.add(canonical)
+                if mask is None or mask[canonical]:
+                    doc_id = canonical
+            chunk = self.chunks[doc_id]
+            if per_page is not None:
+                if per_path.get(chunk.path, 0) >= per_page:
+                    continue
+                per_path[chunk.path] = per_path.get(chunk.path, 0) + 1
+            results.append(Result(chunk.id, score, chunk.url, chunk.path, chunk.title, chunk.folder, chunk.text))
+        return results
+
+
+def reciprocal_rank_fusion(rankings: List[Ranking], rrf_k: int = RRF_K) -> Ranking:
+    """
+    Fuse (rows, scores) rankings: score(row) = sum over rankings of 1 / (rrf_k + rank).
+
+    Rank-based, so BM25 and cosine scores need no common scale. Returns the
+    fused (rows, scores), best first.
+    """
+    rows = [ranking[0] for ranking in rankings if len(ranking[0])]
+    if not rows:
+        return _EMPTY_RANKING
+    contributions = [1.0 / (rrf_k + np.arange(1, len(r) + 1)) for r in rows]
+    return _sum_by_row(np.concatenate(rows), np.concatenate(contributions))
+
+
+def weighted_fusion(rankings: List[Ranking], weights: List[float]) -> Ranking:
+    """Fuse (rows, scores) rankings by a weighted sum of per-ranking min-max normalised scores."""
+    rows, contributions = [], []
+    for (ranking_rows, scores), weight in zip(rankings, weights):
+        if not len(ranking_rows):
+            continue
+        scores = np.asarray(scores, dtype=np.float64)
+        spread = scores.max() - scores.min() or 1.0
+        rows.append(ranking_rows)
+        contributions.append(weight * (scores - scores.min()) / spread)
+    if not rows:
+        return _EMPTY_RANKING
+    return _sum_by_row(np.concatenate(rows), np.concatenate(contributions))
+
+
+def _sum_by_row(rows: np.ndarray, contributions: np.ndarray) -> Ranking:
+    """Total contribution per distinct row, best first (ties: lowest row first)."""
+    unique, inverse = np.unique(rows, return_inverse=True)
+    totals = np.bincount(inverse, weights=contributions, minlength=len(unique))
+    order = np.lexsort((unique, -totals))
+    return unique[order], totals[order]
+
+
+_search_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    """Shared pool for the concurrent half of hybrid queries."""
+    global _search_executor
+    if _search_executor is None:
+        _search_executor = ThreadPoolExecutor(max_workers=SEARCH_THREADS, thread_name_prefix="retrieval")
+    return _search_executor
+
+
+def _segment_bm25(index_file: IndexFile) -> BM25Index:
+    return BM25Index(index_file.strings("terms"), index_file.array("bm25_offsets"),
+                     index_file.array("bm25_doc_ids"), index_file.array("bm25_weights"),
+                     index_file.meta["doc_count"], index_file.array("bm25_tfs"), index_file.array("bm25_lengths"))
+
+
+def _segment_facets(index_file: IndexFile) -> Optional[FacetIndex]:
+    """The facet bitsets of a segment (None for one written before they were stored)."""
+    if "facet_bits" not in index_file:
+        return None
+    return FacetIndex(index_file.strings("facets"), index_file.array("facet_bits"), index_file.meta["doc_count"])
+
+
+def write_manifest(artifacts: ArtifactWriter, index_dir: Path, manifest: dict) -> None:
+    """Write the segment manifest, then build.json (which default_retriever() watches)."""
+    artifacts.write_json(Path(index_dir) / MANIFEST_FILE, manifest, indent=None, separators=(",", ":"))
+    artifacts.write_json(Path(index_dir) / BUILD_FILE, {"build_id": manifest["build_id"],
+                                                        "segments": len(manifest["segments"])})
+
+
+def remove_files(artifacts: ArtifactWriter, index_dir: Path, names: Iterable[str]) -> None:
+    """Delete index files that are no longer used (recorded as changed)."""
+    for name in names:
+        path = Path(index_dir) / name
+        if path.exists():
+            if not artifacts.dry_run:
+                path.unlink()
+            artifacts.record(path, True)
+
+
+def read_build_id(index_dir: Path = INDEX_DIR) -> Optional[str]:
+    """Build id recorded by Retriever.save in index_dir (None if there is none)."""
+    try:
+        return json.loads((Path(index_dir) / BUILD_FILE).read_text(encoding="utf-8"))["build_id"]
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+
+
+_default_retriever: Optional[Retriever] = None
+_build_file_stat: Optional[tuple] = None
+_result_cache = QueryCache()
+
+
+def default_retriever() -> Retriever:
+    """
+    The retriever search() uses: the built index if present, else built from rag/.
+
+    Reloaded when the index on disk is rebuilt with a different build id.
+    """
+    global _default_retriever, _build_file_stat
+    try:
+        stat = os.stat(INDEX_DIR / BUILD_FILE)
+        build_stat = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        build_stat = None
+    if _default_retriever is not None and build_stat != _build_file_stat:
+        # Rebuilt (or removed) since it was loaded; a byte-identical rewrite
+        # keeps the same id and the loaded index
+        if build_stat is None or read_build_id() != _default_retriever.build_id:
+            _default_retriever = None
+    _build_file_stat = build_stat
+    if _default_retriever is None:
+        try:
+            _default_retriever = Retriever.load()
+        except FileNotFoundError:
+            _default_retriever = Retriever.from_corpus()
+    return _default_retriever
+
+
+def result_cache() -> QueryCache:
+    """The cache search() keeps results in (see QueryCache.stats for its counters)."""
+    return _result_cache
+
+
+def search(query: str, k: int = 10, folder: Optional[str] = None, mode: str = "keyword",
+           **options) -> List[Result]:
+    """
+    Search the knowledge library; see Retriever.search for the options.
+
+    Results are cached per normalised query and options, and the cache is
+    dropped when the index build id changes. Calls that ask for timings
+    bypass the cache.
+    """
+    retriever = default_retriever()
+    if options.get("tags") is not None:
+        options["tags"] = tuple(options["tags"])  # part of the cache key
+    if options.get("timings") is not None:
+        return retriever.search(query, k, folder, mode, **options)
+    key = query_key(query, k=k, folder=folder, mode=mode, **options)
+    results = _result_cache.get_or_compute(key, lambda: retriever.search(query, k, folder, mode, **options),
+                                           retriever.build_id)
+    return list(results)
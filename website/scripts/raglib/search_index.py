@@ -0,0 +1,143 @@
+"""
+Build the client-side search index used by website/assets/js/search.js.
+
+The index covers the full text of every page (not just titles and
+descriptions) and is emitted as compact JSON:
+
+    meta.json            doc table, BM25 parameters, per-doc length norms
+                         and the list of shards
+    shard-<prefix>.json  postings for every term starting with <prefix>:
+                         {"term": [idf, [doc id deltas...], [term freqs...]]}
+    typeahead.json       prefix index of page titles and H2/H3 headings
+                         for suggestions while typing (raglib.typeahead)
+    spelling.json        vocabulary with document counts, for correcting
+                         misspelled query terms (raglib.spelling)
+
+Shards are keyed by the first PREFIX_LENGTH characters of the term, so the
+browser only fetches the few shards a query touches and ranks with
+
+    score(d) += idf * tf * (k1 + 1) / (tf + norm[d])
+    norm[d]   = k1 * (1 - b + b * len(d) / avg_len)
+
+where idf and norm are precomputed here.
+"""
+
+import hashlib
+import json
+import math
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from .artifacts import ArtifactWriter
+from .corpus import BASE_DIR, Page, plain_text
+from .edits import CLIENT_SPELLING_FILE, client_vocabulary
+from .text import tokenize
+from .typeahead import TYPEAHEAD_FILE, build_typeahead
+
+CLIENT_INDEX_DIR = BASE_DIR / "website" / "assets" / "search"
+INDEX_VERSION = 1
+PREFIX_LENGTH = 2
+K1 = 1.2
+B = 0.75
+
+# Title terms count this many times, so title matches outrank passing mentions
+TITLE_BOOST = 3
+DESCRIPTION_LENGTH = 200
+
+
+def bm25_idf(doc_freq: int, doc_count: int) -> float:
+    """BM25 idf (the +1 form, never negative)."""
+    return math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+
+def page_terms(page: Page) -> List[str]:
+    """Index terms of a page: boosted title terms plus full body text."""
+    return tokenize(page.title) * TITLE_BOOST + tokenize(plain_text(page.body))
+
+
+def page_description(page: Page) -> str:
+    description = page.frontmatter.get("description")
+    if not isinstance(description, str):
+        return ""
+    return description[:DESCRIPTION_LENGTH]
+
+
+def build_client_index(pages: Iterable[Page], k1: float = K1, b: float = B,
+                       prefix_length: int = PREFIX_LENGTH) -> Dict[str, dict]:
+    """
+    Build the index files in memory.
+
+    Returns {filename: json_data}; meta.json is always present.
+    """
+    pages = list(pages)
+    docs = []
+    lengths = []
+    postings = defaultdict(list)  # term -> [(doc_id, tf)], doc ids ascending
+
+    for doc_id, page in enumerate(pages):
+        terms = page_terms(page)
+        docs.append({"u": page.url, "t": page.title, "p": page.path, "d": page_description(page)})
+        lengths.append(len(terms))
+        for term, tf in sorted(Counter(terms).items()):
+            postings[term].append((doc_id, tf))
+
+    doc_count = len(docs)
+    avg_length = sum(lengths) / doc_count if doc_count else 0.0
+    norms = [round(k1 * (1 - b + b * length / avg_length), 4) if avg_length else k1 for length in lengths]
+
+    shards = defaultdict(dict)
+    for term in sorted(postings):
+        entries = postings[term]
+        deltas = []
+        previous = 0
+        for doc_id, _ in entries:
+            deltas.append(doc_id - previous)
+            previous = doc_id
+        shards[term[:prefix_length]][term] = [
+            round(bm25_idf(len(entries), doc_count), 4),
+            deltas,
+            [tf for _, tf in entries],
+        ]
+
+    files = {f"shard-{prefix}.json": shard for prefix, shard in shards.items()}
+    files[TYPEAHEAD_FILE] = build_typeahead(pages)
+    files[CLIENT_SPELLING_FILE] = client_vocabulary({term: len(entries) for term, entries in postings.items()})
+    digest = hashlib.sha1()
+    for name in sorted(files):
+        digest.update(name.encode("utf-8"))
+        digest.update(json.dumps(files[name], sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    digest.update(json.dumps([docs, norms]).encode("utf-8"))
+
+    files["meta.json"] = {
+        "version": INDEX_VERSION,
+        "build_id": digest.hexdigest()[:12],
+        "k1": k1,
+        "b": b,
+        "prefix_length": prefix_length,
+        "doc_count": doc_count,
+        "avg_doc_length": round(avg_length, 2),
+        "term_count": len(postings),
+        "docs": docs,
+        "norms": norms,
+        "shards": sorted(shards),
+        "typeahead": TYPEAHEAD_FILE,
+        "spelling": CLIENT_SPELLING_FILE,
+    }
+    return files
+
+
+def write_client_index(files: Dict[str, dict], artifacts: ArtifactWriter,
+                       out_dir: Path = CLIENT_INDEX_DIR) -> None:
+    """Write index files (only those that changed) and remove stale shards."""
+    # meta.json last, so a reader never sees a shard list pointing at missing shards
+    for name in sorted(files, key=lambda n: n == "meta.json"):
+        # Compact separators: these files are downloaded by every visitor
+        artifacts.write_json(out_dir / name, files[name], indent=None, separators=(",", ":"))
+
+    if out_dir.exists():
+        for path in sorted(out_dir.glob("*.json")):
+            if path.name not in files:
+                if not artifacts.dry_run:
+                    path.unlink()
+                artifacts.record(path, True)
@@ -0,0 +1,245 @@
+"""
+Segmented (LSM-style) retrieval index.
+
+The index directory holds immutable segments - raglib.indexfile containers
+of chunks, BM25 postings and vectors - and a manifest, segments.json:
+
+    {"generation": 3,
+     "segments": [{"file": "segment-000001.idx", "generation": 1, "chunks": 2625},
+                  {"file": "segment-000003.idx", "generation": 3, "chunks": 4}],
+     "tombstones": {"<chunk id>": 3},
+     "pages": {"<path>": {"mtime_ns": ..., "size": ..., "sha1": ..., "chunks": ["<chunk id>", ...]}},
+     ...}
+
+A full build writes one segment. An update (raglib.incremental) re-chunks
+only the pages whose files changed, writes their new chunks as one small
+segment and tombstones the chunks they replaced. A tombstone hides a chunk
+id in segments older than itself, so the same id can come back in a newer
+segment (a reverted edit).
+
+Queries fan out across segments:
+
+- BM25 scores every segment with corpus-wide document frequencies and
+  average length, computed at query time from the stored term frequencies
+  (tombstoned chunks still count until a merge, as in Lucene);
+- vector search takes the top k of every segment and merges them;
+- tombstoned rows are masked out of both.
+
+needs_merge() is the compaction policy: too many segments, too much data
+outside the base segment or too many tombstones, and all segments are
+merged into one.
+"""
+
+import bisect
+import hashlib
+import json
+import math
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .bm25 import B, K1, BM25Index, top_k_scores
+from .vectors import VectorIndex
+
+MANIFEST_FILE = "segments.json"
+SEGMENT_PATTERN = "segment-*.idx"
+FORMAT = 1
+
+# Merge once there are more segments than this...
+MAX_SEGMENTS = 8
+# ...or the segments after the first hold this share of all chunks...
+MAX_DELTA_RATIO = 0.10
+# ...or this share of all chunks is tombstoned
+MAX_TOMBSTONE_RATIO = 0.20
+
+
+def segment_file(generation: int) -> str:
+    return f"segment-{generation:06d}.idx"
+
+
+def read_manifest(index_dir: Path) -> Optional[dict]:
+    """The manifest of index_dir, or None if it has no segmented index."""
+    try:
+        manifest = json.loads((Path(index_dir) / MANIFEST_FILE).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    if manifest.get("format") != FORMAT:
+        return None
+    return manifest
+
+
+def manifest_build_id(previous: str, segment_digest: str, tombstones: Sequence[str]) -> str:
+    """Build id after an update: the previous id, the new segment and the new tombstones."""
+    digest = hashlib.sha1(f"{previous}\0{segment_digest}\0".encode("utf-8"))
+    for chunk_id in sorted(tombstones):
+        digest.update(f"{chunk_id}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def needs_merge(manifest: dict) -> bool:
+    """Whether the segments should be compacted (see the MAX_* thresholds)."""
+    segments = manifest["segments"]
+    total = sum(segment["chunks"] for segment in segments)
+    if len(segments) <= 1 and not manifest["tombstones"]:
+        return False
+    if len(segments) > MAX_SEGMENTS:
+        return True
+    delta = total - segments[0]["chunks"]
+    return delta > MAX_DELTA_RATIO * total or len(manifest["tombstones"]) > MAX_TOMBSTONE_RATIO * total
+
+
+class ConcatSequence(Sequence):
+    """Read-only concatenation of sequences, without copying them."""
+
+    def __init__(self, parts: List[Sequence]):
+        self.parts = parts
+        self.bases = [0]
+        for part in parts:
+            self.bases.append(self.bases[-1] + len(part))
+
+    def __len__(self) -> int:
+        return self.bases[-1]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("index out of range")
+        part = bisect.bisect_right(self.bases, i) - 1
+        return self.parts[part][i - self.bases[part]]
+
+    def __iter__(self):
+        for part in self.parts:
+            yield from part
+
+
+class ConcatChunks(ConcatSequence):
+    """The chunks of several segments (ChunkTables) as one sequence."""
+
+    def __init__(self, tables: List[Sequence]):
+        super().__init__(tables)
+        self.ids = ConcatSequence([table.ids for table in tables])
+        self.folders = sorted({folder for table in tables for folder in table.folders})
+        codes = []
+        for table in tables:
+            remap = np.array([self.folders.index(folder) for folder in table.folders] or [0], dtype=np.int16)
+            codes.append(remap[np.asarray(table.folder_codes, dtype=np.int64)])
+        self.folder_codes = np.concatenate(codes) if codes else np.zeros(0, dtype=np.int16)
+        self.token_counts = np.concatenate([np.asarray(table.token_counts, dtype=np.int64) for table in tables]
+                                           or [np.zeros(0, dtype=np.int64)])
+
+    def index_of(self, chunk_id: str) -> Optional[int]:
+        """Row of chunk_id in the newest segment that has it."""
+        for part in range(len(self.parts) - 1, -1, -1):
+            row = self.parts[part].index_of(chunk_id)
+            if row is not None:
+                return self.bases[part] + row
+        return None
+
+
+def live_mask(tables: List[Sequence], generations: List[int], tombstones: dict) -> Optional[np.ndarray]:
+    """Boolean mask of the rows no tombstone hides (None if none is hidden)."""
+    if not tombstones:
+        return None
+    live = np.ones(sum(len(table) for table in tables), dtype=bool)
+    base = 0
+    for table, generation in zip(tables, generations):
+        for chunk_id, deleted_at in tombstones.items():
+            if deleted_at > generation:
+                row = table.index_of(chunk_id)
+                if row is not None:
+                    live[base + row] = False
+        base += len(table)
+    return live
+
+
+class SegmentedBM25:
+    """
+    BM25 over several segments, scored as if they were one index.
+
+    Each segment's BM25Index must carry tfs and lengths. Document frequency
+    and average length are summed across segments at query time.
+    """
+
+    def __init__(self, indexes: List[BM25Index], k1: float = K1, b: float = B):
+        self.indexes = indexes
+        self.k1 = k1
+        self.b = b
+        self.bases = np.cumsum([0] + [index.doc_count for index in indexes]).tolist()
+        self.doc_count = self.bases[-1]
+        total_length = sum(float(np.sum(index.lengths, dtype=np.float64)) for index in indexes)
+        self.avg_length = total_length / self.doc_count if self.doc_count and total_length else 1.0
+
+    @property
+    def terms(self) -> List[str]:
+        return sorted({term for index in self.indexes for term in index.terms})
+
+    def scores(self, query_terms, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Same contract as BM25Index.scores; idf counts every row, masked or not."""
+        scores = np.zeros(self.doc_count, dtype=np.float32)
+        for term in dict.fromkeys(query_terms):
+            postings: List[Tuple[int, BM25Index, int, int]] = []
+            for base, index in zip(self.bases, self.indexes):
+                term_id = index._term_id(term)
+                if term_id is not None:
+                    postings.append((base, index, index.offsets[term_id], index.offsets[term_id + 1]))
+            doc_freq = sum(end - start for _, _, start, end in postings)
+            if not doc_freq:
+                continue
+            idf = math.log(1 + (self.doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+            for base, index, start, end in postings:
+                doc_ids = index.doc_ids[start:end]
+                tfs = index.tfs[start:end]
+                if mask is not None:
+                    keep = mask[base + doc_ids]
+                    doc_ids, tfs = doc_ids[keep], tfs[keep]
+                norms = self.k1 * (1 - self.b + self.b * index.lengths[doc_ids] / self.avg_length)
+                scores[base + doc_ids] += idf * tfs * (self.k1 + 1) / (tfs + norms)
+        return scores
+
+    def top_k(self, query_terms, k: int = 10, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Same contract as BM25Index.top_k, over the rows of all segments."""
+        return top_k_scores(self.scores(query_terms, mask), k)
+
+
+class SegmentedVectors:
+    """Exact vector search over several segments (same contract as VectorIndex)."""
+
+    def __init__(self, indexes: List[VectorIndex], ids: Sequence[str], embedder_config: Optional[dict] = None):
+        self.indexes = indexes
+        self.ids = ids
+        self.embedder_config = embedder_config or {}
+        self.bases = np.cumsum([0] + [len(index.ids) for index in indexes]).tolist()
+
+    @property
+    def dim(self) -> int:
+        return self.indexes[0].dim
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """All rows as one array (a copy)."""
+        return np.concatenate([np.asarray(index.vectors, dtype=np.float32) for index in self.indexes])
+
+    def gather(self, rows: np.ndarray) -> np.ndarray:
+        rows = np.asarray(rows, dtype=np.int64)
+        gathered = np.empty((len(rows), self.dim), dtype=np.float32)
+        segments = np.searchsorted(self.bases, rows, side="right") - 1
+        for segment in np.unique(segments).tolist():
+            selected = segments == segment
+            gathered[selected] = self.indexes[segment].gather(rows[selected] - self.bases[segment])
+        return gathered
+
+    def search(self, queries: np.ndarray, k: int = 10,
+               mask: Optional[np.ndarray] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        found = [index.search(queries, k, None if mask is None else mask[base:base + len(index.ids)])
+                 for base, index in zip(self.bases, self.indexes)]
+        results = []
+        for q in range(len(np.atleast_2d(queries))):
+            rows = np.concatenate([segment[q][0] + base for base, segment in zip(self.bases, found)])
+            scores = np.concatenate([segment[q][1] for segment in found])
+            order = np.argsort(-scores, kind="stable")[:k]
+            results.append((rows[order], scores[order]))
+        return results
@@ -0,0 +1,470 @@
+"""
+Local HTTP retrieval server (stdlib asyncio, no framework).
+
+The indexes are loaded once at startup and kept in memory, so consumers
+query over HTTP instead of each re-reading rag-library.json and the
+markdown. Endpoints (all GET, JSON unless noted):
+
+    /search?q=...&k=10&folder=security&mode=hybrid&fusion=rrf&per_page=1&collapse=1&glossary=1&rank=1
+                               (folder may be nested; &tag=... repeats, all must match;
+                               &spell=1 corrects misspelled words first)
+    /facets?q=...&folder=...&tag=...
+                               exact chunk counts per folder and tag facet
+                               (of the chunks matching q, if given)
+    /context?q=...&budget=2000&candidates=100&diversity=0.3&mode=hybrid&folder=...&tag=...&spell=1
+                               diverse chunks packed into a token budget, with
+                               /rag/... citations (raglib.context)
+    /chunk/<chunk id>          the chunk (id URL-encoded: it contains "#")
+    /faq?q=...                 stored answer to a near-duplicate question
+                               (raglib.faq), or "match": null
+    /code?q=...&lang=apex&prefix=1&k=5
+                               code blocks by identifier (raglib.code_index)
+    /metrics                   Prometheus text format
+    /healthz
+
+Search requests arriving within batch_window of each other (and sharing k,
+folder, mode and so on) are micro-batched: their queries are embedded and
+scored against the vectors in one matrix multiply (Retriever.search_many).
+Results are cached (raglib.cache) until the index build id changes.
+
+Connections are HTTP/1.1 keep-alive; idle connections are closed after
+keepalive_timeout, and a request that takes longer than request_timeout to
+arrive or to answer gets 408 / 504.
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .cache import QueryCache, query_key
+from .code_index import CodeIndex
+from .context import CANDIDATES, DEFAULT_BUDGET, DIVERSITY, pack_context
+from .faq import FaqIndex
+from .retrieval import MODES, Retriever
+
+BATCH_WINDOW = 0.002
+MAX_BATCH = 64
+MAX_K = 100
+MAX_CANDIDATES = 1000
+REQUEST_TIMEOUT = 10.0
+KEEPALIVE_TIMEOUT = 5.0
+MAX_HEADER_BYTES = 16384
+JSON_TYPE = "application/json; charset=utf-8"
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           408: "Request Timeout", 431: "Request Header Fields Too Large", 500: "Internal Server Error",
+           504: "Gateway Timeout"}
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str, close: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.close = close  # the connection can't be reused (e.g. unparseable request)
+
+
+class MicroBatcher:
+    """
+    Groups concurrent searches with the same options into one search_many call.
+
+    A group is flushed batch_window seconds after its first query arrives,
+    or as soon as it holds max_batch queries. The search itself runs in a
+    worker thread, so the event loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(self, retriever: Retriever, batch_window: float = BATCH_WINDOW, max_batch: int = MAX_BATCH):
+        self.retriever = retriever
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._pending: Dict[tuple, List[Tuple[str, asyncio.Future]]] = {}
+        self.batches = 0
+        self.queries = 0
+        self.largest_batch = 0
+
+    async def search(self, query: str, **options) -> Tuple[list, str]:
+        """(results, query as searched: spelling corrected if options ask for it)."""
+        loop = asyncio.get_running_loop()
+        group = tuple(sorted(options.items()))
+        future = loop.create_future()
+        if group not in self._pending:
+            self._pending[group] = []
+            loop.call_later(self.batch_window, self._flush, group)
+        self._pending[group].append((query, future))
+        if len(self._pending[group]) >= self.max_batch:
+            self._flush(group)
+        return await future
+
+    def _flush(self, group: tuple) -> None:
+        batch = self._pending.pop(group, None)
+        if not batch:
+            return  # already flushed because it was full
+        self.batches += 1
+        self.queries += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        queries = [query for query, _ in batch]
+
+        def search() -> List[Tuple[list, str]]:
+            searched: List[str] = []
+            results = self.retriever.search_many(queries, **dict(group), searched=searched)
+            return list(zip(results, searched))
+
+        task = asyncio.get_running_loop().run_in_executor(None, search)
+        task.add_done_callback(lambda done: self._resolve(batch, done))
+
+    @staticmethod
+    def _resolve(batch: List[Tuple[str, asyncio.Future]], done: asyncio.Future) -> None:
+        for i, (_, future) in enumerate(batch):
+            if future.done():
+                continue  # the request timed out
+            if done.exception() is not None:
+                future.set_exception(done.exception())
+            else:
+                future.set_result(done.result()[i])
+
+
+class RetrievalServer:
+    """
+    Usage:
+        server = RetrievalServer(Retriever.load())
+        asyncio.run(server.serve("127.0.0.1", 8765))
+    """
+
+    def __init__(self, retriever: Retriever, batch_window: float = BATCH_WINDOW, max_batch: int = MAX_BATCH,
+                 request_timeout: float = REQUEST_TIMEOUT, keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+                 cache: Optional[QueryCache] = None, faq: Optional[FaqIndex] = None,
+                 code: Optional[CodeIndex] = None):
+        self.retriever = retriever
+        self.faq = faq
+        self.code = code
+        self.faq_hits = 0
+        self.batcher = MicroBatcher(retriever, batch_window, max_batch)
+        self.request_timeout = request_timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.cache = cache if cache is not None else QueryCache()
+        self.started = time.time()
+        self.requests: Dict[Tuple[str, int], int] = defaultdict(int)
+        self.latency_buckets: Dict[str, List[int]] = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+        self.latency_sum: Dict[str, float] = defaultdict(float)
+        self.connections = 0
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+                except asyncio.TimeoutError:
+                    break  # idle keep-alive connection
+                if not request_line:
+                    break
+                start = time.perf_counter()
+                endpoint = "other"
+                try:
+                    method, target, version, headers = await asyncio.wait_for(
+                        self._read_head(request_line, reader), self.request_timeout)
+                    keep_alive = _keep_alive(version, headers)
+                    endpoint, status, body, content_type = await self._dispatch(method, target)
+                except asyncio.TimeoutError:
+                    status, body, content_type, keep_alive = 408, _error("request timed out"), JSON_TYPE, False
+                except HttpError as e:
+                    status, body, content_type = e.status, _error(str(e)), JSON_TYPE
+                    keep_alive = keep_alive and not e.close
+                except Exception as e:  # noqa: BLE001 - one bad request must not kill the server
+                    status, body, content_type = 500, _error(f"{type(e).__name__}: {e}"), JSON_TYPE
+                writer.write(_response(status, body, content_type, keep_alive))
+                await writer.drain()
+                self._observe(endpoint, status, time.perf_counter() - start)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # client went away, or sent an over-long request line
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    @staticmethod
+    async def _read_head(request_line: bytes, reader: asyncio.StreamReader):
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(400, "malformed request line", close=True) from None
+        headers = {}
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                raise HttpError(431, "header line too long", close=True) from None
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        # Bodies are not used by any endpoint; skip one if sent
+        length = headers.get("content-length", "0") or "0"
+        if not (length.isascii() and length.isdigit()):
+            # Without a valid length the body can't be skipped, so the connection can't be reused
+            raise HttpError(400, "Content-Length must be a non-negative integer", close=True)
+        length = int(length)
+        if length:
+            await reader.readexactly(length)
+        return method, target, version, headers
+
+    async def _dispatch(self, method: str, target: str):
+        if method != "GET":
+            raise HttpError(405, f"{method} not allowed")
+        url = urlsplit(target)
+        if url.path == "/search":
+            return "search", 200, await self._search(parse_qs(url.query)), JSON_TYPE
+        if url.path.startswith("/chunk/"):
+            chunk = self.retriever.chunk(unquote(url.path[len("/chunk/"):]))
+            if chunk is None:
+                raise HttpError(404, "no chunk with that id")
+            return "chunk", 200, _json(chunk._asdict()), JSON_TYPE
+        if url.path == "/facets":
+            return "facets", 200, await self._facets(parse_qs(url.query)), JSON_TYPE
+        if url.path == "/context":
+            return "context", 200, await self._context(parse_qs(url.query)), JSON_TYPE
+        if url.path == "/faq":
+            return "faq", 200, self._faq(parse_qs(url.query)), JSON_TYPE
+        if url.path == "/code":
+            return "code", 200, self._code(parse_qs(url.query)), JSON_TYPE
+        if url.path == "/metrics":
+            return "metrics", 200, self.metrics().encode("utf-8"), "text/plain; version=0.0.4"
+        if url.path == "/healthz":
+            return "healthz", 200, _json({"status": "ok", "build_id": self.retriever.build_id}), JSON_TYPE
+        raise HttpError(404, f"no endpoint {url.path}")
+
+    async def _search(self, params: Dict[str, List[str]]) -> bytes:
+        query = params.get("q", [""])[0]
+        if not query.strip():
+            raise HttpError(400, "missing q parameter")
+        k = min(_positive_int(params, "k", 10), MAX_K)
+        per_page = _positive_int(params, "per_page", None)
+        options = {
+            "k": k,
+            "folder": params.get("folder", [None])[0],
+            "mode": params.get("mode", ["hybrid" if self.retriever.vectors is not None else "keyword"])[0],
+            "fusion": params.get("fusion", ["rrf"])[0],
+            "per_page": per_page,
+            "collapse": params.get("collapse", ["0"])[0].lower() in ("1", "true", "yes"),
+            "glossary_boost": params.get("glossary", ["0"])[0].lower() in ("1", "true", "yes"),
+            "rank_boost": params.get("rank", ["0"])[0].lower() in ("1", "true", "yes"),
+            "tags": tuple(params.get("tag", [])) or None,
+            "spellcheck": params.get("spell", ["0"])[0].lower() in ("1", "true", "yes"),
+        }
+        if options["mode"] not in MODES:
+            raise HttpError(400, f"mode must be one of {', '.join(MODES)}")
+
+        start = time.perf_counter()
+        key = query_key(query, **options)
+        if options["spellcheck"]:
+            key = (query,) + key  # the cached corrected query must be this query's, as typed
+        build_id = self.retriever.build_id
+        found = self.cache.get(key, build_id)
+        cached = found is not None
+        if not cached:
+            try:
+                found = await asyncio.wait_for(self.batcher.search(query, **options), self.request_timeout)
+            except asyncio.TimeoutError:
+                raise HttpError(504, "search timed out") from None
+            except ValueError as e:
+                raise HttpError(400, str(e)) from None
+            self.cache.put(key, found, build_id)
+        results, searched = found
+        return _json({
+            "query": query,
+            **options,
+            "corrected": searched if searched != query else None,
+            "cached": cached,
+            "took_ms": round((time.perf_counter() - start) * 1000, 3),
+            "results": [result._asdict() for result in results],
+        })
+
+    async def _run(self, function, what: str):
+        """function() in a worker thread (like the batched searches), so the event loop keeps serving."""
+        task = asyncio.get_running_loop().run_in_executor(None, function)
+        try:
+            return await asyncio.wait_for(task, self.request_timeout)
+        except asyncio.TimeoutError:
+            raise HttpError(504, f"{what} timed out") from None
+        except ValueError as e:
+            raise HttpError(400, str(e)) from None
+
+    async def _facets(self, params: Dict[str, List[str]]) -> bytes:
+        query = params.get("q", [None])[0]
+        folder = params.get("folder", [None])[0]
+        tags = params.get("tag", [])
+        start = time.perf_counter()
+        counts = await self._run(lambda: self.retriever.facet_counts(query, folder, tags), "facet count")
+        return _json({
+            "query": query,
+            "folder": folder,
+            "tags": tags,
+            "took_ms": round((time.perf_counter() - start) * 1000, 3),
+            "facets": counts,
+        })
+
+    async def _context(self, params: Dict[str, List[str]]) -> bytes:
+        query = params.get("q", [""])[0]
+        if not query.strip():
+            raise HttpError(400, "missing q parameter")
+        budget = _positive_int(params, "budget", DEFAULT_BUDGET)
+        candidates = min(_positive_int(params, "candidates", CANDIDATES), MAX_CANDIDATES)
+        try:
+            diversity = float(params.get("diversity", [str(DIVERSITY)])[0])
+        except ValueError:
+            diversity = math.nan
+        if not (math.isfinite(diversity) and 0 <= diversity <= 1):
+            raise HttpError(400, "diversity must be a number from 0 to 1")
+        options = {
+            "mode": params.get("mode", [None])[0],
+            "folder": params.get("folder", [None])[0],
+            "tags": tuple(params.get("tag", [])) or None,
+            "spellcheck": params.get("spell", ["0"])[0].lower() in ("1", "true", "yes"),
+        }
+        timings = {}
+        context = await self._run(lambda: pack_context(self.retriever, query, budget, candidates, diversity,
+                                                       timings=timings, **options), "context packing")
+        return _json({
+            "query": query,
+            "budget": budget,
+            "tokens": context.tokens,
+            "took_ms": round(timings["total"], 3),
+            "text": context.text,
+            "passages": [passage._asdict() for passage in context.passages],
+        })
+
+    def _faq(self, params: Dict[str, List[str]]) -> bytes:
+        if self.faq is None:
+            raise HttpError(404, "no FAQ index loaded")
+        query = params.get("q", [""])[0]
+        if not query.strip():
+            raise HttpError(400, "missing q parameter")
+        start = time.perf_counter()
+        match = self.faq.lookup(query)
+        if match is not None:
+            self.faq_hits += 1
+        return _json({
+            "query": query,
+            "took_ms": round((time.perf_counter() - start) * 1000, 3),
+            "match": match._asdict() if match is not None else None,
+        })
+
+    def _code(self, params: Dict[str, List[str]]) -> bytes:
+        if self.code is None:
+            raise HttpError(404, "no code index loaded")
+        query = params.get("q", [""])[0]
+        if not query.strip():
+            raise HttpError(400, "missing q parameter")
+        k = min(_positive_int(params, "k", 10), MAX_K)
+        language = params.get("lang", [None])[0]
+        prefix = params.get("prefix", ["0"])[0].lower() in ("1", "true", "yes")
+        start = time.perf_counter()
+        matches = self.code.lookup(query, language=language, prefix=prefix, k=k)
+        return _json({
+            "query": query,
+            "lang": language,
+            "prefix": prefix,
+            "took_ms": round((time.perf_counter() - start) * 1000, 3),
+            "matches": [match._asdict() for match in matches],
+        })
+
+    def _observe(self, endpoint: str, status: int, seconds: float) -> None:
+        self.requests[(endpoint, status)] += 1
+        self.latency_sum[endpoint] += seconds
+        buckets = self.latency_buckets[endpoint]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+                break
+        else:
+            buckets[-1] += 1
+
+    def metrics(self) -> str:
+        """Counters in the Prometheus text exposition format."""
+        lines = [
+            "# TYPE rag_requests_total counter",
+            *(f'rag_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}'
+              for (endpoint, status), count in sorted(self.requests.items())),
+            "# TYPE rag_request_seconds histogram",
+        ]
+        for endpoint, buckets in sorted(self.latency_buckets.items()):
+            total = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                total += count
+                lines.append(f'rag_request_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {total}')
+            lines.append(f'rag_request_seconds_sum{{endpoint="{endpoint}"}} {self.latency_sum[endpoint]:.6f}')
+            lines.append(f'rag_request_seconds_count{{endpoint="{endpoint}"}} {total}')
+        cache = self.cache.stats()
+        lines += [
+            "# TYPE rag_search_batches_total counter",
+            f"rag_search_batches_total {self.batcher.batches}",
+            "# TYPE rag_search_batched_queries_total counter",
+            f"rag_search_batched_queries_total {self.batcher.queries}",
+            "# TYPE rag_search_largest_batch gauge",
+            f"rag_search_largest_batch {self.batcher.largest_batch}",
+            "# TYPE rag_cache_hits_total counter",
+            f"rag_cache_hits_total {cache['hits']}",
+            "# TYPE rag_cache_misses_total counter",
+            f"rag_cache_misses_total {cache['misses']}",
+            "# TYPE rag_cache_evictions_total counter",
+            f"rag_cache_evictions_total {cache['evictions']}",
+            "# TYPE rag_cache_entries gauge",
+            f"rag_cache_entries {cache['size']}",
+            "# TYPE rag_faq_hits_total counter",
+            f"rag_faq_hits_total {self.faq_hits}",
+            "# TYPE rag_open_connections gauge",
+            f"rag_open_connections {self.connections}",
+            "# TYPE rag_index_chunks gauge",
+            f"rag_index_chunks {len(self.retriever.chunks)}",
+            "# TYPE rag_index_info gauge",
+            f'rag_index_info{{build_id="{self.retriever.build_id}"}} 1',
+            "# TYPE rag_uptime_seconds gauge",
+            f"rag_uptime_seconds {time.time() - self.started:.0f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _positive_int(params: Dict[str, List[str]], name: str, default: Optional[int]) -> Optional[int]:
+    """Integer parameter name (default if absent); 400 unless it is at least 1."""
+    if name not in params:
+        return default
+    try:
+        value = int(params[name][0])
+    except ValueError:
+        raise HttpError(400, f"{name} must be an integer") from None
+    if value < 1:
+        raise HttpError(400, f"{name} must be at least 1")
+    return value
+
+
+def _json(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def _error(message: str) -> bytes:
+    return _json({"error": message})
+
+
+def _keep_alive(version: str, headers: Dict[str, str]) -> bool:
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+def _response(status: int, body: bytes, content_type: str, keep_alive: bool) -> bytes:
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
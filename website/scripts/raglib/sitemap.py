@@ -0,0 +1,198 @@
+"""
+Streaming sitemap writer.
+
+URLs are written to disk as they are added, so memory stays flat however
+large the corpus grows. Output is split to respect the sitemap protocol
+limits (50,000 URLs and 50 MB uncompressed per file):
+
+- one part:    sitemap.xml
+- many parts:  sitemap-1.xml, sitemap-2.xml, ... plus sitemap-index.xml
+
+With gzip enabled each file is also written as .xml.gz alongside. Files are
+written under temporary names and renamed into place on close() - only if
+their bytes differ from the file already there - and parts left over from a
+previous, larger run are removed.
+"""
+
+import gzip
+import re
+from pathlib import Path
+from typing import List, Optional
+from xml.sax.saxutils import escape
+
+from .artifacts import publish_if_changed
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+MAX_URLS = 50000
+MAX_BYTES = 50 * 1024 * 1024
+
+XML_DECLARATION = "<?xml version='1.0' encoding='UTF-8'?>\n"
+URLSET_OPEN = f'<urlset xmlns="{SITEMAP_NS}">\n'
+URLSET_CLOSE = "</urlset>"
+
+
+class _Part:
+    """One sitemap file being written (plus its optional .gz twin)."""
+
+    def __init__(self, path: Path, gzip_output: bool):
+        self.path = path
+        self.tmp_path = path.with_name(f".{path.name}.tmp")
+        self.gz_tmp_path = path.with_name(f".{path.name}.gz.tmp") if gzip_output else None
+        self.count = 0
+        self.size = 0
+        self.lastmod = None
+        self._file = open(self.tmp_path, "wb")
+        # mtime=0 keeps the .gz bytes identical when the content is
+        self._gz = gzip.GzipFile(filename="", mode="wb", fileobj=open(self.gz_tmp_path, "wb"), mtime=0) if gzip_output else None
+
+    def write(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self._file.write(data)
+        if self._gz is not None:
+            self._gz.write(data)
+        self.size += len(data)
+
+    def close(self) -> None:
+        self._file.close()
+        if self._gz is not None:
+            fileobj = self._gz.fileobj
+            self._gz.close()
+            fileobj.close()
+
+    def discard(self) -> None:
+        self.close()
+        for tmp in (self.tmp_path, self.gz_tmp_path):
+            if tmp is not None and tmp.exists():
+                tmp.unlink()
+
+    def publish(self, path: Path, changed: List[Path]) -> List[Path]:
+        """Move the finished temp files to their final name(s) unless unchanged."""
+        written = [path]
+        if self.gz_tmp_path is not None:
+            written.append(path.with_name(path.name + ".gz"))
+        for tmp, final in zip((self.tmp_path, self.gz_tmp_path), written):
+            if publish_if_changed(tmp, final):
+                changed.append(final)
+        return written
+
+
+def format_url(loc: str, lastmod: Optional[str] = None, changefreq: Optional[str] = None,
+               priority: Optional[float] = None) -> str:
+    """Serialize one <url> entry."""
+    lines = ["  <url>\n", f"    <loc>{escape(loc)}</loc>\n"]
+    if lastmod:
+        lines.append(f"    <lastmod>{escape(lastmod)}</lastmod>\n")
+    if changefreq:
+        lines.append(f"    <changefreq>{escape(changefreq)}</changefreq>\n")
+    if priority is not None:
+        lines.append(f"    <priority>{priority}</priority>\n")
+    lines.append("  </url>\n")
+    return "".join(lines)
+
+
+class SitemapWriter:
+    """
+    Write sitemap <url> entries to disk as they are produced.
+
+    Usage:
+        with SitemapWriter(output_dir, site_url) as writer:
+            writer.add(loc, lastmod="2025-01-01", changefreq="monthly", priority=0.8)
+        writer.files    # sitemap files, entry point first
+        writer.changed  # the subset whose content actually changed (or was removed)
+    """
+
+    def __init__(self, output_dir: Path, site_url: str, base_name: str = "sitemap",
+                 max_urls: int = MAX_URLS, max_bytes: int = MAX_BYTES, gzip_output: bool = False):
+        self.output_dir = Path(output_dir)
+        self.site_url = site_url.rstrip("/")
+        self.base_name = base_name
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        self.gzip_output = gzip_output
+        self.parts: List[_Part] = []
+        self.files: List[Path] = []
+        self.changed: List[Path] = []
+        self.total_urls = 0
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            for part in self.parts:
+                part.discard()
+        return False
+
+    @property
+    def entry_point(self) -> Path:
+        """The file crawlers should be pointed at (sitemap.xml or sitemap-index.xml)."""
+        if len(self.parts) > 1:
+            return self.output_dir / f"{self.base_name}-index.xml"
+        return self.output_dir / f"{self.base_name}.xml"
+
+    def _open_part(self) -> _Part:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        part = _Part(self.output_dir / f"{self.base_name}-{len(self.parts) + 1}.xml", self.gzip_output)
+        part.write(XML_DECLARATION + URLSET_OPEN)
+        self.parts.append(part)
+        return part
+
+    def add(self, loc: str, lastmod: Optional[str] = None, changefreq: Optional[str] = None,
+            priority: Optional[float] = None) -> None:
+        """Append one URL, starting a new part if the current one is full."""
+        entry = format_url(loc, lastmod, changefreq, priority)
+        part = self.parts[-1] if self.parts else self._open_part()
+        entry_size = len(entry.encode("utf-8"))
+        if part.count and (part.count >= self.max_urls
+                           or part.size + entry_size + len(URLSET_CLOSE) > self.max_bytes):
+            part.write(URLSET_CLOSE)
+            part.close()
+            part = self._open_part()
+        part.write(entry)
+        part.count += 1
+        self.total_urls += 1
+        if lastmod and (part.lastmod is None or lastmod > part.lastmod):
+            part.lastmod = lastmod
+
+    def close(self) -> List[Path]:
+        """Finish all parts, write the index if needed and rename into place."""
+        if self._closed:
+            return self.files
+        self._closed = True
+
+        if not self.parts:
+            self._open_part()
+        last = self.parts[-1]
+        last.write(URLSET_CLOSE)
+        last.close()
+
+        if len(self.parts) == 1:
+            self.files = self.parts[0].publish(self.entry_point, self.changed)
+        else:
+            index_part = _Part(self.entry_point, self.gzip_output)
+            index_part.write(XML_DECLARATION + f'<sitemapindex xmlns="{SITEMAP_NS}">\n')
+            for part in self.parts:
+                self.files.extend(part.publish(part.path, self.changed))
+                index_part.write("  <sitemap>\n")
+                index_part.write(f"    <loc>{escape(self.site_url)}/{part.path.name}</loc>\n")
+                if part.lastmod:
+                    index_part.write(f"    <lastmod>{escape(part.lastmod)}</lastmod>\n")
+                index_part.write("  </sitemap>\n")
+            index_part.write("</sitemapindex>")
+            index_part.close()
+            self.files = index_part.publish(self.entry_point, self.changed) + self.files
+
+        self._remove_stale()
+        return self.files
+
+    def _remove_stale(self) -> None:
+        """Delete sitemap files from a previous run that this run did not write."""
+        pattern = re.compile(rf"^{re.escape(self.base_name)}(-\d+|-index)?\.xml(\.gz)?$")
+        keep = {path.name for path in self.files}
+        for path in self.output_dir.iterdir():
+            if pattern.match(path.name) and path.name not in keep:
+                path.unlink()
+                self.changed.append(path)
@@ -0,0 +1,177 @@
+"""
+Typo-tolerant queries: SymSpell-style symmetric-delete spelling correction.
+
+Salesforce vocabulary is easy to misspell ("Queuable", "permision set"),
+and a misspelled term matches nothing. Every term of the index vocabulary
+(at least MIN_TERM_LENGTH letters) is stored under each string obtained by
+deleting up to MAX_DISTANCE of its characters. To correct a token, its own
+deletes are looked up: two strings within edit distance 2 always share a
+delete, so the candidates come from a few dozen exact lookups however large
+the vocabulary is. Candidates are checked with the true (optimal string
+alignment) edit distance; the closest wins, then the one in most documents.
+
+Only tokens the vocabulary does not know are corrected, and short tokens get
+a smaller budget (SHORT_TOKEN_LENGTH, MIN_TOKEN_LENGTH): a three-letter
+acronym is more likely unknown than misspelled.
+
+Uses:
+- Retriever.search(spellcheck=True) runs BM25 (and the embedder) on the
+  corrected query; build-search-index.py writes SPELLING_FILE next to the
+  retrieval index, else it is built from the BM25 vocabulary on first use.
+- search.js corrects unknown query terms the same way from the client
+  vocabulary (raglib.edits.CLIENT_SPELLING_FILE), for BM25 and typeahead
+  suggestions. The edit rules live in raglib.edits, which the client index
+  build imports without NumPy.
+
+Usage:
+    spelling = SpellingIndex.build({"queueable": 12, "permission": 40, ...})
+    spelling.lookup("queuable")                  # "queueable"
+    spelling.correct("Queuable permision set")   # ("queueable permission set", {"queuable": "queueable", ...})
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .artifacts import ArtifactWriter
+from .corpus import INDEX_DIR
+from .edits import MAX_DISTANCE, deletes, edit_distance, suggestible, token_budget
+from .indexfile import IndexFile, pack_index_file
+from .text import STOPWORDS, TOKEN_PATTERN, stem
+
+SPELLING_FILE = "spelling.idx"
+
+
+def term_counts(index) -> Dict[str, int]:
+    """Term -> number of documents, from a BM25Index or SegmentedBM25."""
+    counts: Dict[str, int] = {}
+    for part in getattr(index, "indexes", [index]):
+        for term, count in zip(part.terms, np.diff(np.asarray(part.offsets)).tolist()):
+            counts[term] = counts.get(term, 0) + count
+    return counts
+
+
+class SpellingIndex:
+    """
+    Vocabulary terms by their deletes (CSR: keys[i] -> term_ids[offsets[i]:offsets[i + 1]]).
+
+    Build with SpellingIndex.build(counts), then save(); load() maps the
+    saved file.
+    """
+
+    def __init__(self, terms: Sequence[str], counts: np.ndarray, keys: Sequence[str], offsets: np.ndarray,
+                 term_ids: np.ndarray):
+        self.terms = terms
+        self.counts = counts
+        self.keys = keys
+        self.offsets = offsets
+        self.term_ids = term_ids
+
+    @classmethod
+    def build(cls, counts: Mapping[str, int], max_distance: int = MAX_DISTANCE) -> "SpellingIndex":
+        """Index the terms of counts (term -> documents) that can be suggested."""
+        terms = sorted(term for term in counts if suggestible(term))
+        postings: Dict[str, List[int]] = {}
+        for term_id, term in enumerate(terms):
+            for key in deletes(term, max_distance):
+                postings.setdefault(key, []).append(term_id)
+        keys = sorted(postings)
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(postings[key]) for key in keys])
+        term_ids = np.array([term_id for key in keys for term_id in postings[key]], dtype=np.int32)
+        return cls(terms, np.array([counts[term] for term in terms], dtype=np.int32), keys, offsets, term_ids)
+
+    @classmethod
+    def load(cls, index_dir: Path = INDEX_DIR) -> "SpellingIndex":
+        """Open the index written by save(); raises FileNotFoundError if there is none."""
+        index_file = IndexFile.open(Path(index_dir) / SPELLING_FILE)
+        return cls(index_file.strings("terms"), index_file.array("counts"), index_file.strings("keys"),
+                   index_file.array("offsets"), index_file.array("term_ids"))
+
+    def to_bytes(self) -> bytes:
+        arrays = {"counts": self.counts, "offsets": self.offsets, "term_ids": self.term_ids}
+        strings = {"terms": list(self.terms), "keys": list(self.keys)}
+        return pack_index_file(arrays, strings, {"kind": "spelling", "terms": len(self.terms)})
+
+    def save(self, artifacts: ArtifactWriter, index_dir: Path = INDEX_DIR) -> None:
+        artifacts.write_bytes(Path(index_dir) / SPELLING_FILE, self.to_bytes())
+
+    def _position(self, table: Sequence[str], value: str) -> Optional[int]:
+        """Position of value in a sorted table, or None."""
+        if hasattr(table, "index_of"):
+            return table.index_of(value)
+        low, high = 0, len(table)
+        while low < high:
+            middle = (low + high) // 2
+            if table[middle] < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < len(table) and table[low] == value else None
+
+    def __contains__(self, term: str) -> bool:
+        return self._position(self.terms, term) is not None
+
+    def lookup(self, token: str, known: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        The closest vocabulary term to token (most documents on a tie), or None.
+
+        Returns None for a token that is too short to correct or that is
+        known: in the vocabulary, or known(token) if given.
+        """
+        budget = token_budget(token)
+        if not budget or (known(token) if known is not None else token in self):
+            return None
+        best: Optional[Tuple[int, int, str]] = None
+        seen = set()
+        for variant in deletes(token, budget):
+            row = self._position(self.keys, variant)
+            if row is None:
+                continue
+            for term_id in self.term_ids[self.offsets[row]:self.offsets[row + 1]].tolist():
+                if term_id in seen:
+                    continue
+                seen.add(term_id)
+                term = self.terms[term_id]
+                distance = edit_distance(token, term, budget)
+                if distance <= budget:
+                    candidate = (distance, -int(self.counts[term_id]), term)
+                    if best is None or candidate < best:
+                        best = candidate
+        return None if best is None else best[2]
+
+    def correct(self, query: str, known: Optional[Callable[[str], bool]] = None) -> Tuple[str, Dict[str, str]]:
+        """
+        query with each misspelled word replaced by its correction (see lookup()).
+
+        Returns (corrected query, {word: correction}); words are matched as
+        search terms (lowercased and stemmed), so corrections are index terms.
+        """
+        corrections: Dict[str, str] = {}
+        parts = []
+        position = 0
+        lowered = query.lower()
+        if len(lowered) != len(query):
+            query = lowered  # lowercasing changed the length: offsets would not carry over
+        for match in TOKEN_PATTERN.finditer(lowered):
+            word = match.group()
+            if len(word) < 2 or word in STOPWORDS:
+                continue
+            correction = self.lookup(stem(word), known)
+            if correction is None:
+                continue
+            corrections[word] = correction
+            parts.append(query[position:match.start()])
+            parts.append(correction)
+            position = match.end()
+        parts.append(query[position:])
+        return "".join(parts), corrections
+
+
+def read_spelling(index_dir: Path = INDEX_DIR) -> Optional[SpellingIndex]:
+    """The index saved by SpellingIndex.save(), or None."""
+    try:
+        return SpellingIndex.load(index_dir)
+    except FileNotFoundError:
+        return None
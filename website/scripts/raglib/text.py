@@ -0,0 +1,40 @@
+"""
+Tokenization shared by every search index.
+
+website/assets/js/search.js re-implements tokenize() for the browser; keep
+the two in step (same regex, stopwords and stemming rules) or client-side
+queries will miss terms the index contains.
+"""
+
+import re
+from typing import List
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from had has have how i if in into is it its
+not of on or should so than that the their them then there these they this to was we were
+what when where which while who why will with you your
+""".split())
+
+
+def stem(token: str) -> str:
+    """
+    Light plural stemmer.
+
+    Just enough to match "limits" with "limit", "queries" with "query" and
+    "classes" with "class" without the surprises of a full stemmer.
+    """
+    if len(token) > 3 and token.endswith("ies") and not token.endswith(("eies", "aies")):
+        return token[:-3] + "y"
+    if len(token) > 4 and token.endswith(("sses", "xes", "zes", "ches", "shes")):
+        return token[:-2]
+    if len(token) > 2 and token.endswith("s") and not token.endswith(("us", "ss", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, stemmed search terms of text, stopwords removed."""
+    return [stem(token) for token in TOKEN_PATTERN.findall(text.lower())
+            if len(token) > 1 and token not in STOPWORDS]
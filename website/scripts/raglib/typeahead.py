@@ -0,0 +1,182 @@
+"""
+Typeahead suggestions over page titles and section headings.
+
+search.js suggests pages and sections on every keystroke, before the full
+BM25 search runs. The suggestions come from a prefix index built with the
+client search index and written next to it as TYPEAHEAD_FILE:
+
+    labels       every distinct page title and H2/H3 heading, once
+    pages        [[url, title label, weight, heading weight], ...]
+    headings     [[label, page, anchor], ...]; anchor is n for label_anchor(label),
+                 numbered "-n" like kramdown's duplicate ids (0: not numbered),
+                 or the id itself when the label does not give it
+    key_labels   the keys, sorted: key i is the normalised label key_labels[i]
+    key_words    from its word key_words[i] on, cut to MAX_KEY_LENGTH
+
+Keys are positions, not strings: search.js normalises each label once and
+slices the keys out of it. A label's keys start at its first word and at
+each later word that is not a stopword, so "trig" finds "Trigger Handler
+Pattern" as well as "Apex Trigger Patterns". A lookup is a binary search for
+the first key with the prefix, then a scan of the keys that share it for the
+best entries (page titles and headings), so a keystroke costs microseconds.
+Entries whose label starts with the prefix come first, then the heaviest:
+weight is the page's PageRank (raglib.linkgraph) scaled to 0..WEIGHT_SCALE,
+and headings carry HEADING_SHARE of their page's weight, so a page outranks
+its own sections.
+
+suggest() and label_anchor() are the Python twins of search.js suggest()
+and labelAnchor(); keep them in step.
+
+Usage:
+    data = build_typeahead(pages)
+    suggest(Typeahead(data), "bulk trig")   # [(label, url, weight), ...]
+"""
+
+import bisect
+import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .chunker import heading_anchor
+from .corpus import Page
+from .linkgraph import FENCED_CODE_PATTERN, page_links, page_ranks, rank_weights
+from .text import STOPWORDS
+
+TYPEAHEAD_FILE = "typeahead.json"
+TYPEAHEAD_VERSION = 2
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$", re.MULTILINE)
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+ANCHOR_STRIP_PATTERN = re.compile(r"[^a-z0-9_\- ]")
+NUMBERED_PATTERN = re.compile(r"[1-9][0-9]*")
+SUGGESTED_LEVELS = (2, 3)
+# Longest key stored; longer prefixes are matched on their first MAX_KEY_LENGTH characters
+MAX_KEY_LENGTH = 24
+WEIGHT_SCALE = 1000
+HEADING_SHARE = 0.5
+MAX_SUGGESTIONS = 8
+
+
+def normalize(text: str) -> str:
+    """Lowercase words joined by single spaces (same rule as search.js normalizeKey)."""
+    return " ".join(WORD_PATTERN.findall(text.lower()))
+
+
+def page_headings(body: str) -> List[Tuple[int, str, str]]:
+    """(level, heading, anchor) of every heading outside code fences, ids numbered like kramdown's."""
+    headings = []
+    seen: Dict[str, int] = {}
+    for match in HEADING_PATTERN.finditer(FENCED_CODE_PATTERN.sub("", body)):
+        anchor = heading_anchor(match.group(2))
+        count = seen.get(anchor, 0)
+        seen[anchor] = count + 1
+        headings.append((len(match.group(1)), match.group(2), f"{anchor}-{count}" if count else anchor))
+    return headings
+
+
+def label_anchor(label: str) -> str:
+    """The heading id search.js derives from a label (kramdown's, for plain ASCII headings)."""
+    return ANCHOR_STRIP_PATTERN.sub("", label.strip().lower()).replace(" ", "-")
+
+
+def _anchor_code(label: str, anchor: str) -> Union[int, str]:
+    """anchor as stored in headings: its kramdown number if label_anchor(label) gives it, else itself."""
+    base = label_anchor(label)
+    if anchor == base:
+        return 0
+    number = anchor[len(base) + 1:]
+    if anchor.startswith(base + "-") and NUMBERED_PATTERN.fullmatch(number):
+        return int(number)
+    return anchor
+
+
+def _key_words(label: str) -> List[int]:
+    """Words of the normalised label a key starts at: the first and each later content word."""
+    words = normalize(label).split(" ")
+    return [i for i in range(len(words)) if i == 0 or (len(words[i]) > 1 and words[i] not in STOPWORDS)]
+
+
+def build_typeahead(pages: Iterable[Page], ranks: Optional[Dict[str, float]] = None) -> dict:
+    """
+    The TYPEAHEAD_FILE data for pages.
+
+    ranks (path -> PageRank) defaults to the PageRank of the pages' own links.
+    """
+    pages = list(pages)
+    if ranks is None:
+        ranks = page_ranks([(page.path, page.url, page_links(page.body)) for page in pages])
+    weights = rank_weights(ranks)
+    labels: Dict[str, int] = {}
+    page_rows, headings = [], []
+    for row, page in enumerate(pages):
+        weight = weights.get(page.path, 0.0)
+        page_rows.append([page.url, labels.setdefault(page.title, len(labels)), round(WEIGHT_SCALE * weight),
+                          round(WEIGHT_SCALE * weight * HEADING_SHARE)])
+        for level, heading, anchor in page_headings(page.body):
+            if level in SUGGESTED_LEVELS and normalize(heading):
+                label = heading.strip()
+                headings.append([labels.setdefault(label, len(labels)), row, _anchor_code(label, anchor)])
+
+    keys = []
+    for label, label_id in labels.items():
+        words = normalize(label).split(" ")
+        for word in _key_words(label):
+            keys.append((" ".join(words[word:])[:MAX_KEY_LENGTH], label_id, word))
+    keys.sort()
+    return {
+        "version": TYPEAHEAD_VERSION,
+        "max_key_length": MAX_KEY_LENGTH,
+        "labels": list(labels),
+        "pages": page_rows,
+        "headings": headings,
+        "key_labels": [label_id for _, label_id, _ in keys],
+        "key_words": [word for _, _, word in keys],
+    }
+
+
+class Typeahead:
+    """TYPEAHEAD_FILE data decoded for lookups (as search.js loadTypeahead() does)."""
+
+    def __init__(self, data: dict):
+        self.data = data
+        normalized = [normalize(label).split(" ") for label in data["labels"]]
+        self.keys = [" ".join(normalized[label][word:])[:data["max_key_length"]]
+                     for label, word in zip(data["key_labels"], data["key_words"])]
+        # Entries: page titles (entry = page row), then headings (entry = pages + heading row)
+        self.label_entries: Dict[int, List[int]] = {}
+        for entry, label in enumerate([page[1] for page in data["pages"]]
+                                      + [heading[0] for heading in data["headings"]]):
+            self.label_entries.setdefault(label, []).append(entry)
+
+    def entry(self, entry: int) -> Tuple[str, str, int]:
+        """(label, url, weight) of an entry."""
+        pages = self.data["pages"]
+        if entry < len(pages):
+            url, label, weight, _ = pages[entry]
+            return self.data["labels"][label], url, weight
+        label, page, anchor = self.data["headings"][entry - len(pages)]
+        label = self.data["labels"][label]
+        if not isinstance(anchor, str):
+            anchor = label_anchor(label) + (f"-{anchor}" if anchor else "")
+        return label, f"{pages[page][0]}#{anchor}", pages[page][3]
+
+
+def suggest(typeahead: Typeahead, query: str, limit: int = MAX_SUGGESTIONS) -> List[Tuple[str, str, int]]:
+    """
+    (label, url, weight) of the best entries with a key starting with query.
+
+    Labels that start with query come first, then heavier entries; each
+    entry appears once and ties keep key order.
+    """
+    prefix = normalize(query)[:typeahead.data["max_key_length"]]
+    if not prefix:
+        return []
+    keys = typeahead.keys
+    best: Dict[int, int] = {}
+    position = bisect.bisect_left(keys, prefix)
+    while position < len(keys) and keys[position].startswith(prefix):
+        start = typeahead.data["key_words"][position] == 0
+        for entry in typeahead.label_entries[typeahead.data["key_labels"][position]]:
+            score = typeahead.entry(entry)[2] + start * (WEIGHT_SCALE + 1)
+            best[entry] = max(best.get(entry, 0), score)
+        position += 1
+    top = sorted(best, key=lambda entry: -best[entry])[:limit]
+    return [typeahead.entry(entry) for entry in top]
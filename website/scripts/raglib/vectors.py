@@ -0,0 +1,251 @@
+"""
+Offline dense embeddings and an exact, memory-mapped vector index.
+
+No GPU, no network, no model download. Two embedders are provided:
+
+HashingEmbedder   stateless. Each term is hashed to NNZ signed positions in
+                  a DIM-wide vector (a sparse random projection of the
+                  one-hot term space); a text is the sum of its weighted
+                  terms. Pure lexical similarity, but needs no training.
+LsaEmbedder       the hashed vectors projected onto the top singular
+                  vectors of the corpus (latent semantic analysis). Terms
+                  that co-occur across chunks ("soql", "limit", "governor",
+                  "bulkify") end up close, so paraphrases match without
+                  sharing words. Fitted at build time, ~1 MB on disk.
+
+Anything with ``dim`` and ``embed(texts) -> float32 array`` can stand in for
+them (e.g. a local sentence-transformer), as long as the same embedder is
+used to build the index and to embed queries.
+
+VectorIndex holds one L2-normalised float32 row per chunk. Retriever stores
+the rows as the "vectors" array of its index file (raglib.indexfile), which
+is memory-mapped, so loading is a few milliseconds regardless of size and
+only the pages touched by a search are read. Search is exact: blocked
+matrix multiply plus argpartition.
+"""
+
+import hashlib
+import io
+import math
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .text import tokenize
+
+DIM = 1024
+NNZ = 4
+LSA_COMPONENTS = 64
+
+LSA_FILE = "lsa.npz"
+
+# Rows multiplied per step in VectorIndex.search (bounds temporary memory)
+SEARCH_BLOCK_ROWS = 65536
+# A search mask selecting fewer than this share of rows is searched by gathering its rows
+SELECTIVE_MASK_SHARE = 0.25
+
+
+@lru_cache(maxsize=65536)
+def _term_slots(term: str, dim: int, nnz: int) -> Tuple[Tuple[int, ...], Tuple[float, ...]]:
+    """The nnz (position, sign) pairs of a term; stable across runs and platforms."""
+    digest = hashlib.blake2b(term.encode("utf-8"), digest_size=4 * nnz).digest()
+    positions, signs = [], []
+    for i in range(nnz):
+        value = int.from_bytes(digest[4 * i:4 * i + 4], "little")
+        positions.append((value >> 1) % dim)
+        signs.append(1.0 if value & 1 else -1.0)
+    return tuple(positions), tuple(signs)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalise each row in place (zero rows stay zero)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class HashingEmbedder:
+    """Stateless hashed sparse random projection of sublinear term frequencies."""
+
+    name = "hashing"
+
+    def __init__(self, dim: int = DIM, nnz: int = NNZ, idf: Optional[dict] = None):
+        self.dim = dim
+        self.nnz = nnz
+        self.idf = idf or {}
+
+    def project(self, token_lists: Iterable[List[str]]) -> np.ndarray:
+        """Un-normalised hashed vectors of pre-tokenized texts."""
+        rows = []
+        scale = 1 / math.sqrt(self.nnz)
+        for tokens in token_lists:
+            row = np.zeros(self.dim, dtype=np.float32)
+            for term, tf in Counter(tokens).items():
+                weight = (1 + math.log(tf)) * self.idf.get(term, 1.0) * scale
+                positions, signs = _term_slots(term, self.dim, self.nnz)
+                for position, sign in zip(positions, signs):
+                    row[position] += sign * weight
+            rows.append(row)
+        return np.vstack(rows) if rows else np.zeros((0, self.dim), dtype=np.float32)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return self.embed_tokens(tokenize(text) for text in texts)
+
+    def embed_tokens(self, token_lists: Iterable[List[str]]) -> np.ndarray:
+        return normalize_rows(self.project(token_lists))
+
+    def config(self) -> dict:
+        return {"name": self.name, "dim": self.dim, "nnz": self.nnz}
+
+
+class LsaEmbedder:
+    """
+    Latent semantic analysis on top of the hashing projection.
+
+    Usage:
+        embedder = LsaEmbedder.fit(token_lists)
+        vectors = embedder.embed(["avoid hitting SOQL limits in triggers"])
+    """
+
+    name = "lsa"
+
+    def __init__(self, hashing: HashingEmbedder, components: np.ndarray):
+        self.hashing = hashing
+        self.components = components  # (dim, hashing.dim) projection
+        self.dim = components.shape[0]
+
+    @classmethod
+    def fit(cls, token_lists: Sequence[List[str]], components: int = LSA_COMPONENTS,
+            dim: int = DIM, nnz: int = NNZ) -> "LsaEmbedder":
+        """Fit idf weights and the latent space on the corpus (one list of tokens per chunk)."""
+        doc_freq = Counter(term for tokens in token_lists for term in set(tokens))
+        count = len(token_lists)
+        idf = {term: math.log((1 + count) / (1 + df)) + 1 for term, df in doc_freq.items()}
+        hashing = HashingEmbedder(dim, nnz, idf)
+        matrix = normalize_rows(hashing.project(token_lists))
+        # Right singular vectors of the (chunks x dim) matrix, largest first,
+        # scaled by 1/sqrt(singular value) so a few dominant topics don't
+        # drown out the rest
+        _, singular, vt = np.linalg.svd(matrix, full_matrices=False)
+        keep = min(components, int(np.count_nonzero(singular > 1e-6)))
+        projection = vt[:keep] / np.sqrt(singular[:keep, None])
+        return cls(hashing, np.ascontiguousarray(projection, dtype=np.float32))
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return self.embed_tokens(tokenize(text) for text in texts)
+
+    def embed_tokens(self, token_lists: Iterable[List[str]]) -> np.ndarray:
+        # A term the corpus never used has no place in the latent space; left
+        # in, its hashed vector would project to an arbitrary direction
+        idf = self.hashing.idf
+        known = ([term for term in tokens if term in idf] for tokens in token_lists)
+        hashed = normalize_rows(self.hashing.project(known))
+        return normalize_rows(hashed @ self.components.T)
+
+    def config(self) -> dict:
+        return {"name": self.name, "dim": self.dim, "hashing_dim": self.hashing.dim, "nnz": self.hashing.nnz}
+
+    def to_bytes(self) -> bytes:
+        terms = sorted(self.hashing.idf)
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            components=self.components,
+            terms=np.array(terms, dtype=np.str_),
+            idf=np.array([self.hashing.idf[term] for term in terms], dtype=np.float32),
+            params=np.array([self.hashing.dim, self.hashing.nnz], dtype=np.int64),
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def load(cls, path: Path) -> "LsaEmbedder":
+        with np.load(path, allow_pickle=False) as arrays:
+            dim, nnz = (int(x) for x in arrays["params"])
+            idf = dict(zip(arrays["terms"].tolist(), arrays["idf"].tolist()))
+            return cls(HashingEmbedder(dim, nnz, idf), arrays["components"])
+
+
+class VectorIndex:
+    """
+    Exact cosine top-k over L2-normalised vectors.
+
+    Usage:
+        index = VectorIndex(ids, vectors)          # vectors may be memory-mapped
+        rows, scores = index.search(query_vectors, k=10)[0]
+    """
+
+    def __init__(self, ids: List[str], vectors: np.ndarray, embedder_config: Optional[dict] = None):
+        if len(ids) != len(vectors):
+            raise ValueError(f"{len(ids)} ids for {len(vectors)} vectors")
+        self.ids = ids
+        self.vectors = vectors
+        self.embedder_config = embedder_config or {}
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    def gather(self, rows: np.ndarray) -> np.ndarray:
+        """The vectors of the given rows, as float32 (only those rows are read)."""
+        return np.asarray(self.vectors[np.asarray(rows, dtype=np.int64)], dtype=np.float32)
+
+    def search(self, queries: np.ndarray, k: int = 10,
+               mask: Optional[np.ndarray] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Exact top-k for a batch of (normalised) query vectors.
+
+        Returns one (rows, scores) pair per query, best first. mask is an
+        optional boolean array over rows; rows where it is False are skipped.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        count = len(self.vectors)
+        k = min(k, count)
+        if k <= 0:
+            empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+            return [empty for _ in queries]
+
+        # A selective mask (a small facet) is applied before the multiply: only its rows are read
+        selected = None
+        if mask is not None and np.count_nonzero(mask) < count * SELECTIVE_MASK_SHARE:
+            selected = np.flatnonzero(mask)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, count if selected is None else len(selected), SEARCH_BLOCK_ROWS):
+            if selected is None:
+                block = np.asarray(self.vectors[start:start + SEARCH_BLOCK_ROWS], dtype=np.float32)
+                block_rows = np.arange(start, start + len(block))
+            else:
+                block_rows = selected[start:start + SEARCH_BLOCK_ROWS]
+                block = np.asarray(self.vectors[block_rows], dtype=np.float32)
+            scores = queries @ block.T
+            if mask is not None and selected is None:
+                scores[:, ~mask[start:start + len(block)]] = -np.inf
+            take = min(k, scores.shape[1])
+            top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            best_rows = np.hstack([best_rows, block_rows[top]])
+            best_scores = np.hstack([best_scores, np.take_along_axis(scores, top, axis=1)])
+            if best_rows.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+        results = []
+        for rows, scores in zip(best_rows, best_scores):
+            order = np.argsort(-scores, kind="stable")
+            rows, scores = rows[order], scores[order]
+            valid = np.isfinite(scores)
+            results.append((rows[valid], scores[valid]))
+        return results
+
+
+def load_embedder(index_dir: Path, config: dict):
+    """The embedder an index at index_dir was built with (built-in embedders only)."""
+    name = config.get("name")
+    if name == LsaEmbedder.name:
+        return LsaEmbedder.load(Path(index_dir) / LSA_FILE)
+    if name == HashingEmbedder.name:
+        return HashingEmbedder(config["dim"], config["nnz"])
+    raise ValueError(f"Index was built with embedder {name!r}; pass the same embedder when loading it")
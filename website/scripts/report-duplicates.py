@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Report near-duplicate chunks across the RAG knowledge library.
+
+Chunks every page in rag/ and clusters the chunks whose word shingles
+overlap above a Jaccard threshold (MinHash LSH, see raglib/dedup.py). Each
+cluster is listed canonical chunk first, with every other member's
+similarity to it: candidates for consolidating pages or linking to one
+source instead of repeating it.
+
+Usage:
+    python website/scripts/report-duplicates.py
+    python website/scripts/report-duplicates.py --threshold 0.5 --shingle-size 3
+    python website/scripts/report-duplicates.py --json > duplicates.json
+"""
+
+import argparse
+import json
+import time
+
+from raglib.chunker import iter_chunks
+from raglib.corpus import iter_pages
+from raglib.dedup import SHINGLE_SIZE, THRESHOLD, chunk_shingles, find_duplicates
+from raglib.minhash import jaccard
+
+SITE_URL = "https://pranavnagrecha.github.io/Salesforce-RAG"
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Report near-duplicate chunks")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help=f"Minimum Jaccard similarity of word shingles (default: {THRESHOLD})")
+    parser.add_argument("--shingle-size", type=int, default=SHINGLE_SIZE,
+                        help=f"Words per shingle (default: {SHINGLE_SIZE})")
+    parser.add_argument("--json", action="store_true", help="Print clusters as JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    chunks = list(iter_chunks(iter_pages()))
+    clusters = find_duplicates(chunks, threshold=args.threshold, shingle_size=args.shingle_size)
+    elapsed = time.perf_counter() - start
+
+    report = []
+    for cluster in clusters:
+        canonical = chunk_shingles(chunks[cluster[0]], args.shingle_size)
+        report.append([{
+            "id": chunks[row].id,
+            "title": chunks[row].title,
+            "url": chunks[row].url,
+            "similarity": 1.0 if row == cluster[0] else
+            round(jaccard(canonical, chunk_shingles(chunks[row], args.shingle_size)), 3),
+        } for row in cluster])
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+
+    duplicates = sum(len(cluster) - 1 for cluster in clusters)
+    print(f"{len(clusters)} clusters, {duplicates} duplicate chunks of {len(chunks)} "
+          f"(Jaccard ≥ {args.threshold}, {args.shingle_size}-word shingles) in {elapsed:.2f}s\n")
+    for number, cluster in enumerate(report, 1):
+        for i, member in enumerate(cluster):
+            label = f"{number:3}." if i == 0 else f"  [{member['similarity']:.2f}]"
+            print(f"{label} {member['title']}")
+            print(f"       {SITE_URL}{member['url']}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Look up code examples in the RAG knowledge library by identifier.
+
+Finds fenced code blocks by class, method, interface or annotation
+(raglib.code_index): identifiers are split on dots and camelCase, so
+"executeBatch", "Database.executeBatch" and "batch" all find
+Database.executeBatch(...). Uses the index written by build-search-index.py,
+or builds one from rag/ if it is missing.
+
+Usage:
+    python website/scripts/search-code.py "Database.executeBatch"
+    python website/scripts/search-code.py "implements Queueable" --lang apex
+    python website/scripts/search-code.py "@wi" --prefix
+    python website/scripts/search-code.py "HttpRequest setEndpoint" --json
+"""
+
+import argparse
+import json
+
+from raglib.code_index import lookup
+
+SITE_URL = "https://pranavnagrecha.github.io/Salesforce-RAG"
+PREVIEW_LINES = 12
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Look up code examples by identifier")
+    parser.add_argument("query", help="Identifier(s), e.g. Database.executeBatch, @wire, 'implements Queueable'")
+    parser.add_argument("-k", type=int, default=5, help="Number of results (default: 5)")
+    parser.add_argument("--lang", help="Only blocks fenced with this language (e.g. apex, javascript, html)")
+    parser.add_argument("--prefix", action="store_true", help="Match identifiers starting with the query")
+    parser.add_argument("--full", action="store_true", help="Print whole blocks, not the first lines")
+    parser.add_argument("--json", action="store_true", help="Print matches as JSON")
+    args = parser.parse_args()
+
+    matches = lookup(args.query, language=args.lang, prefix=args.prefix, k=args.k)
+
+    if args.json:
+        print(json.dumps([match._asdict() for match in matches], indent=2, ensure_ascii=False))
+        return
+
+    if not matches:
+        print(f"No code blocks for '{args.query}'")
+        return
+
+    for rank, match in enumerate(matches, 1):
+        lines = match.code.splitlines()
+        shown = lines if args.full else lines[:PREVIEW_LINES]
+        print(f"{rank:2}. [{match.score}] {match.title} ({match.language or 'text'})")
+        print(f"    {SITE_URL}{match.url}")
+        print(f"```{match.language}")
+        print("\n".join(shown))
+        if len(shown) < len(lines):
+            print(f"... ({len(lines) - len(shown)} more lines)")
+        print("```\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Search the RAG knowledge library from the command line.
+
+Ranks chunks with BM25 or offline embeddings (raglib.retrieval). Uses the index
+written by build-search-index.py, or builds one from rag/ if it is missing.
+
+Usage:
+    python website/scripts/search-rag.py "bulkify trigger"
+    python website/scripts/search-rag.py "sharing rules" -k 5 --folder security
+    python website/scripts/search-rag.py "batch" --folder code-examples/apex --tag performance
+    python website/scripts/search-rag.py "governor limits" --facets
+    python website/scripts/search-rag.py "queuable permision set" --spellcheck
+    python website/scripts/search-rag.py "platform events" --json
+    python website/scripts/search-rag.py "avoid hitting SOQL limits in triggers" --mode semantic
+    python website/scripts/search-rag.py "Database.Stateful" --mode hybrid --timings
+    python website/scripts/search-rag.py "When should I use Apex instead of Flow?" --faq
+    python website/scripts/search-rag.py "bulkify trigger" --context 1500
+"""
+
+import argparse
+import json
+
+from raglib.corpus import plain_text
+from raglib import faq
+from raglib.context import pack_context
+from raglib.retrieval import FUSIONS, MODES, default_retriever, search
+
+SITE_URL = "https://pranavnagrecha.github.io/Salesforce-RAG"
+SNIPPET_LENGTH = 160
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Search the RAG knowledge library")
+    parser.add_argument("query", help="Search query")
+    parser.add_argument("-k", type=int, default=10, help="Number of results (default: 10)")
+    parser.add_argument("--folder", help="Only search one rag/ folder (e.g. security, code-examples/apex)")
+    parser.add_argument("--tag", action="append", default=[],
+                        help="Only search pages with this frontmatter tag (repeat to require several)")
+    parser.add_argument("--facets", action="store_true",
+                        help="Print the number of matching chunks per folder and tag instead of results")
+    parser.add_argument("--mode", choices=MODES,
+                        help="Ranking (default: keyword; for --context, hybrid if the index has vectors)")
+    parser.add_argument("--fusion", choices=FUSIONS, default="rrf", help="Hybrid fusion method (default: rrf)")
+    parser.add_argument("--collapse", action="store_true",
+                        help="Return one chunk per cluster of near-duplicates (see report-duplicates.py)")
+    parser.add_argument("--glossary-boost", action="store_true",
+                        help="Rank chunks that mention a glossary term named in the query higher")
+    parser.add_argument("--rank-boost", action="store_true",
+                        help="Rank chunks from pages that many pages link to higher (PageRank)")
+    parser.add_argument("--spellcheck", action="store_true",
+                        help="Correct misspelled words (e.g. Queuable) before searching")
+    parser.add_argument("--context", type=int, metavar="TOKENS",
+                        help="Print a prompt context of diverse, cited chunks that fits in TOKENS (see raglib.context)")
+    parser.add_argument("--timings", action="store_true", help="Print per-retriever latency")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--faq", action="store_true",
+                        help="Answer from the Q&A pairs if the query is a near-duplicate of a stored question")
+    args = parser.parse_args()
+
+    if args.faq:
+        match = faq.lookup(args.query)
+        if match is not None:
+            if args.json:
+                print(json.dumps(match._asdict(), indent=2, ensure_ascii=False))
+            else:
+                print(f"Q: {match.question}  [{match.similarity:.2f}]")
+                print(f"   {SITE_URL}{match.url}\n")
+                print(match.answer)
+            return
+
+    if args.facets:
+        counts = default_retriever().facet_counts(args.query, args.folder, args.tag)
+        if args.json:
+            print(json.dumps(counts, indent=2))
+        else:
+            for name, count in sorted(counts.items(), key=lambda item: (-item[1], item[0])):
+                print(f"{count:6}  {name}")
+        return
+
+    timings = {}
+    if args.context is not None:
+        context = pack_context(default_retriever(), args.query, budget=args.context, mode=args.mode, folder=args.folder,
+                               tags=args.tag or None, spellcheck=args.spellcheck, timings=timings)
+        if args.json:
+            print(json.dumps({**context._asdict(), "passages": [p._asdict() for p in context.passages]},
+                             indent=2, ensure_ascii=False))
+        else:
+            print(context.text or f"No results for '{args.query}'")
+            print(f"\n({context.tokens} of {context.budget} tokens, {len(context.passages)} passages)")
+            if args.timings:
+                print(", ".join(f"{name}: {ms:.2f} ms" for name, ms in timings.items()))
+        return
+
+    results = search(args.query, k=args.k, folder=args.folder, mode=args.mode or "keyword", fusion=args.fusion,
+                     collapse=args.collapse, glossary_boost=args.glossary_boost, rank_boost=args.rank_boost,
+                     tags=tuple(args.tag) or None, spellcheck=args.spellcheck, timings=timings)
+
+    if args.json:
+        print(json.dumps([result._asdict() for result in results], indent=2, ensure_ascii=False))
+        return
+
+    if args.spellcheck:
+        corrected, corrections = default_retriever().correct(args.query)
+        if corrections:
+            print(f"Showing results for '{corrected}'\n")
+
+    if not results:
+        print(f"No results for '{args.query}'")
+        return
+
+    for rank, result in enumerate(results, 1):
+        snippet = " ".join(plain_text(result.text).split())[:SNIPPET_LENGTH]
+        print(f"{rank:2}. [{result.score:.4g}] {result.title}")
+        print(f"    {SITE_URL}{result.url}")
+        print(f"    {snippet}")
+
+    if args.timings:
+        print("\n" + ", ".join(f"{name}: {ms:.2f} ms" for name, ms in timings.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Serve the RAG knowledge library over HTTP on localhost.
+
+Loads the retrieval index once (build it first with
+build-search-index.py --target server) and answers:
+
+    GET /search?q=bulkify+trigger&k=5&mode=hybrid&folder=development
+    GET /chunk/<url-encoded chunk id>
+    GET /faq?q=when+should+I+use+apex+instead+of+flow
+    GET /code?q=Database.executeBatch&lang=apex
+    GET /metrics
+    GET /healthz
+
+Concurrent searches are micro-batched into one vector scoring call and
+results are cached; see raglib/server.py.
+
+Usage:
+    python website/scripts/serve-rag.py
+    python website/scripts/serve-rag.py --port 9000 --batch-window-ms 5
+    curl 'http://127.0.0.1:8765/search?q=sharing+rules&k=3'
+"""
+
+import argparse
+import asyncio
+import time
+
+from raglib.cache import QueryCache
+from raglib.corpus import INDEX_DIR
+from raglib.code_index import CodeIndex
+from raglib.faq import FaqIndex
+from raglib.retrieval import Retriever
+from raglib.server import BATCH_WINDOW, KEEPALIVE_TIMEOUT, MAX_BATCH, REQUEST_TIMEOUT, RetrievalServer
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Serve the knowledge library search over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW * 1000,
+                        help=f"How long to collect concurrent searches into a batch (default: {BATCH_WINDOW * 1000:g})")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH,
+                        help=f"Largest batch of searches scored together (default: {MAX_BATCH})")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT,
+                        help=f"Seconds to receive and answer a request (default: {REQUEST_TIMEOUT:g})")
+    parser.add_argument("--keepalive", type=float, default=KEEPALIVE_TIMEOUT,
+                        help=f"Seconds an idle connection is kept open (default: {KEEPALIVE_TIMEOUT:g})")
+    parser.add_argument("--cache-size", type=int, default=1024, help="Cached search results (default: 1024)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        retriever = Retriever.load()
+    except FileNotFoundError:
+        print(f"❌ No retrieval index in {INDEX_DIR}")
+        print("   Build it with: python website/scripts/build-search-index.py --target server")
+        raise SystemExit(1)
+    print(f"✓ Loaded {len(retriever.chunks)} chunks (build {retriever.build_id}) "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    try:
+        faq = FaqIndex.load()
+        print(f"✓ Loaded {len(faq)} FAQ pairs")
+    except FileNotFoundError:
+        faq = None
+        print("⚠️  No FAQ index; /faq is disabled until the index is rebuilt")
+    try:
+        code = CodeIndex.load()
+        print(f"✓ Loaded {len(code)} code blocks")
+    except FileNotFoundError:
+        code = None
+        print("⚠️  No code index; /code is disabled until the index is rebuilt")
+
+    server = RetrievalServer(retriever, batch_window=args.batch_window_ms / 1000, max_batch=args.max_batch,
+                             request_timeout=args.timeout, keepalive_timeout=args.keepalive,
+                             cache=QueryCache(max_entries=args.cache_size), faq=faq, code=code)
+    print(f"Serving on http://{args.host}:{args.port}/search?q=... (Ctrl+C to stop)")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,23 +6,33 @@ This script:
 1. Scans rag/ folder structure for all .md files
 2. Reads each file to extract metadata (title, description, etc.)
 3. Rebuilds rag-index.md with all files organized by domain
-4. Rebuilds rag-library.json with all file metadata and statistics
+4. Rebuilds rag-library.json with all file metadata and statistics, including
+   each page's PageRank in the internal link graph ("rank", 1.0 = average)
 5. Auto-generates homepage (website/root/index.md) with category cards
 6. Ensures all links work correctly
 
 Just run: python website/scripts/sync-homepage.py
 
+Generated files are only rewritten when their content changes (timestamps
+such as last_updated are ignored when comparing), so re-running without
+content changes leaves the working tree clean. Use --changed-file PATH to
+append the paths that did change to PATH for later pipeline stages.
+
 IMPORTANT: See website/docs/LESSONS-LEARNED.md for critical lessons and best practices
 """
 
 import re
 import sys
-import json
-import yaml
+import argparse
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
 
+from raglib.artifacts import ArtifactWriter
+from raglib.frontmatter import read_frontmatter
+from raglib.gitdates import LastModified
+from raglib.linkgraph import corpus_ranks
+
 # Folder to section name mapping
 FOLDER_TO_SECTION = {
     "architecture": "Architecture Patterns",
@@ -97,20 +107,13 @@ HOMEPAGE_PATH = BASE_DIR / "website" / "root" / "index.md"
 
 def extract_frontmatter(content):
     """Extract YAML frontmatter from markdown file."""
-    frontmatter = {}
-    if content.startswith("---"):
-        try:
-            parts = content.split("---", 2)
-            if len(parts) >= 3:
-                frontmatter = yaml.safe_load(parts[1]) or {}
-        except Exception:
-            pass
-    return frontmatter
+    return read_frontmatter(content)
 
 
-def extract_title(content, filename):
+def extract_title(content, filename, frontmatter=None):
     """Extract title from frontmatter or first heading."""
-    frontmatter = extract_frontmatter(content)
+    if frontmatter is None:
+        frontmatter = extract_frontmatter(content)
     if frontmatter.get("title"):
         return frontmatter["title"]
     
@@ -127,9 +130,10 @@ def extract_title(content, filename):
     return filename.replace(".md", "").replace("-", " ").replace("_", " ").title()
 
 
-def extract_description(content, title):
+def extract_description(content, title, frontmatter=None):
     """Extract description from frontmatter, Overview section, or first paragraph."""
-    frontmatter = extract_frontmatter(content)
+    if frontmatter is None:
+        frontmatter = extract_frontmatter(content)
     if frontmatter.get("description"):
         return frontmatter["description"]
     
@@ -161,6 +165,10 @@ def extract_description(content, title):
 def find_markdown_files():
     """Find all markdown files in rag/ directory, organized by folder."""
     files_by_folder = defaultdict(list)
+    # Last commit dates for every file in one git call (mtime fallback)
+    last_modified = LastModified(BASE_DIR, ["rag"])
+    # Link-graph authority of every knowledge page (meta/ pages are not ranked: 0)
+    ranks = corpus_ranks(RAG_DIR)
     
     for file_path in RAG_DIR.rglob("*.md"):
         # Skip excluded files
@@ -187,10 +195,10 @@ def find_markdown_files():
             print(f"Warning: Could not read {file_path}: {e}", file=sys.stderr)
             continue
         
-        # Extract metadata
-        title = extract_title(content, file_path.name)
-        description = extract_description(content, title)
+        # Extract metadata (parse frontmatter once per file)
         frontmatter = extract_frontmatter(content)
+        title = extract_title(content, file_path.name, frontmatter)
+        description = extract_description(content, title, frontmatter)
         
         # Get permalink from frontmatter if available, otherwise construct from path
         if frontmatter and "permalink" in frontmatter:
@@ -218,8 +226,9 @@ def find_markdown_files():
             "title": title,
             "description": description,
             "url": url,  # Use permalink from frontmatter if available, otherwise relative path
-            "modified": datetime.fromtimestamp(file_path.stat().st_mtime).isoformat(),
+            "modified": last_modified.get(file_path).isoformat(),
             "size": file_path.stat().st_size,
+            "rank": ranks.get(rel_path.as_posix(), 0.0),
         }
         
         files_by_folder[folder].append(file_info)
@@ -325,9 +334,9 @@ def build_rag_library(files_by_folder):
         "last_updated": datetime.now().isoformat(),
     }
     
-    # Group by folder for statistics
+    # Group by folder for statistics (sorted so output doesn't depend on scan order)
     folder_stats = {}
-    for folder, files in files_by_folder.items():
+    for folder, files in sorted(files_by_folder.items()):
         if folder != "root":
             folder_stats[folder] = len(files)
     
@@ -431,8 +440,20 @@ def build_homepage(files_by_folder):
     return "".join(lines)
 
 
+# rag-library.json fields that change on every run and are ignored when
+# deciding whether the file needs rewriting
+LIBRARY_VOLATILE_KEYS = ["metadata.last_updated", "statistics.last_updated"]
+
+
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description="Rebuild rag-index.md, rag-library.json and the homepage")
+    parser.add_argument("--dry-run", action="store_true", help="Report which files would change without writing them")
+    parser.add_argument("--changed-file", type=Path, help="Append the paths of changed artifacts to this file")
+    args = parser.parse_args()
+    
+    artifacts = ArtifactWriter(dry_run=args.dry_run)
+    
     print("Scanning rag/ folder for markdown files...")
     files_by_folder = find_markdown_files()
     
@@ -440,29 +461,26 @@ def main():
     
     print("Building rag-index.md...")
     index_content = build_rag_index(files_by_folder)
-    # Ensure directory exists before writing
-    INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
-    INDEX_PATH.write_text(index_content, encoding='utf-8')
-    print(f"✓ Wrote {INDEX_PATH}")
+    artifacts.write_text(INDEX_PATH, index_content)
     
     print("Building rag-library.json...")
     library_data = build_rag_library(files_by_folder)
-    # Ensure directory exists before writing
-    LIBRARY_PATH.parent.mkdir(parents=True, exist_ok=True)
-    LIBRARY_PATH.write_text(json.dumps(library_data, indent=2, ensure_ascii=False), encoding='utf-8')
-    print(f"✓ Wrote {LIBRARY_PATH}")
+    artifacts.write_json(LIBRARY_PATH, library_data, volatile_keys=LIBRARY_VOLATILE_KEYS)
     
     print("Building homepage...")
     homepage_content = build_homepage(files_by_folder)
-    # Ensure directory exists before writing
-    HOMEPAGE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    HOMEPAGE_PATH.write_text(homepage_content, encoding='utf-8')
-    print(f"✓ Wrote {HOMEPAGE_PATH}")
+    artifacts.write_text(HOMEPAGE_PATH, homepage_content)
+    
+    print()
+    artifacts.print_summary()
+    if args.changed_file:
+        artifacts.write_changed_list(args.changed_file)
     
     print("\n✅ Sync complete!")
     print(f"  - {INDEX_PATH.name}: {len(index_content)} characters")
     print(f"  - {LIBRARY_PATH.name}: {library_data['statistics']['total_files']} files")
     print(f"  - {HOMEPAGE_PATH.name}: {len(homepage_content)} characters")
+    print(f"  - {len(artifacts.changed)} of {len(artifacts.results)} artifacts changed")
 
 
 if __name__ == "__main__":
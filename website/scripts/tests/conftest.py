@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The scripts import raglib from website/scripts; so do the tests, from any working directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
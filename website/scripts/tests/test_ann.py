@@ -0,0 +1,46 @@
+"""Filtered IVF search (raglib.ann)."""
+
+import unittest
+
+import numpy as np
+
+from raglib.ann import IvfIndex
+from raglib.vectors import VectorIndex, normalize_rows
+
+
+class MaskedSearchTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.vectors = normalize_rows(rng.standard_normal((2000, 32)).astype(np.float32))
+        self.ivf = IvfIndex.build(self.vectors, nlist=64)
+        self.query = self.vectors[0]
+        # The rows of the cells furthest from the query: never probed at nprobe=2
+        far_cells = np.argsort(self.ivf.centroids @ self.query)[:8]
+        self.far_rows = np.concatenate([self.ivf.rows[self.ivf.offsets[c]:self.ivf.offsets[c + 1]]
+                                        for c in far_cells])
+
+    def _mask(self, rows: np.ndarray) -> np.ndarray:
+        mask = np.zeros(len(self.vectors), dtype=bool)
+        mask[rows] = True
+        return mask
+
+    def test_selective_mask_is_searched_exactly(self):
+        mask = self._mask(self.far_rows[:5])
+        rows, scores = self.ivf.search(self.query, k=10, mask=mask, nprobe=2)[0]
+        exact_rows, exact_scores = VectorIndex([str(i) for i in range(len(self.vectors))],
+                                               self.vectors).search(self.query, k=10, mask=mask)[0]
+        self.assertEqual(sorted(rows.tolist()), sorted(self.far_rows[:5].tolist()))
+        self.assertEqual(rows.tolist(), exact_rows.tolist())
+        np.testing.assert_allclose(scores, exact_scores, rtol=1e-5)
+
+    def test_probe_widens_until_k_masked_rows(self):
+        mask = self._mask(self.far_rows)
+        self.assertGreater(mask.sum(), len(self.vectors) * 2 / 64)
+        rows, scores = self.ivf.search(self.query, k=10, mask=mask, nprobe=2)[0]
+        self.assertEqual(len(rows), 10)
+        self.assertTrue(mask[rows].all())
+        self.assertTrue(np.all(np.diff(scores) <= 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
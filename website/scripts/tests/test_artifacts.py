@@ -0,0 +1,60 @@
+"""Write-if-changed artifacts (raglib.artifacts)."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from raglib.artifacts import ArtifactWriter, publish_if_changed
+
+
+class ArtifactWriterTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = Path(directory.name)
+
+    def test_text_rewritten_only_when_content_changes(self):
+        path = self.dir / "rag-index.md"
+        self.assertTrue(ArtifactWriter().write_text(path, "# Index\n"))
+        artifacts = ArtifactWriter()
+        self.assertFalse(artifacts.write_text(path, "# Index\n"))
+        self.assertTrue(artifacts.write_text(path, "# Index v2\n"))
+        self.assertEqual(artifacts.changed, [path])
+        self.assertEqual(path.read_text(encoding="utf-8"), "# Index v2\n")
+
+    def test_volatile_pattern_is_ignored(self):
+        path = self.dir / "index.md"
+        ArtifactWriter().write_text(path, "Updated: 2025-01-01\nBody\n")
+        self.assertFalse(ArtifactWriter().write_text(path, "Updated: 2025-02-02\nBody\n",
+                                                     volatile_patterns=[r"^Updated: .*$"]))
+        self.assertEqual(path.read_text(encoding="utf-8"), "Updated: 2025-01-01\nBody\n")
+
+    def test_volatile_json_key_is_ignored(self):
+        path = self.dir / "rag-library.json"
+        ArtifactWriter().write_json(path, {"metadata": {"last_updated": "a"}, "files": [1]})
+        volatile = ["metadata.last_updated"]
+        self.assertFalse(ArtifactWriter().write_json(path, {"metadata": {"last_updated": "b"}, "files": [1]},
+                                                     volatile_keys=volatile))
+        self.assertTrue(ArtifactWriter().write_json(path, {"metadata": {"last_updated": "b"}, "files": [2]},
+                                                    volatile_keys=volatile))
+        self.assertEqual(json.loads(path.read_text(encoding="utf-8"))["metadata"]["last_updated"], "b")
+
+    def test_dry_run_writes_nothing(self):
+        path = self.dir / "out.bin"
+        artifacts = ArtifactWriter(dry_run=True)
+        self.assertTrue(artifacts.write_bytes(path, b"data"))
+        self.assertFalse(path.exists())
+        self.assertEqual(artifacts.changed, [path])
+
+    def test_publish_if_changed(self):
+        path, tmp = self.dir / "sitemap.xml", self.dir / ".sitemap.xml.tmp"
+        tmp.write_bytes(b"<urlset/>")
+        self.assertTrue(publish_if_changed(tmp, path))
+        tmp.write_bytes(b"<urlset/>")
+        self.assertFalse(publish_if_changed(tmp, path))
+        self.assertFalse(tmp.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""Query cache keys (raglib.cache) and cached search() results."""
+
+import unittest
+from unittest import mock
+
+from raglib import retrieval
+from raglib.cache import query_key
+from raglib.chunker import Chunk
+from raglib.glossary import GlossaryTerm
+from raglib.retrieval import Retriever
+
+
+def _chunk(name: str, text: str) -> Chunk:
+    return Chunk(f"objects/{name}.md#{name}@0", f"objects/{name}.md", f"/rag/objects/{name}.html", "objects",
+                 name, text, len(text.split()))
+
+
+class QueryKeyTest(unittest.TestCase):
+    def test_word_order_shares_a_key(self):
+        self.assertEqual(query_key("Bulkify Triggers", k=5), query_key("trigger bulkify", k=5))
+
+    def test_glossary_boost_keeps_word_order(self):
+        self.assertNotEqual(query_key("record type", k=5, glossary_boost=True),
+                            query_key("type record", k=5, glossary_boost=True))
+        self.assertEqual(query_key("Record  Type", k=5, glossary_boost=True),
+                         query_key("record type", k=5, glossary_boost=True))
+
+
+class CachedGlossarySearchTest(unittest.TestCase):
+    def setUp(self):
+        chunks = [
+            _chunk("layouts", "Page layouts per profile: the type of each record decides the layout record"),
+            _chunk("record-types", "A record type selects the page layout and picklist values"),
+            _chunk("types", "Field type and record limits"),
+        ]
+        self.retriever = Retriever.from_chunks(chunks, dense=False)
+        self.retriever.set_glossary([GlossaryTerm("Record Type", (), "Business process and layout", "/rag/glossary/")],
+                                    {chunks[1].id: [0]})
+        retrieval.result_cache().clear()
+        self.addCleanup(retrieval.result_cache().clear)
+
+    def test_reordered_query_is_not_served_the_boosted_ranking(self):
+        boosted = self.retriever.search("record type layout", k=3, glossary_boost=True)
+        reordered = self.retriever.search("type record layout", k=3, glossary_boost=True)
+        self.assertNotEqual([r.id for r in boosted], [r.id for r in reordered])
+        with mock.patch.object(retrieval, "default_retriever", return_value=self.retriever):
+            self.assertEqual(retrieval.search("record type layout", k=3, glossary_boost=True), boosted)
+            self.assertEqual(retrieval.search("type record layout", k=3, glossary_boost=True), reordered)
+
+
+if __name__ == "__main__":
+    unittest.main()
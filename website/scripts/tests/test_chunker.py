@@ -0,0 +1,87 @@
+"""Heading-tree chunking, Q&A pairs and anchors (raglib.chunker)."""
+
+import unittest
+from pathlib import Path
+
+from raglib.chunker import heading_anchor, page_chunks, page_code_blocks, page_qa_pairs
+from raglib.corpus import Page
+
+BODY = """# Trigger Patterns
+
+Handle every record of a batch in one pass.
+
+## Setup
+
+```bash
+# install the CLI
+sf org login web
+## still inside the fence
+```
+
+## Q&A
+
+### Q: Should I bulkify triggers?
+
+**A**: Yes, a trigger gets up to 200 records at a time.
+
+### Q: Can a trigger make callouts?
+
+**A**: Only asynchronously, from a queueable.
+
+## Setup
+
+A second section with the same heading.
+"""
+
+
+def _page(body: str = BODY) -> Page:
+    return Page("development/triggers.md", "/rag/development/triggers.html", "development", "Trigger Patterns",
+                {}, body, Path("rag/development/triggers.md"))
+
+
+class ChunkerTest(unittest.TestCase):
+    def test_fenced_hash_lines_are_not_headings(self):
+        setup = [chunk for chunk in page_chunks(_page()) if chunk.title == "Trigger Patterns › Setup"][0]
+        self.assertIn("# install the CLI\nsf org login web\n## still inside the fence\n```", setup.text)
+        self.assertFalse(any("still inside the fence" in chunk.title for chunk in page_chunks(_page())))
+        blocks = list(page_code_blocks(_page()))
+        self.assertEqual([block.language for block in blocks], ["bash"])
+        self.assertEqual(blocks[0].url, "/rag/development/triggers.html#setup")
+
+    def test_qa_pairs_are_chunks_of_their_own(self):
+        chunks = list(page_chunks(_page()))
+        questions = [chunk for chunk in chunks if "› Q:" in chunk.title]
+        self.assertEqual([chunk.url for chunk in questions],
+                         ["/rag/development/triggers.html#q-should-i-bulkify-triggers",
+                          "/rag/development/triggers.html#q-can-a-trigger-make-callouts"])
+        self.assertTrue(questions[0].text.startswith("### Q: Should I bulkify triggers?"))
+        self.assertNotIn("callouts", questions[0].text)
+        self.assertFalse(any("bulkify" in chunk.text for chunk in chunks if chunk not in questions))
+
+    def test_qa_pairs(self):
+        pairs = list(page_qa_pairs(_page()))
+        self.assertEqual([(pair.question, pair.answer) for pair in pairs], [
+            ("Should I bulkify triggers?", "Yes, a trigger gets up to 200 records at a time."),
+            ("Can a trigger make callouts?", "Only asynchronously, from a queueable."),
+        ])
+        self.assertEqual(pairs[0].title, "Trigger Patterns › Q&A › Q: Should I bulkify triggers?")
+
+    def test_repeated_headings_get_numbered_anchors(self):
+        urls = [chunk.url for chunk in page_chunks(_page()) if chunk.title == "Trigger Patterns › Setup"]
+        self.assertEqual(urls, ["/rag/development/triggers.html#setup", "/rag/development/triggers.html#setup-1"])
+
+    def test_heading_anchor(self):
+        self.assertEqual(heading_anchor("Q: Why `Database.executeBatch`?"), "q-why-databaseexecutebatch")
+        self.assertEqual(heading_anchor("[Sharing Rules](/rag/security/sharing.html)"), "sharing-rules")
+
+    def test_ids_are_stable_and_unique(self):
+        first = [chunk.id for chunk in page_chunks(_page())]
+        self.assertEqual(first, [chunk.id for chunk in page_chunks(_page())])
+        self.assertEqual(len(first), len(set(first)))
+        edited = [chunk.id for chunk in page_chunks(_page(BODY.replace("same heading", "other heading")))]
+        self.assertEqual(first[:-1], edited[:-1])
+        self.assertNotEqual(first[-1], edited[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
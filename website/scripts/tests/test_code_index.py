@@ -0,0 +1,69 @@
+"""Code block lookup by identifier (raglib.code_index)."""
+
+import unittest
+
+from raglib.chunker import CodeBlock
+from raglib.code_index import CodeIndex, identifier_keys
+
+BATCH = """public class AccountCleanup implements Database.Batchable<SObject>, Schedulable {
+    public void execute(SchedulableContext context) {
+        Database.executeBatch(new AccountCleanup(), 200);
+    }
+}"""
+QUEUEABLE = """public class SyncJob implements Queueable {
+    public void execute(QueueableContext context) {
+        System.enqueueJob(new SyncJob());
+        Database.executeBatch(new AccountCleanup());
+        Database.executeBatch(new ContactCleanup());
+    }
+}"""
+WIRE = """import { wire } from 'lwc';
+import { getRecord } from 'lightning/uiRecordApi';
+export default class Card { @wire(getRecord, { recordId: '$recordId' }) record; }"""
+
+
+def _block(language: str, code: str, name: str) -> CodeBlock:
+    return CodeBlock(language, code, f"code-examples/{name}.md", f"/rag/code-examples/{name}.html#example",
+                     f"Examples › {name}")
+
+
+class CodeIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = CodeIndex.build([_block("apex", BATCH, "batch"), _block("cls", QUEUEABLE, "queueable"),
+                                      _block("js", WIRE, "wire")])
+
+    def _paths(self, *args, **kwargs) -> list:
+        return [match.path for match in self.index.lookup(*args, **kwargs)]
+
+    def test_identifier_keys(self):
+        self.assertEqual(identifier_keys("Database.executeBatch"),
+                         ["database.executebatch", "database", "executebatch", "execute", "batch"])
+        self.assertEqual(identifier_keys("@wire"), ["@wire", "wire"])
+
+    def test_dotted_identifier_ranked_by_occurrences(self):
+        matches = self.index.lookup("Database.executeBatch")
+        self.assertEqual([(match.path, match.score) for match in matches],
+                         [("code-examples/queueable.md", 2), ("code-examples/batch.md", 1)])
+
+    def test_camel_case_parts_and_declarations(self):
+        self.assertEqual(self._paths("enqueueJob"), ["code-examples/queueable.md"])
+        self.assertEqual(self._paths("implements Queueable"), ["code-examples/queueable.md"])
+        self.assertEqual(self._paths("implements Database.Batchable"), ["code-examples/batch.md"])
+
+    def test_every_identifier_must_occur(self):
+        self.assertEqual(self._paths("executeBatch Schedulable"), ["code-examples/batch.md"])
+        self.assertEqual(self._paths("executeBatch getRecord"), [])
+
+    def test_prefix_and_language(self):
+        self.assertEqual(self._paths("@wi", prefix=True), ["code-examples/wire.md"])
+        self.assertEqual(self._paths("Database.exec", prefix=True),
+                         ["code-examples/queueable.md", "code-examples/batch.md"])
+        self.assertEqual(self._paths("execute", language="apex"),
+                         ["code-examples/queueable.md", "code-examples/batch.md"])
+        self.assertEqual(self._paths("getRecord", language="javascript"), ["code-examples/wire.md"])
+        self.assertEqual(self._paths("getRecord", language="apex"), [])
+        self.assertEqual(self._paths("getRecord", language="python"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+"""Budgeted maximal marginal relevance (raglib.context.mmr_select)."""
+
+import unittest
+
+import numpy as np
+
+from raglib.context import mmr_select
+
+# Candidates 0 and 1 say the same thing; 2 and 3 each cover something else
+RELEVANCE = np.array([1.0, 0.95, 0.5, 0.3], dtype=np.float32)
+VECTORS = np.array([[1, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float32)
+COSTS = np.array([100, 100, 100, 50])
+
+
+class MmrSelectTest(unittest.TestCase):
+    def test_redundant_candidate_is_skipped(self):
+        self.assertEqual(mmr_select(RELEVANCE, VECTORS, COSTS, 300, diversity=0.5), [0, 2, 3])
+
+    def test_without_diversity_or_vectors_picks_by_relevance(self):
+        self.assertEqual(mmr_select(RELEVANCE, VECTORS, COSTS, 300, diversity=0.0), [0, 1, 2])
+        self.assertEqual(mmr_select(RELEVANCE, None, COSTS, 300, diversity=0.5), [0, 1, 2])
+
+    def test_stays_within_budget(self):
+        for budget in range(0, 400, 25):
+            picked = mmr_select(RELEVANCE, VECTORS, COSTS, budget)
+            self.assertLessEqual(int(COSTS[picked].sum()), budget)
+        # A smaller candidate further down still fills what is left
+        self.assertEqual(mmr_select(RELEVANCE, None, COSTS, 250), [0, 1, 3])
+        self.assertEqual(mmr_select(RELEVANCE, VECTORS, COSTS, 40), [])
+
+    def test_price_is_the_full_cost(self):
+        # Candidate 0 turns out to cost more than its estimate once its citation lines are added
+        price = {0: 260, 1: 100, 2: 100, 3: 50}.__getitem__
+        picked = mmr_select(RELEVANCE, None, COSTS, 250, price=price)
+        self.assertEqual(picked, [1, 2, 3])
+        self.assertLessEqual(sum(price(i) for i in picked), 250)
+
+
+if __name__ == "__main__":
+    unittest.main()
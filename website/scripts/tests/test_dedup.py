@@ -0,0 +1,42 @@
+"""Near-duplicate chunk clusters (raglib.dedup)."""
+
+import unittest
+
+from raglib.chunker import Chunk
+from raglib.dedup import canonical_rows, find_duplicates
+
+LIMITS = ("Governor limits cap the number of SOQL queries a transaction can run, so move every query outside "
+          "of loops, collect record ids in a set first, and bulkify each trigger so that it handles two hundred "
+          "records at once.")
+FLOWS = ("Flows run before save and after save; before-save flows are the fastest choice for same-record field "
+         "updates because they need no extra DML statement.")
+
+
+def _chunk(row: int, text: str) -> Chunk:
+    return Chunk(f"development/page-{row}.md#@{row}", f"development/page-{row}.md",
+                 f"/rag/development/page-{row}.html", "development", f"Page {row}", text, len(text.split()))
+
+
+class FindDuplicatesTest(unittest.TestCase):
+    def test_near_duplicates_collapse_to_the_longest(self):
+        chunks = [_chunk(0, LIMITS), _chunk(1, FLOWS), _chunk(2, LIMITS + " See the limits page.")]
+        clusters = find_duplicates(chunks)
+        self.assertEqual(clusters, [[2, 0]])
+        self.assertEqual(canonical_rows(clusters, len(chunks)).tolist(), [2, 1, 2])
+
+    def test_distinct_chunks_stay_apart(self):
+        rewritten = LIMITS.replace("two hundred records", "a full batch").replace("SOQL queries", "queries")
+        chunks = [_chunk(0, LIMITS), _chunk(1, FLOWS), _chunk(2, rewritten.replace("collect", "keep"))]
+        self.assertEqual(find_duplicates(chunks, threshold=0.9), [])
+        self.assertEqual(find_duplicates([_chunk(0, LIMITS), _chunk(1, FLOWS)]), [])
+
+    def test_short_chunks_are_not_compared(self):
+        self.assertEqual(find_duplicates([_chunk(0, "See the limits page."), _chunk(1, "See the limits page.")]), [])
+
+    def test_exact_copies_cluster_in_row_order(self):
+        chunks = [_chunk(0, FLOWS), _chunk(1, LIMITS), _chunk(2, FLOWS), _chunk(3, FLOWS)]
+        self.assertEqual(find_duplicates(chunks), [[0, 2, 3]])
+
+
+if __name__ == "__main__":
+    unittest.main()
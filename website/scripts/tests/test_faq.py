@@ -0,0 +1,54 @@
+"""FAQ lookups: exact keys and MinHash LSH near-duplicates (raglib.faq)."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from raglib.artifacts import ArtifactWriter
+from raglib.chunker import QAPair
+from raglib.faq import FaqIndex, question_terms
+
+PAIRS = [
+    QAPair("When should I use Apex rather than Flow for record automation?", "When the logic needs loops.",
+           "development/apex-vs-flow.md", "/rag/development/apex-vs-flow.html#q-when", "Apex vs Flow"),
+    QAPair("How do I bulkify triggers?", "Handle all 200 records of a batch.",
+           "development/triggers.md", "/rag/development/triggers.html#q-bulkify", "Trigger Patterns"),
+    QAPair("How do I bulkify a flow?", "Use collection variables.",
+           "development/flows.md", "/rag/development/flows.html#q-bulkify", "Flow Patterns"),
+]
+
+
+class FaqIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.faq = FaqIndex.build(PAIRS)
+
+    def test_question_terms_normalise_phrasing(self):
+        self.assertEqual(question_terms("How do I bulkify triggers?"), question_terms("how to bulkify a trigger"))
+
+    def test_rephrased_question_matches_exactly(self):
+        match = self.faq.lookup("how to bulkify a trigger")
+        self.assertEqual((match.path, match.similarity), ("development/triggers.md", 1.0))
+
+    def test_near_duplicate_question_collapses(self):
+        match = self.faq.lookup("When should I use Apex instead of Flow for record automation")
+        self.assertEqual(match.path, "development/apex-vs-flow.md")
+        self.assertEqual(match.answer, "When the logic needs loops.")
+        self.assertGreaterEqual(match.similarity, 0.7)
+        self.assertLess(match.similarity, 1.0)
+
+    def test_distinct_questions_stay_apart(self):
+        self.assertEqual(self.faq.lookup("How do I bulkify flows").path, "development/flows.md")
+        self.assertIsNone(self.faq.lookup("How do I test triggers?"))
+        self.assertIsNone(self.faq.lookup("the a of"))
+
+    def test_saved_index_answers_the_same(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.faq.save(ArtifactWriter(), Path(directory))
+            loaded = FaqIndex.load(Path(directory))
+            self.assertEqual(loaded.pairs(), PAIRS)
+            self.assertEqual(loaded.lookup("When should I use Apex instead of Flow for record automation"),
+                             self.faq.lookup("When should I use Apex instead of Flow for record automation"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""Recovering headers that were never closed (raglib.frontmatter)."""
+
+import unittest
+
+from raglib.frontmatter import check_content, recover_header, repair_content
+
+# The header is missing its closing ---, so the horizontal rule below the
+# headings closes it; headings alone still parse, as YAML comments
+HEADINGS_ONLY = """---
+title: Sharing Rules
+layout: default
+
+# Sharing Rules
+
+## Criteria-based rules
+---
+Rules open access by record field values.
+"""
+
+
+class SwallowedBodyTest(unittest.TestCase):
+    def test_headings_only_body_is_recut(self):
+        status, header_lines, header, body = recover_header(HEADINGS_ONLY)
+        self.assertEqual(status, "unclosed")
+        self.assertEqual(header_lines, ["title: Sharing Rules", "layout: default"])
+        self.assertEqual(header, {"title": "Sharing Rules", "layout": "default"})
+        self.assertTrue(body.startswith("\n# Sharing Rules\n"))
+
+    def test_headings_only_body_is_reported(self):
+        self.assertEqual(check_content(HEADINGS_ONLY, "security/sharing-rules.md"),
+                         ["Invalid frontmatter format (no closing --- before content)"])
+
+    def test_repair_closes_header_before_the_headings(self):
+        repaired = repair_content(HEADINGS_ONLY, "security/sharing-rules.md")
+        self.assertEqual(repaired, "---\ntitle: Sharing Rules\nlayout: default\n"
+                                   "permalink: /rag/security/sharing-rules.html\n---\n"
+                                   "\n# Sharing Rules\n\n## Criteria-based rules\n---\n"
+                                   "Rules open access by record field values.\n")
+        self.assertEqual(check_content(repaired, "security/sharing-rules.md"), [])
+
+    def test_closed_header_with_list_and_trailing_blank_is_kept(self):
+        content = "---\ntitle: Sharing Rules\ntags:\n  - security\n\n---\n# Sharing Rules\n"
+        status, header_lines, header, _ = recover_header(content)
+        self.assertEqual(status, "ok")
+        self.assertEqual(header, {"title": "Sharing Rules", "tags": ["security"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
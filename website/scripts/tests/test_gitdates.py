@@ -0,0 +1,60 @@
+"""Last commit dates from one ``git log -z`` call (raglib.gitdates)."""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from raglib.gitdates import RECORD_SEP, git_last_commit_dates, parse_log
+
+JANUARY = datetime.fromisoformat("2024-01-01T00:00:00+00:00")
+FEBRUARY = datetime.fromisoformat("2024-02-01T00:00:00+00:00")
+
+
+class ParseLogTest(unittest.TestCase):
+    def test_newest_record_wins(self):
+        output = (f"{RECORD_SEP}{FEBRUARY.isoformat()}\nrag/a.md\0rag/b.md\0\0"
+                  f"{RECORD_SEP}{JANUARY.isoformat()}\nrag/a.md\0rag/c.md\0")
+        self.assertEqual(parse_log(output), {"rag/a.md": FEBRUARY, "rag/b.md": FEBRUARY, "rag/c.md": JANUARY})
+
+    def test_paths_are_taken_verbatim(self):
+        output = f"{RECORD_SEP}{JANUARY.isoformat()}\nrag/with space.md\0rag/é\nnewline.md\0"
+        self.assertEqual(parse_log(output), {"rag/with space.md": JANUARY, "rag/é\nnewline.md": JANUARY})
+
+    def test_empty_output(self):
+        self.assertEqual(parse_log(""), {})
+
+
+@unittest.skipIf(shutil.which("git") is None, "git is not installed")
+class GitLastCommitDatesTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.repo = Path(directory.name)
+        self._git("init", "-q")
+
+    def _git(self, *args: str, date: datetime = JANUARY) -> None:
+        env = {**os.environ, "GIT_AUTHOR_NAME": "a", "GIT_AUTHOR_EMAIL": "a@example.com",
+               "GIT_COMMITTER_NAME": "a", "GIT_COMMITTER_EMAIL": "a@example.com",
+               "GIT_AUTHOR_DATE": date.isoformat(), "GIT_COMMITTER_DATE": date.isoformat()}
+        subprocess.run(["git", "-C", str(self.repo), *args], check=True, env=env, capture_output=True)
+
+    def test_renamed_path_with_spaces(self):
+        (self.repo / "rag").mkdir()
+        (self.repo / "rag" / "old name.md").write_text("x\n", encoding="utf-8")
+        (self.repo / "rag" / "kept.md").write_text("y\n", encoding="utf-8")
+        self._git("add", ".")
+        self._git("commit", "-q", "-m", "add")
+        self._git("mv", "rag/old name.md", "rag/new name.md")
+        self._git("commit", "-q", "-m", "rename", date=FEBRUARY)
+
+        dates = git_last_commit_dates(self.repo, ["rag"])
+        self.assertEqual(dates["rag/new name.md"], FEBRUARY)
+        self.assertEqual(dates["rag/kept.md"], JANUARY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+"""PageRank over the link graph (raglib.linkgraph), with and without NumPy."""
+
+import sys
+import unittest
+from unittest import mock
+
+from raglib.linkgraph import link_graph, page_ranks, pagerank
+
+PAGES = [
+    ("a.md", "/rag/a.html", ["/rag/b.html", "/rag/c.html", "/rag/missing.html"]),
+    ("b.md", "/rag/b.html", ["/rag/c.html", "/rag/b.html"]),
+    ("c.md", "/rag/c.html", ["/rag/a.html"]),
+    ("d.md", "/rag/d.html", []),
+]
+
+
+class PagerankTest(unittest.TestCase):
+    def test_link_graph_drops_unknown_and_self_links(self):
+        self.assertEqual(link_graph(PAGES), ([0, 0, 1, 2], [1, 2, 2, 0]))
+
+    def test_ranks_sum_to_one(self):
+        self.assertAlmostEqual(sum(pagerank(*link_graph(PAGES), len(PAGES))), 1.0)
+
+    def test_without_numpy_gives_the_same_ranks(self):
+        ranks = page_ranks(PAGES)
+        with mock.patch.dict(sys.modules, {"numpy": None}):
+            self.assertEqual(page_ranks(PAGES), ranks)
+        self.assertEqual(max(ranks, key=ranks.get), "c.md")
+        self.assertAlmostEqual(sum(ranks.values()), len(PAGES), places=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Segmented index updates, tombstones and merges (raglib.incremental, raglib.segments)."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from raglib.artifacts import ArtifactWriter
+from raglib.incremental import build_index, merge_index, update_index
+from raglib.retrieval import Retriever
+
+PAGES = {
+    "development/triggers.md": ("Trigger Patterns", "Bulkify every trigger so it handles 200 records per batch."),
+    "development/flows.md": ("Flow Patterns", "Record-triggered flows run before or after save."),
+    "security/sharing.md": ("Sharing Rules", "Sharing rules open record access by owner or criteria."),
+    "security/fls.md": ("Field Level Security", "Check field permissions with USER_MODE in trigger handlers."),
+}
+
+
+class SegmentedIndexTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.rag_dir = Path(directory.name) / "rag"
+        self.index_dir = Path(directory.name) / "index"
+        for path, (title, text) in PAGES.items():
+            self._write_page(path, title, text)
+        build_index(ArtifactWriter(), self.index_dir, self.rag_dir)
+
+    def _write_page(self, path: str, title: str, text: str) -> None:
+        file_path = self.rag_dir / path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(f"---\nlayout: default\ntitle: {title}\npermalink: /rag/{path[:-3]}.html\n---\n\n"
+                             f"# {title}\n\n{text}\n", encoding="utf-8")
+
+    def _search(self, query: str) -> list:
+        return [(result.path, round(result.score, 5))
+                for result in Retriever.load(self.index_dir).search(query, k=10)]
+
+    def test_tombstones_hide_deleted_and_replaced_chunks(self):
+        (self.rag_dir / "security/sharing.md").unlink()
+        self._write_page("development/flows.md", "Flow Patterns", "Screen flows collect input from users.")
+        summary = update_index(ArtifactWriter(), self.index_dir, self.rag_dir)
+        self.assertEqual((summary["pages"], summary["added"], summary["deleted"]), (2, 1, 2))
+        self.assertEqual(len(summary["manifest"]["segments"]), 2)
+
+        self.assertEqual(self._search("sharing owner criteria"), [])
+        self.assertEqual(self._search("save"), [])
+        self.assertEqual([path for path, _ in self._search("screen input")], ["development/flows.md"])
+
+    def test_merge_keeps_scores(self):
+        # Only additions: no tombstones, so the segment statistics are the merged index's
+        self._write_page("development/batch-apex.md", "Batch Apex", "Batch Apex runs trigger-safe jobs on records.")
+        summary = update_index(ArtifactWriter(), self.index_dir, self.rag_dir)
+        self.assertEqual((summary["added"], summary["deleted"]), (1, 0))
+        before = self._search("trigger records")
+        self.assertIn("development/batch-apex.md", [path for path, _ in before])
+
+        manifest = merge_index(ArtifactWriter(), self.index_dir, force=True)
+        self.assertEqual(len(manifest["segments"]), 1)
+        self.assertEqual(self._search("trigger records"), before)
+
+        build_index(ArtifactWriter(), self.index_dir, self.rag_dir)
+        self.assertEqual(self._search("trigger records"), before)
+
+if __name__ == "__main__":
+    unittest.main()
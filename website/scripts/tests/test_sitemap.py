@@ -0,0 +1,73 @@
+"""Streaming, split and gzipped sitemaps (raglib.sitemap)."""
+
+import gzip
+import tempfile
+import unittest
+from pathlib import Path
+
+from raglib.sitemap import SitemapWriter, format_url
+
+SITE = "https://example.com"
+
+
+class SitemapWriterTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output_dir = Path(directory.name)
+
+    def _write(self, count: int, **options) -> SitemapWriter:
+        with SitemapWriter(self.output_dir, SITE, **options) as writer:
+            for i in range(count):
+                writer.add(f"{SITE}/rag/page-{i}.html", lastmod=f"2025-01-{i % 28 + 1:02d}")
+        return writer
+
+    def _names(self) -> list:
+        return sorted(path.name for path in self.output_dir.iterdir())
+
+    def test_single_part(self):
+        writer = self._write(3)
+        self.assertEqual(writer.files, [self.output_dir / "sitemap.xml"])
+        text = (self.output_dir / "sitemap.xml").read_text(encoding="utf-8")
+        self.assertEqual(text.count("<url>"), 3)
+        self.assertTrue(text.endswith("</urlset>"))
+
+    def test_splits_at_url_limit(self):
+        writer = self._write(5, max_urls=2)
+        self.assertEqual(self._names(), ["sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml", "sitemap-index.xml"])
+        self.assertEqual(writer.entry_point, self.output_dir / "sitemap-index.xml")
+        counts = [(self.output_dir / f"sitemap-{i}.xml").read_text(encoding="utf-8").count("<url>")
+                  for i in (1, 2, 3)]
+        self.assertEqual(counts, [2, 2, 1])
+        index = (self.output_dir / "sitemap-index.xml").read_text(encoding="utf-8")
+        self.assertIn(f"<loc>{SITE}/sitemap-3.xml</loc>", index)
+
+    def test_splits_at_byte_limit(self):
+        entry = len(format_url(f"{SITE}/rag/page-0.html", "2025-01-01").encode("utf-8"))
+        self._write(6, max_bytes=200 + 2 * entry)
+        parts = [path for path in self.output_dir.glob("sitemap-*.xml") if path.name != "sitemap-index.xml"]
+        self.assertEqual(len(parts), 3)
+        for path in parts:
+            self.assertLessEqual(path.stat().st_size, 200 + 2 * entry)
+
+    def test_gzip_matches_plain_output(self):
+        writer = self._write(3, gzip_output=True)
+        self.assertEqual(self._names(), ["sitemap.xml", "sitemap.xml.gz"])
+        self.assertEqual(gzip.decompress((self.output_dir / "sitemap.xml.gz").read_bytes()),
+                         (self.output_dir / "sitemap.xml").read_bytes())
+        self.assertEqual(len(writer.changed), 2)
+
+    def test_unchanged_rerun_rewrites_nothing(self):
+        self._write(3, gzip_output=True)
+        self.assertEqual(self._write(3, gzip_output=True).changed, [])
+
+    def test_removes_stale_parts(self):
+        self._write(5, max_urls=2, gzip_output=True)
+        writer = self._write(2, max_urls=2, gzip_output=True)
+        self.assertEqual(self._names(), ["sitemap.xml", "sitemap.xml.gz"])
+        self.assertIn(self.output_dir / "sitemap-index.xml", writer.changed)
+        self.assertIn(self.output_dir / "sitemap-3.xml.gz", writer.changed)
+
+
+if __name__ == "__main__":
+    unittest.main()
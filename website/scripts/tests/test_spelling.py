@@ -0,0 +1,65 @@
+"""Symmetric-delete spelling correction (raglib.spelling, raglib.edits), as search.js does it."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from raglib.artifacts import ArtifactWriter
+from raglib.edits import client_vocabulary, deletes, edit_distance, token_budget
+from raglib.spelling import SpellingIndex
+
+COUNTS = {"queueable": 12, "permission": 40, "set": 50, "trigger": 30, "flow": 20, "flaw": 2, "apex": 25, "v2": 3}
+
+
+class EditsTest(unittest.TestCase):
+    def test_deletes(self):
+        self.assertEqual(deletes("abc", 1), {"abc", "ab", "ac", "bc"})
+        self.assertIn("a", deletes("abc", 2))
+
+    def test_edit_distance_counts_transpositions_once(self):
+        self.assertEqual(edit_distance("trigger", "trigegr", 2), 1)
+        self.assertEqual(edit_distance("permision", "permission", 2), 1)
+        self.assertEqual(edit_distance("abc", "xyz", 1), 2)
+
+    def test_token_budget(self):
+        self.assertEqual([token_budget(token) for token in ("apx", "flwo", "flows", "queuable", "v2v2")],
+                         [0, 1, 1, 2, 0])
+
+    def test_client_vocabulary_keeps_suggestible_terms(self):
+        self.assertEqual(client_vocabulary({"queueable": 12, "v2": 3, "ab": 1}),
+                         {"max_distance": 2, "terms": ["queueable"], "counts": [12]})
+
+
+class SpellingIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.spelling = SpellingIndex.build(COUNTS)
+
+    def test_lookup(self):
+        self.assertEqual(self.spelling.lookup("queuable"), "queueable")
+        self.assertEqual(self.spelling.lookup("qeueable"), "queueable")
+        self.assertEqual(self.spelling.lookup("flwo"), "flow")
+
+    def test_tie_goes_to_the_term_in_most_documents(self):
+        self.assertEqual(self.spelling.lookup("flox"), "flow")
+
+    def test_known_short_and_distant_tokens_are_left_alone(self):
+        self.assertIsNone(self.spelling.lookup("trigger"))
+        self.assertIsNone(self.spelling.lookup("apx"))
+        self.assertIsNone(self.spelling.lookup("xyzzyq"))
+        self.assertIsNone(self.spelling.lookup("queuable", known=lambda token: True))
+
+    def test_correct_query(self):
+        self.assertEqual(self.spelling.correct("Queuable permision set for Trigers"),
+                         ("queueable permission set for trigger",
+                          {"queuable": "queueable", "permision": "permission", "trigers": "trigger"}))
+        self.assertEqual(self.spelling.correct("Flow and Apex"), ("Flow and Apex", {}))
+
+    def test_saved_index_corrects_the_same(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.spelling.save(ArtifactWriter(), Path(directory))
+            loaded = SpellingIndex.load(Path(directory))
+            self.assertEqual(loaded.correct("Queuable permision"), self.spelling.correct("Queuable permision"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Typeahead prefix index and suggest(), the Python twin of search.js (raglib.typeahead)."""
+
+import unittest
+from pathlib import Path
+
+from raglib.corpus import Page
+from raglib.typeahead import Typeahead, build_typeahead, label_anchor, suggest
+
+TRIGGERS = """## Bulkification
+
+## Trigger Handler Pattern
+
+### FAQ
+
+## FAQ
+
+```
+## Trigger Inside A Fence
+```
+
+## Déploiement des triggers
+"""
+FLOWS = """## Trigger Order
+
+## When to Use Flow vs Apex?
+"""
+
+
+def _page(path: str, title: str, body: str) -> Page:
+    return Page(path, f"/rag/{path[:-3]}.html", path.split("/")[0], title, {}, body, Path("rag") / path)
+
+
+class TypeaheadTest(unittest.TestCase):
+    def setUp(self):
+        pages = [_page("development/triggers.md", "Apex Trigger Patterns", TRIGGERS),
+                 _page("development/flows.md", "Flow Patterns", FLOWS)]
+        self.data = build_typeahead(pages, ranks={"development/triggers.md": 2.0, "development/flows.md": 0.5})
+        self.typeahead = Typeahead(self.data)
+
+    def _labels(self, query: str) -> list:
+        return [label for label, _, _ in suggest(self.typeahead, query)]
+
+    def test_labels_are_stored_once(self):
+        self.assertEqual(self.data["labels"].count("FAQ"), 1)
+        self.assertNotIn("Trigger Inside A Fence", self.data["labels"])
+
+    def test_label_starts_first_then_weight(self):
+        self.assertEqual(suggest(self.typeahead, "trig"), [
+            ("Trigger Handler Pattern", "/rag/development/triggers.html#trigger-handler-pattern", 500),
+            ("Trigger Order", "/rag/development/flows.html#trigger-order", 0),
+            ("Apex Trigger Patterns", "/rag/development/triggers.html", 1000),
+            ("Déploiement des triggers", "/rag/development/triggers.html#déploiement-des-triggers", 500),
+        ])
+
+    def test_later_content_words_are_keys(self):
+        self.assertEqual(self._labels("use flow"), ["When to Use Flow vs Apex?"])
+        self.assertEqual(self._labels("to use"), [])
+        self.assertEqual(self._labels("Trigger  H"), ["Trigger Handler Pattern"])
+
+    def test_repeated_and_non_ascii_headings_keep_their_anchors(self):
+        self.assertEqual([url for _, url, _ in suggest(self.typeahead, "faq")],
+                         ["/rag/development/triggers.html#faq", "/rag/development/triggers.html#faq-1"])
+        self.assertEqual(suggest(self.typeahead, "Déploiement")[0][1],
+                         "/rag/development/triggers.html#déploiement-des-triggers")
+        self.assertEqual(label_anchor("When to Use Flow vs Apex?"), "when-to-use-flow-vs-apex")
+
+    def test_long_prefix_and_no_match(self):
+        self.assertEqual(self._labels("when to use flow vs apex really"), ["When to Use Flow vs Apex?"])
+        self.assertEqual(self._labels("zzz"), [])
+        self.assertEqual(self._labels("?!"), [])
+        self.assertEqual(len(suggest(self.typeahead, "t", limit=2)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
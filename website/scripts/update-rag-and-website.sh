@@ -80,6 +80,11 @@ done
 # Change to project root
 cd "$PROJECT_ROOT"
 
+# Generated artifacts that actually changed are appended here by the Python
+# scripts (they skip writes when content is unchanged)
+CHANGED_FILE="$(mktemp)"
+trap 'rm -f "$CHANGED_FILE"' EXIT
+
 print_header "Salesforce RAG → Website Update Script"
 
 # Reference lessons learned document
@@ -117,9 +122,12 @@ if [ "$VALIDATE_ONLY" = true ]; then
 else
     if [ "$DRY_RUN" = true ]; then
         echo "[DRY RUN] Would run: python3 website/scripts/sync-homepage.py"
+        echo "[DRY RUN] Would run: python3 website/scripts/build-search-index.py --incremental"
     else
-        python3 website/scripts/sync-homepage.py
+        python3 website/scripts/sync-homepage.py --changed-file "$CHANGED_FILE"
         print_success "RAG index, library JSON, and homepage synced!"
+        python3 website/scripts/build-search-index.py --incremental --changed-file "$CHANGED_FILE"
+        print_success "Search index built!"
     fi
 fi
 
@@ -135,8 +143,16 @@ fi
 if [ "$DRY_RUN" = true ]; then
     python3 website/scripts/update-website.py --dry-run --verbose
 else
-    python3 website/scripts/update-website.py --verbose
+    python3 website/scripts/update-website.py --verbose --changed-file "$CHANGED_FILE"
     print_success "Website files updated!"
+    
+    # Nothing regenerated means nothing to re-validate or commit
+    if [ ! -s "$CHANGED_FILE" ]; then
+        print_warning "No generated artifacts changed. Everything is up to date!"
+        exit 0
+    fi
+    echo "Changed artifacts:"
+    sed 's/^/  - /' "$CHANGED_FILE"
 fi
 
 # Step 3: Validate changes
@@ -3,7 +3,10 @@
 Update Website Script for Salesforce RAG Knowledge Library
 
 This script automatically updates website files when RAG content changes:
-- Generates/updates sitemap.xml with all markdown files
+- Generates/updates sitemap.xml with all markdown files (streamed to disk; split
+  into sitemap-N.xml files plus sitemap-index.xml past 50,000 URLs / 50 MB,
+  optionally with .xml.gz copies); page priorities come from PageRank over
+  the internal links
 - Validates markdown file structure
 - Updates metadata if needed
 - Prepares site for deployment
@@ -12,6 +15,7 @@ Usage:
     python website/scripts/update-website.py
     python website/scripts/update-website.py --validate-only
     python website/scripts/update-website.py --dry-run
+    python website/scripts/update-website.py --gzip
 
 IMPORTANT: See website/docs/LESSONS-LEARNED.md for critical lessons and best practices
 """
@@ -20,42 +24,31 @@ import os
 import sys
 import json
 import re
-import xml.etree.ElementTree as ET
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Tuple
 import argparse
+import tempfile
+
+from raglib.artifacts import ArtifactWriter
+from raglib.frontmatter import read_frontmatter
+from raglib.gitdates import LastModified
+from raglib.linkgraph import corpus_ranks, rank_weights
+from raglib.sitemap import MAX_URLS, SitemapWriter
 
 # Configuration
 BASE_DIR = Path(__file__).parent.parent.parent
 RAG_DIR = BASE_DIR / "rag"
-SITEMAP_PATH = BASE_DIR / "website" / "root" / "sitemap.xml"
+SITEMAP_DIR = BASE_DIR / "website" / "root"
+ROBOTS_PATH = SITEMAP_DIR / "robots.txt"
 SITE_URL = "https://pranavnagrecha.github.io/Salesforce-RAG"
 EXCLUDE_DIRS = {"meta", ".git", "__pycache__", "node_modules"}
 EXCLUDE_FILES = {"README.md", "CONTRIBUTING.md", "MAINTENANCE.md", "rag-index.md", "rag-library.json", "index.md"}
 
-# Domain descriptions for sitemap priorities
-DOMAIN_PRIORITIES = {
-    "architecture": 0.9,
-    "development": 0.9,
-    "integrations": 0.9,
-    "code-examples": 0.85,
-    "testing": 0.85,
-    "security": 0.85,
-    "data-modeling": 0.85,
-    "operations": 0.8,
-    "observability": 0.8,
-    "troubleshooting": 0.8,
-    "project-methods": 0.8,
-    "data-governance": 0.75,
-    "adoption": 0.75,
-    "quick-start": 0.9,
-    "api-reference": 0.85,
-    "mcp-knowledge": 0.8,
-    "patterns": 0.75,
-    "glossary": 0.7,
-    "best-practices": 0.85,
-}
+# Sitemap <priority> of pages, spread over this range by link-graph rank
+# (raglib.linkgraph); the homepage is 1.0 and rag-index 0.9
+PRIORITY_RANGE = (0.5, 0.9)
+DEFAULT_PRIORITY = 0.7
 
 
 def find_markdown_files(root_dir: Path, relative_to: Path = None) -> List[Tuple[Path, str]]:
@@ -90,76 +83,83 @@ def find_markdown_files(root_dir: Path, relative_to: Path = None) -> List[Tuple[
     return sorted(markdown_files, key=lambda x: x[1])
 
 
-def get_file_metadata(file_path: Path) -> Dict:
+def get_file_metadata(file_path: Path, last_modified: LastModified = None) -> Dict:
     """Extract metadata from markdown file (frontmatter, modification date, etc.)."""
+    if last_modified is None:
+        last_modified = LastModified(BASE_DIR, [str(file_path)])
     metadata = {
         "path": file_path,
-        "modified": datetime.fromtimestamp(file_path.stat().st_mtime),
+        "modified": last_modified.get(file_path),
         "size": file_path.stat().st_size,
     }
     
     # Try to read frontmatter
     try:
         content = file_path.read_text(encoding='utf-8')
-        if content.startswith("---"):
-            import yaml
-            parts = content.split("---", 2)
-            if len(parts) >= 3:
-                frontmatter = yaml.safe_load(parts[1]) or {}
-                metadata.update(frontmatter)
+        metadata.update(read_frontmatter(content))
     except Exception:
         pass
     
     return metadata
 
 
-def get_priority_for_path(relative_path: str) -> float:
-    """Get sitemap priority based on file path."""
-    parts = relative_path.split("/")
-    if len(parts) > 1:
-        folder = parts[0]
-        return DOMAIN_PRIORITIES.get(folder, 0.7)
-    return 0.8  # Root level files
+def get_page_priorities() -> Dict[str, float]:
+    """Sitemap priority of every page, from its PageRank in the internal link graph."""
+    low, high = PRIORITY_RANGE
+    return {path: round(low + (high - low) * weight, 2)
+            for path, weight in rank_weights(corpus_ranks(RAG_DIR)).items()}
+
+
+def get_priority_for_path(relative_path: str, priorities: Dict[str, float]) -> float:
+    """Get sitemap priority of a file (DEFAULT_PRIORITY if it is not a ranked page)."""
+    return priorities.get(relative_path.replace("\\", "/"), DEFAULT_PRIORITY)
 
 
-def generate_sitemap(markdown_files: List[Tuple[Path, str]]) -> str:
-    """Generate sitemap.xml content."""
-    # Create XML structure
-    urlset = ET.Element("urlset")
-    urlset.set("xmlns", "http://www.sitemaps.org/schemas/sitemap/0.9")
+def generate_sitemap(markdown_files: List[Tuple[Path, str]], output_dir: Path,
+                     gzip_output: bool = False, max_urls: int = MAX_URLS) -> SitemapWriter:
+    """
+    Stream sitemap entries to output_dir as files are visited.
     
-    # Add homepage
-    url_elem = ET.SubElement(urlset, "url")
-    ET.SubElement(url_elem, "loc").text = f"{SITE_URL}/"
-    ET.SubElement(url_elem, "lastmod").text = datetime.now().strftime("%Y-%m-%d")
-    ET.SubElement(url_elem, "changefreq").text = "weekly"
-    ET.SubElement(url_elem, "priority").text = "1.0"
+    Returns the closed SitemapWriter (see writer.files / writer.entry_point).
     
-    # Add rag-index
-    url_elem = ET.SubElement(urlset, "url")
-    ET.SubElement(url_elem, "loc").text = f"{SITE_URL}/rag/rag-index.html"
-    ET.SubElement(url_elem, "lastmod").text = datetime.now().strftime("%Y-%m-%d")
-    ET.SubElement(url_elem, "changefreq").text = "daily"
-    ET.SubElement(url_elem, "priority").text = "0.9"
+    <lastmod> comes from the last git commit touching each file (one batched
+    git log call), so it only changes when a page really changes. The
+    homepage and rag-index are generated from the pages, so they take the
+    most recent page date. <priority> follows the pages' link-graph rank:
+    pages many others link to come first.
+    """
+    last_modified = LastModified(BASE_DIR, ["rag"])
+    latest = last_modified.latest(file_path for file_path, _ in markdown_files) or datetime.now()
+    priorities = get_page_priorities()
     
-    # Add all markdown files
-    for file_path, relative_path in markdown_files:
-        metadata = get_file_metadata(file_path)
+    with SitemapWriter(output_dir, SITE_URL, max_urls=max_urls, gzip_output=gzip_output) as writer:
+        # Add homepage
+        writer.add(f"{SITE_URL}/", latest.strftime("%Y-%m-%d"), "weekly", 1.0)
         
-        # Convert .md to .html and build URL
-        url_path = relative_path.replace("\\", "/").replace(".md", ".html")
-        full_url = f"{SITE_URL}/rag/{url_path}"
+        # Add rag-index
+        writer.add(f"{SITE_URL}/rag/rag-index.html", latest.strftime("%Y-%m-%d"), "daily", 0.9)
         
-        url_elem = ET.SubElement(urlset, "url")
-        ET.SubElement(url_elem, "loc").text = full_url
-        ET.SubElement(url_elem, "lastmod").text = metadata["modified"].strftime("%Y-%m-%d")
-        ET.SubElement(url_elem, "changefreq").text = "monthly"
-        priority = get_priority_for_path(relative_path)
-        ET.SubElement(url_elem, "priority").text = str(priority)
+        # Add all markdown files
+        for file_path, relative_path in markdown_files:
+            metadata = get_file_metadata(file_path, last_modified)
+            
+            # Convert .md to .html and build URL
+            url_path = relative_path.replace("\\", "/").replace(".md", ".html")
+            full_url = f"{SITE_URL}/rag/{url_path}"
+            
+            priority = get_priority_for_path(relative_path, priorities)
+            writer.add(full_url, metadata["modified"].strftime("%Y-%m-%d"), "monthly", priority)
     
-    # Convert to string
-    ET.indent(urlset, space="  ")
-    return ET.tostring(urlset, encoding='unicode', xml_declaration=True)
+    return writer
+
+
+def update_robots_sitemap(entry_point: Path, artifacts: ArtifactWriter) -> bool:
+    """Point the Sitemap: line in robots.txt at the sitemap entry point. Returns True if changed."""
+    if not ROBOTS_PATH.exists():
+        return False
+    content = ROBOTS_PATH.read_text(encoding='utf-8')
+    updated = re.sub(r'^Sitemap:.*$', f"Sitemap: {SITE_URL}/{entry_point.name}", content, flags=re.MULTILINE)
+    return artifacts.write_text(ROBOTS_PATH, updated)
 
 
 def validate_links(markdown_files: List[Tuple[Path, str]]) -> Tuple[int, List[str], List[str]]:
@@ -253,6 +253,9 @@ def main():
     parser.add_argument("--validate-only", action="store_true", help="Only validate, don't update files")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be done without making changes")
     parser.add_argument("--verbose", action="store_true", help="Verbose output")
+    parser.add_argument("--gzip", action="store_true", help="Also write .xml.gz copies of the sitemap files")
+    parser.add_argument("--max-urls", type=int, default=MAX_URLS, help="Maximum URLs per sitemap file")
+    parser.add_argument("--changed-file", type=Path, help="Append the paths of changed artifacts to this file")
     args = parser.parse_args()
     
     if args.verbose:
@@ -304,14 +307,26 @@ def main():
     if args.verbose:
         print("Generating sitemap.xml...")
     
-    sitemap_content = generate_sitemap(markdown_files)
-    
     if args.dry_run:
-        print(f"[DRY RUN] Would write sitemap.xml ({len(sitemap_content)} characters)")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            writer = generate_sitemap(markdown_files, Path(tmp_dir), args.gzip, args.max_urls)
+            sizes = {path.name: path.stat().st_size for path in writer.files}
+        print(f"[DRY RUN] Would write {len(sizes)} sitemap file(s):")
+        for name, size in sizes.items():
+            print(f"[DRY RUN]   - {name} ({size} bytes)")
         print(f"[DRY RUN] Would include {len(markdown_files)} markdown files")
     else:
-        SITEMAP_PATH.write_text(sitemap_content, encoding='utf-8')
-        print(f"✓ Wrote {SITEMAP_PATH}")
+        artifacts = ArtifactWriter()
+        writer = generate_sitemap(markdown_files, SITEMAP_DIR, args.gzip, args.max_urls)
+        for path in writer.files:
+            artifacts.record(path, path in writer.changed)
+        for path in writer.changed:
+            if path not in writer.files:
+                artifacts.record(path, True)
+        update_robots_sitemap(writer.entry_point, artifacts)
+        artifacts.print_summary()
+        if args.changed_file:
+            artifacts.write_changed_list(args.changed_file)
         print(f"  - {len(markdown_files)} markdown files")
         print(f"  - {total_links} total links")
         if link_errors: